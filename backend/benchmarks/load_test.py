@@ -0,0 +1,470 @@
+"""HTTP load-testing harness for the Financial Planning API.
+
+Boots the app with src/server.py on a free local port, with the SQLite
+database, report spool/cache and metrics in a temporary directory (or
+targets a running server with --url). It then drives a weighted mix of
+endpoints, either closed-loop at a fixed concurrency or open-loop at a
+fixed Poisson arrival rate. Profiles are generated from the reference data
+(every industry, country and region) with a fixed seed, so runs can be
+repeated.
+
+Reports throughput and p50/p95/p99 latency per endpoint as JSON. In
+open-loop mode latency is measured from each request's scheduled start,
+so queueing behind a saturated server is counted. Requests turned away by
+admission control (429/503) are reported as rejected, apart from errors,
+and are left out of latency and throughput.
+
+Usage:
+  python benchmarks/load_test.py --concurrency 8 --duration 30
+  python benchmarks/load_test.py --rate 50 --duration 60 --mix calculate=80,reference=20
+  python benchmarks/load_test.py --workers 4 --output results/$(git rev-parse --short HEAD).json
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BACKEND_DIR, 'src', 'data')
+DEFAULT_MIX = 'calculate=55,report_pdf=5,report_excel=5,reference=25,users_list=7,users_create=3'
+STARTUP_TIMEOUT = 60.0
+# Admission control turns requests away with these (queue full, deadline passed)
+REJECTED_STATUSES = (429, 503)
+REQUEST_TIMEOUT = 120.0
+
+
+def load_reference_data() -> Dict[str, Any]:
+    def read(name):
+        with open(os.path.join(DATA_DIR, name)) as data_file:
+            return json.load(data_file)
+    return {
+        'countries': read('tax_rates.json')['countries'],
+        'industries': read('industry_benchmarks.json')['industries'],
+        'currencies': read('currencies.json')['currencies']
+    }
+
+
+def generate_profile(rng: random.Random, reference: Dict[str, Any]) -> Dict[str, Any]:
+    """A plausible business: revenue, costs and debt scaled to its size"""
+    country_code = rng.choice(sorted(reference['countries']))
+    country = reference['countries'][country_code]
+    industry = rng.choice(sorted(reference['industries']))
+    employee_count = max(1, int(rng.lognormvariate(2.3, 1.1)))
+    monthly_revenue = round(employee_count * rng.uniform(6000, 20000), 2)
+    location = {'country': country_code}
+    regions = sorted(country.get('regionNames', {}))
+    if regions and rng.random() < 0.7:
+        location['region'] = rng.choice(regions)
+    profile = {
+        'industry': industry,
+        'employeeCount': employee_count,
+        'monthlyRevenue': monthly_revenue,
+        'currentSavings': round(monthly_revenue * rng.uniform(0, 6), 2),
+        'location': location,
+        'currency': country.get('currency', 'USD'),
+        'operatingExpenses': {
+            name: round(monthly_revenue * rng.uniform(low, high), 2)
+            for name, low, high in (('rent', 0.03, 0.12), ('utilities', 0.005, 0.02), ('materials', 0.0, 0.3),
+                                    ('marketing', 0.01, 0.08), ('insurance', 0.005, 0.02), ('other', 0.0, 0.05))
+        },
+        'debtObligations': [
+            {
+                'amount': round(monthly_revenue * rng.uniform(1, 12), 2),
+                'interestRate': round(rng.uniform(3, 20), 2),
+                'monthlyPayment': round(monthly_revenue * rng.uniform(0.01, 0.08), 2)
+            }
+            for _ in range(rng.choice((0, 0, 1, 1, 2, 3)))
+        ]
+    }
+    if rng.random() < 0.1:
+        profile['forecastMonths'] = rng.choice((24, 36, 60))
+    return profile
+
+
+class Workload:
+    """Builds (name, method, path, body) requests for each endpoint in the mix"""
+
+    def __init__(self, reference: Dict[str, Any], profiles: List[Dict[str, Any]],
+                 recommendations: List[Dict[str, Any]], bypass_cache: bool):
+        self.reference = reference
+        self.profiles = profiles
+        self.recommendations = recommendations
+        self.headers = {'X-Cache-Bypass': '1'} if bypass_cache else {}
+        self._user_sequence = 0
+        self._lock = threading.Lock()
+
+    def request(self, name: str, rng: random.Random):
+        if name == 'calculate':
+            return 'POST', '/api/calculate-recommendations', rng.choice(self.profiles)
+        if name in ('report_pdf', 'report_excel'):
+            index = rng.randrange(len(self.recommendations))
+            return 'POST', '/api/generate-report', {
+                'businessData': self.profiles[index],
+                'recommendations': self.recommendations[index],
+                'format': name.split('_')[1]
+            }
+        if name == 'reference':
+            return 'GET', rng.choice((
+                '/api/countries',
+                '/api/industries',
+                '/api/currencies',
+                '/api/bootstrap',
+                f"/api/tax-rates/{rng.choice(sorted(self.reference['countries']))}",
+                f"/api/industry-benchmarks/{rng.choice(sorted(self.reference['industries']))}",
+                f"/api/exchange-rates/{rng.choice(sorted(self.reference['currencies']))}"
+            )), None
+        if name == 'users_list':
+            return 'GET', '/api/users?limit=50', None
+        if name == 'users_create':
+            with self._lock:
+                self._user_sequence += 1
+                sequence = self._user_sequence
+            suffix = f'{os.getpid()}-{sequence}-{rng.randrange(1 << 30)}'
+            return 'POST', '/api/users', {'username': f'load-{suffix}', 'email': f'load-{suffix}@example.com'}
+        raise ValueError(f'Unknown endpoint in mix: {name}')
+
+
+class Client:
+    """One keep-alive connection per thread"""
+
+    def __init__(self, base_url: str, headers: Dict[str, str]):
+        parsed = urllib.parse.urlsplit(base_url)
+        self.host, self.port = parsed.hostname, parsed.port or 80
+        self.headers = headers
+        self._local = threading.local()
+
+    def send(self, method: str, path: str, body) -> int:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = http.client.HTTPConnection(self.host, self.port, timeout=REQUEST_TIMEOUT)
+        headers = dict(self.headers)
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        try:
+            connection.request(method, path, payload, headers)
+            response = connection.getresponse()
+            response.read()
+            if response.will_close:
+                self.close()
+            return response.status
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+
+    def add(self, name: str, latency: float, status):
+        with self._lock:
+            self.samples.setdefault(name, []).append((latency, status))
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(fraction * len(sorted_values) + 0.5 - 1e-9)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def classify(status) -> str:
+    if status in REJECTED_STATUSES:
+        return 'rejected'
+    if not isinstance(status, int) or status >= 500:
+        return 'error'
+    return 'served'
+
+
+def summarize(recorder: Recorder, duration: float) -> Dict[str, Any]:
+    """Per-endpoint and total results.
+
+    Rejections and errors are counted but left out of the latency
+    percentiles and throughput, which cover served requests only.
+    """
+    endpoints = {}
+    all_latencies = []
+    total_requests = total_errors = total_rejected = 0
+    for name, samples in sorted(recorder.samples.items()):
+        statuses = {}
+        outcomes = {'served': 0, 'error': 0, 'rejected': 0}
+        latencies = []
+        for latency, status in samples:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+            outcome = classify(status)
+            outcomes[outcome] += 1
+            if outcome == 'served':
+                latencies.append(latency)
+        latencies.sort()
+        all_latencies.extend(latencies)
+        total_requests += len(samples)
+        total_errors += outcomes['error']
+        total_rejected += outcomes['rejected']
+        endpoints[name] = {
+            'requests': len(samples),
+            'errors': outcomes['error'],
+            'rejected': outcomes['rejected'],
+            'statusCodes': statuses,
+            'throughputRps': round(outcomes['served'] / duration, 2),
+            'latencyMs': latency_summary(latencies)
+        }
+    all_latencies.sort()
+    return {
+        'total': {
+            'requests': total_requests,
+            'errors': total_errors,
+            'rejected': total_rejected,
+            'throughputRps': round(len(all_latencies) / duration, 2),
+            'latencyMs': latency_summary(all_latencies)
+        },
+        'endpoints': endpoints
+    }
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, float]:
+    return {
+        'mean': round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        'p50': round(percentile(latencies, 0.50) * 1000, 3),
+        'p95': round(percentile(latencies, 0.95) * 1000, 3),
+        'p99': round(percentile(latencies, 0.99) * 1000, 3),
+        'max': round(latencies[-1] * 1000, 3) if latencies else 0.0
+    }
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for item in text.split(','):
+        name, _, weight = item.partition('=')
+        mix[name.strip()] = float(weight or 1)
+    if not mix or any(weight < 0 for weight in mix.values()) or not sum(mix.values()):
+        raise ValueError('--mix needs positive weights, e.g. calculate=80,reference=20')
+    return mix
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+def start_server(temp_dir: str, workers: int) -> tuple:
+    """Run src/server.py against a throwaway database; returns (process, base URL)"""
+    port = free_port()
+    env = dict(os.environ)
+    env.update({
+        'APP_URL': f'http://127.0.0.1:{port}',
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(temp_dir, 'load.db'),
+        'REPORT_SPOOL_DIR': os.path.join(temp_dir, 'spool'),
+        'REPORT_CACHE_DIR': os.path.join(temp_dir, 'report-cache'),
+        'METRICS_DIR': os.path.join(temp_dir, 'metrics'),
+        'PROFILE_DIR': os.path.join(temp_dir, 'profiles')
+    })
+    log = open(os.path.join(temp_dir, 'server.log'), 'w')
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(BACKEND_DIR, 'src', 'server.py'),
+         '--bind', f'127.0.0.1:{port}', '--workers', str(workers), '--init-db'],
+        cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+    base_url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'Server exited during startup; see {log.name}')
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/api/health')
+            if connection.getresponse().status == 200:
+                return process, base_url
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError('Server did not become healthy in time')
+
+
+def stop_server(process):
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def run_closed_loop(client, workload, mix, recorder, concurrency, duration, warmup, seed):
+    names, weights = list(mix), list(mix.values())
+    start = time.perf_counter()
+    measure_from = start + warmup
+    stop_at = measure_from + duration
+
+    def worker(index):
+        rng = random.Random(seed * 1000 + index)
+        while True:
+            now = time.perf_counter()
+            if now >= stop_at:
+                return
+            name = rng.choices(names, weights)[0]
+            method, path, body = workload.request(name, rng)
+            try:
+                status = client.send(method, path, body)
+            except Exception as e:
+                status = e.__class__.__name__
+            finished = time.perf_counter()
+            if now >= measure_from:
+                recorder.add(name, finished - now, status)
+
+    threads = [threading.Thread(target=worker, args=(index,), daemon=True) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def run_open_loop(client, workload, mix, recorder, rate, duration, warmup, seed, max_in_flight):
+    names, weights = list(mix), list(mix.values())
+    rng = random.Random(seed)
+    dropped = 0
+    in_flight = threading.BoundedSemaphore(max_in_flight)
+
+    def fire(name, method, path, body, scheduled, measured):
+        try:
+            try:
+                status = client.send(method, path, body)
+            except Exception as e:
+                status = e.__class__.__name__
+            if measured:
+                # From the scheduled start, so time spent waiting for a free slot counts too
+                recorder.add(name, time.perf_counter() - scheduled, status)
+        finally:
+            in_flight.release()
+
+    start = time.perf_counter()
+    measure_from = start + warmup
+    stop_at = measure_from + duration
+    scheduled = start
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        while True:
+            scheduled += rng.expovariate(rate)
+            if scheduled >= stop_at:
+                break
+            name = rng.choices(names, weights)[0]
+            request = workload.request(name, rng)
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            if not in_flight.acquire(timeout=REQUEST_TIMEOUT):
+                dropped += 1
+                continue
+            executor.submit(fire, name, *request, scheduled, scheduled >= measure_from)
+    return dropped
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='target a running server instead of starting one')
+    parser.add_argument('--workers', type=int, default=1, help='web workers of the started server')
+    parser.add_argument('--mix', default=DEFAULT_MIX,
+                        help='endpoint weights: calculate, report_pdf, report_excel, reference, users_list, users_create')
+    parser.add_argument('--concurrency', type=int, default=8, help='closed loop: clients sending back to back')
+    parser.add_argument('--rate', type=float, help='open loop: mean arrivals per second (overrides --concurrency)')
+    parser.add_argument('--max-in-flight', type=int, default=256, help='open loop: cap on outstanding requests')
+    parser.add_argument('--duration', type=float, default=30.0, help='measured seconds')
+    parser.add_argument('--warmup', type=float, default=5.0, help='seconds run before measuring')
+    parser.add_argument('--profiles', type=int, default=500, help='distinct generated business profiles')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--no-cache', action='store_true', help='send X-Cache-Bypass so every request computes')
+    parser.add_argument('--output', help='write the JSON results here instead of stdout')
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+
+    reference = load_reference_data()
+    rng = random.Random(args.seed)
+    profiles = [generate_profile(rng, reference) for _ in range(args.profiles)]
+
+    with tempfile.TemporaryDirectory(prefix='financial-load-') as temp_dir:
+        process = None
+        base_url = args.url
+        if not base_url:
+            process, base_url = start_server(temp_dir, args.workers)
+        try:
+            client = Client(base_url, {'X-Cache-Bypass': '1'} if args.no_cache else {})
+            recommendations = []
+            if 'report_pdf' in mix or 'report_excel' in mix:
+                # Setup, not measured: reports need each profile's recommendations
+                for profile in profiles:
+                    connection = http.client.HTTPConnection(client.host, client.port, timeout=REQUEST_TIMEOUT)
+                    connection.request('POST', '/api/calculate-recommendations', json.dumps(profile),
+                                       {'Content-Type': 'application/json'})
+                    recommendations.append(json.loads(connection.getresponse().read())['data'])
+                    connection.close()
+            workload = Workload(reference, profiles, recommendations, args.no_cache)
+            recorder = Recorder()
+
+            started_at = time.time()
+            dropped = 0
+            if args.rate:
+                dropped = run_open_loop(client, workload, mix, recorder, args.rate, args.duration,
+                                        args.warmup, args.seed, args.max_in_flight)
+            else:
+                run_closed_loop(client, workload, mix, recorder, args.concurrency, args.duration,
+                                args.warmup, args.seed)
+        finally:
+            if process is not None:
+                stop_server(process)
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=BACKEND_DIR, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    results = {
+        'commit': commit,
+        'startedAt': started_at,
+        'environment': {'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count()},
+        'config': {
+            'mode': 'open' if args.rate else 'closed',
+            'rate': args.rate,
+            'concurrency': None if args.rate else args.concurrency,
+            'durationSeconds': args.duration,
+            'warmupSeconds': args.warmup,
+            'mix': mix,
+            'profiles': args.profiles,
+            'seed': args.seed,
+            'cache': not args.no_cache,
+            'workers': None if args.url else args.workers,
+            'target': args.url or 'local'
+        },
+        'droppedArrivals': dropped
+    }
+    results.update(summarize(recorder, args.duration))
+    output = json.dumps(results, indent=2)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as output_file:
+            output_file.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,311 @@
+"""Micro-benchmarks for the calculator sections and report renderers, with a regression gate.
+
+Times each ``FinancialCalculator.calculate_*`` section (on a prepared
+evaluation context, the way ``generate__recommendations`` calls them),
+``create_context``, ``generate__recommendations`` end to end, and the PDF
+and Excel renderers split into their phases (pdf: story, build; excel:
+sheets, save), on small, medium and huge profiles. Huge profiles have
+hundreds of debts and expense lines and the longest allowed forecast.
+
+Every case also gets a tracemalloc pass: peak traced bytes during one call
+and the blocks it allocated that are still live when it returns (the
+result and anything it cached), from snapshots taken around the call.
+
+Results are compared with a baseline file; the run fails when a case's
+median time is more than ``--threshold`` (default 25%) above its baseline
+median plus a noise band of ``NOISE_SIGMAS`` times the spread measured in
+both runs, or when its peak memory or allocated blocks are more than
+``--threshold`` above the baseline. Baselines are machine-specific: refresh them with
+``--update-baseline`` on the machine that runs the gate.
+
+Usage: python benchmarks/micro_benchmarks.py [--sizes small,medium] [--cases REGEX] [--update-baseline]
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.financial_calculator import FinancialCalculator, SECTIONS
+from src.services.parameter_plans import MAX_FORECAST_MONTHS
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'micro_baseline.json')
+DEFAULT_THRESHOLD = 0.25
+# Timing noise below this is not worth failing a build over
+MIN_REGRESSION_SECONDS = 20e-6
+# Width of the noise band, in robust standard deviations of the round times
+NOISE_SIGMAS = 3.0
+# MAD -> standard deviation for normally distributed rounds
+MAD_SCALE = 1.4826
+# Growth in allocated blocks below this is not worth failing a build over
+MIN_REGRESSION_BLOCKS = 16
+# Keeps tracemalloc's own bookkeeping out of the snapshots
+SNAPSHOT_FILTERS = [tracemalloc.Filter(False, tracemalloc.__file__)]
+
+# size -> (debts, operating expense lines, forecast months)
+SIZES = {
+    'small': (1, 6, 12),
+    'medium': (25, 50, 120),
+    'huge': (500, 2000, MAX_FORECAST_MONTHS)
+}
+
+
+def build_profile(size: str) -> dict:
+    """A deterministic profile; the same size always yields the same input"""
+    debts, expense_lines, months = SIZES[size]
+    return {
+        'industry': 'manufacturing',
+        'employeeCount': 40,
+        'monthlyRevenue': 250000,
+        'currentSavings': 120000,
+        'location': {'country': 'US', 'region': 'CA'},
+        'currency': 'USD',
+        'forecastMonths': months,
+        'operatingExpenses': {f'line{index:04d}': 100000.0 / expense_lines * (1 + index % 7 / 10)
+                              for index in range(expense_lines)},
+        'debtObligations': [
+            {
+                'amount': 5000.0 + 750 * index,
+                'interestRate': 3.0 + index % 17,
+                'monthlyPayment': 150.0 + 20 * (index % 11)
+            }
+            for index in range(debts)
+        ]
+    }
+
+
+class PhaseRecorder:
+    """Stands in for ReportGenerator._phase_done to collect the phase durations of each render"""
+
+    def __init__(self):
+        self.durations = {}
+
+    def __call__(self, report_format: str, phase: str, started: float) -> float:
+        now = time.perf_counter()
+        self.durations.setdefault(f'{report_format}.{phase}', []).append(now - started)
+        return now
+
+
+def build_cases(calculator, report_generator, phases: PhaseRecorder, sizes: list) -> list:
+    """(name, size, function, phase prefix or None) for every benchmark case"""
+    cases = []
+    for size in sizes:
+        profile = build_profile(size)
+        context = calculator.create_context(profile)
+        recommendations = calculator.generate__recommendations(profile)
+        cases.append(('create_context', size, lambda p=profile: calculator.create_context(p), None))
+        for _, method in SECTIONS:
+            # EvaluationContext is computed up front and never written by the sections, so it can be reused
+            function = getattr(calculator, method)
+            cases.append((method, size, lambda f=function, p=profile, c=context: f(p, c), None))
+        cases.append(('generate_recommendations', size,
+                      lambda p=profile: calculator.generate__recommendations(p), None))
+        if report_generator is not None:
+            cases.append(('generate_pdf_report', size,
+                          lambda p=profile, r=recommendations: report_generator.generate_pdf_report(p, r), 'pdf.'))
+            cases.append(('generate_excel_report', size,
+                          lambda p=profile, r=recommendations: report_generator.generate_excel_report(p, r), 'excel.'))
+    return cases
+
+
+def summarize(rounds: list) -> dict:
+    """Best, median and robust spread (scaled median absolute deviation) of per-call round times"""
+    median = statistics.median(rounds)
+    return {
+        'bestSeconds': min(rounds),
+        'medianSeconds': median,
+        'spreadSeconds': MAD_SCALE * statistics.median(abs(value - median) for value in rounds),
+        'rounds': rounds
+    }
+
+
+def time_case(function, phases: PhaseRecorder, phase_prefix: str, repeat: int, min_time: float) -> dict:
+    """Per-call CPU seconds over ``repeat`` rounds, each long enough to time reliably.
+
+    Phases are wall-clock times, as recorded by the report generator.
+    """
+    function()
+    loops = 1
+    while True:
+        started = time.process_time()
+        for _ in range(loops):
+            function()
+        if time.process_time() - started >= min_time or loops >= 1 << 20:
+            break
+        loops *= 2
+    rounds = []
+    phase_rounds = {}
+    for _ in range(repeat):
+        phases.durations = {}
+        started = time.process_time()
+        for _ in range(loops):
+            function()
+        rounds.append((time.process_time() - started) / loops)
+        for phase, durations in phases.durations.items():
+            phase_rounds.setdefault(phase, []).append(sum(durations) / len(durations))
+    result = dict(summarize(rounds), loops=loops)
+    if phase_prefix:
+        result['phases'] = {phase[len(phase_prefix):]: {'bestSeconds': min(values),
+                                                        'medianSeconds': statistics.median(values)}
+                            for phase, values in sorted(phase_rounds.items()) if phase.startswith(phase_prefix)}
+    return result
+
+
+def memory_case(function) -> dict:
+    """Peak traced bytes during one call and the blocks it allocated that are live once it returns"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        result = function()
+        _, peak = tracemalloc.get_traced_memory()
+        gc.collect()
+        after = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+    finally:
+        tracemalloc.stop()
+    del result
+    # Per allocation site, so blocks freed at one site do not hide new ones at another
+    allocated = sum(stat.count_diff for stat in after.compare_to(before, 'traceback') if stat.count_diff > 0)
+    return {'peakBytes': peak - current, 'allocatedBlocks': allocated}
+
+
+def allowed_seconds(result: dict, base: dict, threshold: float) -> float:
+    """Slowest median that still passes: baseline × (1 + threshold) plus the noise of both runs"""
+    # Baselines written before medians were stored only have a best time and no spread
+    base_median = base.get('medianSeconds', base['bestSeconds'])
+    noise = (base.get('spreadSeconds', 0.0) ** 2 + result['spreadSeconds'] ** 2) ** 0.5
+    return base_median * (1 + threshold) + NOISE_SIGMAS * noise
+
+
+def slower(result: dict, base: dict, threshold: float) -> bool:
+    base_median = base.get('medianSeconds', base['bestSeconds'])
+    return (result['medianSeconds'] > allowed_seconds(result, base, threshold)
+            and result['medianSeconds'] - base_median > MIN_REGRESSION_SECONDS)
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Regression messages for cases slower than the allowed median or hungrier (peak bytes, blocks) than baseline × (1 + threshold)"""
+    failures = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if slower(result, base, threshold):
+            base_median = base.get('medianSeconds', base['bestSeconds'])
+            failures.append(f"{key}: median {result['medianSeconds'] * 1e6:.1f} us vs baseline "
+                            f"{base_median * 1e6:.1f} us (+{(result['medianSeconds'] / base_median - 1) * 100:.0f}%, "
+                            f"allowed up to {allowed_seconds(result, base, threshold) * 1e6:.1f} us)")
+        if base.get('peakBytes') and result['peakBytes'] > base['peakBytes'] * (1 + threshold):
+            failures.append(f"{key}: peak {result['peakBytes'] / 1024:.0f} KiB vs baseline "
+                            f"{base['peakBytes'] / 1024:.0f} KiB (+{(result['peakBytes'] / base['peakBytes'] - 1) * 100:.0f}%)")
+        if ('allocatedBlocks' in base
+                and result['allocatedBlocks'] > base['allocatedBlocks'] * (1 + threshold)
+                and result['allocatedBlocks'] - base['allocatedBlocks'] > MIN_REGRESSION_BLOCKS):
+            failures.append(f"{key}: {result['allocatedBlocks']} blocks allocated vs baseline "
+                            f"{base['allocatedBlocks']}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(SIZES), help='comma-separated: ' + ', '.join(SIZES))
+    parser.add_argument('--cases', help='only run cases whose name matches this regular expression')
+    parser.add_argument('--skip-reports', action='store_true', help='leave out the PDF and Excel renderers')
+    parser.add_argument('--repeat', type=int, default=15, help='timed rounds per case')
+    parser.add_argument('--min-time', type=float, default=0.1, help='minimum seconds per timed round')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--threshold', type=float,
+                        default=float(os.getenv('BENCH_REGRESSION_THRESHOLD', DEFAULT_THRESHOLD)),
+                        help='allowed slowdown or memory growth over the baseline, as a fraction')
+    parser.add_argument('--retries', type=int, default=2,
+                        help='times a case that looks slower gets another set of rounds before it counts as a regression')
+    parser.add_argument('--update-baseline', action='store_true', help='store this run as the new baseline')
+    parser.add_argument('--output', help='also write the full results as JSON here')
+    args = parser.parse_args()
+
+    sizes = [size.strip() for size in args.sizes.split(',') if size.strip()]
+    unknown = [size for size in sizes if size not in SIZES]
+    if unknown:
+        parser.error(f"unknown size(s): {', '.join(unknown)}")
+
+    calculator = FinancialCalculator()
+    phases = PhaseRecorder()
+    report_generator = None
+    if not args.skip_reports:
+        from src.services.report_generator import ReportGenerator
+        report_generator = ReportGenerator()
+        report_generator._phase_done = phases
+
+    pattern = re.compile(args.cases) if args.cases else None
+    results = {}
+    functions = {}
+    for name, size, function, phase_prefix in build_cases(calculator, report_generator, phases, sizes):
+        if pattern and not pattern.search(name):
+            continue
+        key = f'{name}[{size}]'
+        functions[key] = (function, phase_prefix)
+        result = time_case(function, phases, phase_prefix, args.repeat, args.min_time)
+        result.update(memory_case(function))
+        results[key] = result
+        phase_text = ''.join(f"  {phase} {timing['medianSeconds'] * 1e3:.2f} ms"
+                             for phase, timing in result.get('phases', {}).items())
+        print(f"{key:45s} {result['medianSeconds'] * 1e6:12.1f} us ±{result['spreadSeconds'] * 1e6:8.1f}  peak {result['peakBytes'] / 1024:9.1f} KiB"
+              f"  blocks {result['allocatedBlocks']:7d}{phase_text}")
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump({'python': platform.python_version(), 'results': results}, output_file, indent=2)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file).get('results', {})
+
+    if args.update_baseline:
+        baseline.update({key: {field: result[field]
+                               for field in ('bestSeconds', 'medianSeconds', 'spreadSeconds', 'peakBytes',
+                                             'allocatedBlocks')}
+                         for key, result in results.items()})
+        with open(args.baseline, 'w') as baseline_file:
+            json.dump({
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'results': dict(sorted(baseline.items()))
+            }, baseline_file, indent=2)
+            baseline_file.write('\n')
+        print(f'Baseline updated: {args.baseline}')
+        return
+
+    if not baseline:
+        print(f'No baseline at {args.baseline}; run with --update-baseline to create one')
+        return
+    missing = sorted(set(results) - set(baseline))
+    if missing:
+        print(f"Not in the baseline: {', '.join(missing)}")
+    for key, result in results.items():
+        # A case that looks slower gets more rounds; the median of all of them counts
+        for _ in range(args.retries):
+            if key not in baseline or not slower(result, baseline[key], args.threshold):
+                break
+            function, phase_prefix = functions[key]
+            retry = time_case(function, phases, phase_prefix, args.repeat, args.min_time)
+            result.update(summarize(result['rounds'] + retry['rounds']))
+    failures = compare(results, baseline, args.threshold)
+    for failure in failures:
+        print(f'FAIL: {failure}')
+    if not failures:
+        print(f'OK (threshold {args.threshold * 100:.0f}%)')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
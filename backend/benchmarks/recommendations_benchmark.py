@@ -0,0 +1,122 @@
+"""Microbenchmark for the /api/calculate-recommendations hot path.
+
+Compares the per-request CPU time of ``generate__recommendations`` (one
+shared evaluation context over compiled parameter plans) with the
+calculator as it was before that change, loaded from git at
+``LEGACY_REVISION``, which walked the raw reference data in every
+``calculate_*`` section. The old calculator predates the progressive tax
+breakdown, so the "before" side computes it too, from the same raw data,
+to compare like for like. Rounds of the two alternate, so drift on a busy
+host hits both alike. Also times the full endpoint through Flask's test
+client, with the result cache bypassed so every request computes.
+
+Usage: python benchmarks/recommendations_benchmark.py [--requests N] [--rounds N]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+import types
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from src.services.financial_calculator import FinancialCalculator
+
+# Parent of "Compile parameter plans and share per-request intermediates"
+LEGACY_REVISION = '836a7b61164312e2a74e69db1980fa7bc2fd00d5'
+
+SAMPLE_PROFILE = {
+    'industry': 'retail',
+    'employeeCount': 12,
+    'monthlyRevenue': 85000,
+    'currentSavings': 40000,
+    'location': {'country': 'DE'},
+    'currency': 'EUR',
+    'operatingExpenses': {
+        'rent': 5000, 'utilities': 800, 'materials': 12000,
+        'marketing': 3000, 'insurance': 900, 'other': 1500
+    },
+    'debtObligations': [
+        {'amount': 50000, 'interestRate': 9.0, 'monthlyPayment': 1200},
+        {'amount': 20000, 'interestRate': 15.0, 'monthlyPayment': 600}
+    ]
+}
+
+
+def load_legacy_calculator(revision: str = LEGACY_REVISION):
+    """The FinancialCalculator class as committed at ``revision``"""
+    source = subprocess.run(
+        ['git', 'show', f'{revision}:./src/services/financial_calculator.py'],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    module = types.ModuleType('legacy_financial_calculator')
+    # Its data directory is resolved relative to the module file
+    module.__file__ = os.path.join(BACKEND_DIR, 'src', 'services', 'financial_calculator.py')
+    exec(compile(source, f'{revision[:7]}:financial_calculator.py', 'exec'), module.__dict__)
+    return module.FinancialCalculator
+
+
+def cpu_per_call(func, requests: int) -> float:
+    """CPU microseconds per call over one round of ``requests`` calls"""
+    start = time.process_time()
+    for _ in range(requests):
+        func()
+    return (time.process_time() - start) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=5000, help='calls per round')
+    parser.add_argument('--rounds', type=int, default=9, help='alternating rounds per side')
+    parser.add_argument('--revision', default=LEGACY_REVISION, help='git revision of the "before" calculator')
+    args = parser.parse_args()
+
+    calculator = FinancialCalculator()
+    legacy = load_legacy_calculator(args.revision)()
+    tax_engine = calculator.tax_engine
+    profile = SAMPLE_PROFILE
+
+    def before_call():
+        result = legacy.generate__recommendations(profile)
+        # What the old code would have needed for the breakdown: its inputs, looked up the old way
+        industry_data = legacy.industry_benchmarks['industries'].get(profile.get('industry', 'technology'), {})
+        location = profile.get('location', {})
+        result['taxPlanning']['taxBreakdown'] = tax_engine.profile_breakdown(
+            location.get('country', 'US'), location.get('region'), profile.get('monthlyRevenue', 0),
+            sum(profile.get('operatingExpenses', {}).values()), profile.get('employeeCount', 0),
+            industry_data.get('averageEmployeeCost', 50000)
+        )
+        return result
+
+    def after_call():
+        return calculator.generate__recommendations(profile)
+
+    for func in (before_call, after_call):
+        cpu_per_call(func, max(args.requests // 10, 1))
+    before_rounds, after_rounds = [], []
+    for _ in range(args.rounds):
+        before_rounds.append(cpu_per_call(before_call, args.requests))
+        after_rounds.append(cpu_per_call(after_call, args.requests))
+    before = statistics.median(before_rounds)
+    after = statistics.median(after_rounds)
+    print(f"pre-change calculator : {before:8.1f} us/request (median of {args.rounds} rounds)")
+    print(f"plans + shared context: {after:8.1f} us/request ({(after / before - 1) * 100:+.0f}% CPU)")
+
+    os.environ.setdefault('APP_URL', 'http://localhost')
+    from src.main import app
+    client = app.test_client()
+    endpoint = min(
+        cpu_per_call(
+            lambda: client.post('/api/calculate-recommendations', json=profile, headers={'X-Cache-Bypass': '1'}),
+            max(args.requests // 10, 1)
+        )
+        for _ in range(3)
+    )
+    print(f"endpoint (test client, uncached): {endpoint:8.1f} us/request")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""Cold-start budget check for the API process.
+
+Starts fresh interpreters that import ``src.main``, build the app with
+``create_app`` and answer /api/health and /api/calculate-recommendations,
+timing each step. Exits non-zero when the median time to the first response
+exceeds the budget, or when any of the report libraries (ReportLab,
+openpyxl, Pillow) were imported without a report being requested.
+
+Usage: python benchmarks/startup_budget.py [--runs N] [--budget-ms MS]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BUDGET_MS = 1500.0
+# Only a report request (or an explicit warm-up) may load these
+REPORT_MODULES = ('reportlab', 'openpyxl', 'PIL')
+
+# Runs in a fresh interpreter per sample so nothing is already imported
+PROBE = r'''
+import json, os, sys, time
+start = time.perf_counter()
+sys.path.insert(0, os.getcwd())
+import src.main
+imported = time.perf_counter()
+app = src.main.create_app({'SQLALCHEMY_DATABASE_URI': sys.argv[1], 'APP_URL': 'http://localhost'})
+src.main.init_db(app)
+created = time.perf_counter()
+client = app.test_client()
+assert client.get('/api/health').status_code == 200
+first = time.perf_counter()
+response = client.post('/api/calculate-recommendations', json={
+    'industry': 'retail', 'employeeCount': 12, 'monthlyRevenue': 85000, 'location': {'country': 'US'}
+})
+assert response.status_code == 200, response.get_data(as_text=True)
+calculated = time.perf_counter()
+print(json.dumps({
+    'importMs': (imported - start) * 1000,
+    'createAppMs': (created - imported) * 1000,
+    'firstResponseMs': (first - start) * 1000,
+    'firstCalculationMs': (calculated - first) * 1000,
+    'reportModules': sorted({name.split('.')[0] for name in sys.modules} & set(sys.argv[2].split(',')))
+}))
+'''
+
+
+def sample(database_uri: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE, database_uri, ','.join(REPORT_MODULES)],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=float(os.getenv('STARTUP_BUDGET_MS', DEFAULT_BUDGET_MS)),
+                        help='maximum median time from interpreter start to the first response')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        database_uri = 'sqlite:///' + os.path.join(temp_dir, 'startup.db')
+        # The first run creates the schema and warms the OS page cache; it is not counted
+        sample(database_uri)
+        samples = [sample(database_uri) for _ in range(args.runs)]
+
+    medians = {key: statistics.median(s[key] for s in samples)
+               for key in ('importMs', 'createAppMs', 'firstResponseMs', 'firstCalculationMs')}
+    for key, value in medians.items():
+        print(f"{key:20s}: {value:8.1f} ms")
+
+    failures = []
+    if medians['firstResponseMs'] > args.budget_ms:
+        failures.append(f"first response took {medians['firstResponseMs']:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    loaded = sorted({name for s in samples for name in s['reportModules']})
+    if loaded:
+        failures.append(f"report libraries imported without a report request: {', '.join(loaded)}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print('OK')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
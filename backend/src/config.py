@@ -0,0 +1,53 @@
+import os
+from typing import Dict, Any
+
+# Setting -> (default, type). Each one can be set in the environment (or .env)
+# and overridden again by the dict passed to create_app.
+DEFAULTS = {
+    'SECRET_KEY': ('default_secret_key', str),
+    'APP_URL': (None, str),
+    'SQLALCHEMY_DATABASE_URI': (f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}", str),
+    'DB_POOL_SIZE': (10, int),
+    'DB_MAX_OVERFLOW': (10, int),
+    'SQLITE_BUSY_TIMEOUT_MS': (5000, int),
+    'REFERENCE_DATA_DIR': (None, str),
+    'REFERENCE_DATA_CHECK_INTERVAL': (5.0, float),
+    'REFERENCE_CACHE_MAX_AGE': (300, int),
+    'SIMULATION_WORKERS': (1, int),
+    'RESULT_CACHE_SIZE': (1024, int),
+    'RESULT_CACHE_TTL': (300.0, float),
+    'REPORT_CACHE_DIR': (None, str),
+    'REPORT_CACHE_MAX_BYTES': (512 * 1024 * 1024, int),
+    'REPORT_SPOOL_DIR': (None, str),
+    'REPORT_WORKERS': (None, int),
+    'REPORT_RETENTION_SECONDS': (3600.0, float),
+    'REPORT_QUEUE_SIZE': (64, int),
+    # Unset uses forkserver (spawn where that is unavailable), never fork
+    'REPORT_START_METHOD': (None, str),
+    'REPORT_TIMEOUT_SECONDS': (120.0, float),
+    'BULK_REPORT_MAX_PROFILES': (1000, int),
+    'METRICS_DIR': (None, str),
+    'METRICS_FLUSH_INTERVAL': (1.0, float),
+    'PROFILE_DIR': (None, str),
+    'PROFILE_ADMIN_TOKEN': (None, str),
+    'PROFILE_SAMPLE_RATE': (0.0, float),
+    'PROFILE_SAMPLE_INTERVAL': (0.001, float),
+    'PROFILE_MAX_CAPTURES': (50, int),
+    'PROFILE_MAX_BYTES': (50 * 1024 * 1024, int),
+    'COMPRESSION_MIN_BYTES': (1024, int),
+    'COMPRESSION_GZIP_LEVEL': (6, int),
+    'COMPRESSION_BROTLI_QUALITY': (5, int),
+    'ADMISSION_QUEUE_TIMEOUT': (5.0, float),
+    # endpoint=concurrent[:queued[:deadline]],... on top of the defaults; 0 removes a limit
+    'ADMISSION_LIMITS': (None, str)
+}
+
+
+def load_config(overrides: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Application settings from the environment, with explicit overrides applied last"""
+    config = {}
+    for key, (default, cast) in DEFAULTS.items():
+        value = os.getenv(key)
+        config[key] = cast(value) if value not in (None, '') else default
+    config.update(overrides or {})
+    return config
@@ -3,46 +3,106 @@ import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
+from typing import Dict, Any
 from flask import Flask, send_from_directory
 from flask_cors import CORS
+from sqlalchemy.engine import make_url
+from src.config import load_config
 from src.models.user import db
 from src.routes.user import user_bp
 from src.routes.financial import financial_bp
+from src.routes.history import history_bp
+from src.routes.profiling import profiling_bp
+from src.services.app_services import AppServices, EXTENSION_KEY
+from src.services import admission, compression, metrics, request_profiler
 from dotenv import load_dotenv
 
-app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
-app.config['SECRET_KEY'] = os.getenv("SECRET_KEY", "default_secret_key")
-
-# Enable CORS for all routes
-load_dotenv()
-CORS(app, origins=os.getenv("APP_URL"))
-
-app.register_blueprint(user_bp, url_prefix='/api')
-app.register_blueprint(financial_bp, url_prefix='/api')
-
-# uncomment if you need to use database
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db.init_app(app)
-with app.app_context():
-    db.create_all()
-
-@app.route('/', defaults={'path': ''})
-@app.route('/<path:path>')
-def serve(path):
-    static_folder_path = app.static_folder
-    if static_folder_path is None:
-            return "Static folder not configured", 404
-
-    if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-        return send_from_directory(static_folder_path, path)
-    else:
-        index_path = os.path.join(static_folder_path, 'index.html')
-        if os.path.exists(index_path):
-            return send_from_directory(static_folder_path, 'index.html')
+def create_app(config: Dict[str, Any] = None) -> Flask:
+    """Build a configured application; entries in config override environment settings"""
+    load_dotenv()
+    app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+    app.config.update(load_config(config))
+
+    # Enable CORS for all routes
+    CORS(app, origins=app.config['APP_URL'])
+
+    app.register_blueprint(user_bp, url_prefix='/api')
+    app.register_blueprint(financial_bp, url_prefix='/api')
+    app.register_blueprint(history_bp, url_prefix='/api')
+    app.register_blueprint(profiling_bp, url_prefix='/api')
+
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Pooled connections (the WAL PRAGMAs are set per connection in models/user.py)
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', _engine_options(app.config))
+    db.init_app(app)
+
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Create the database tables"""
+        init_db(app)
+
+    app.extensions[EXTENSION_KEY] = AppServices(app.config)
+    metrics.init_app(app)
+    admission.init_app(app, app.extensions[EXTENSION_KEY].admission)
+    request_profiler.init_app(app, app.extensions[EXTENSION_KEY].profiler)
+    compression.init_app(app, app.extensions[EXTENSION_KEY].compressor)
+
+    @app.route('/', defaults={'path': ''})
+    @app.route('/<path:path>')
+    def serve(path):
+        static_folder_path = app.static_folder
+        if static_folder_path is None:
+                return "Static folder not configured", 404
+
+        if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
+            return send_from_directory(static_folder_path, path)
         else:
-            return "index.html not found", 404
+            index_path = os.path.join(static_folder_path, 'index.html')
+            if os.path.exists(index_path):
+                return send_from_directory(static_folder_path, 'index.html')
+            else:
+                return "index.html not found", 404
+
+    return app
+
+def _engine_options(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Pool sizing for file-backed databases; in-memory SQLite uses a StaticPool that takes no sizes"""
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_backend_name() != 'sqlite':
+        return {'pool_size': config['DB_POOL_SIZE'], 'max_overflow': config['DB_MAX_OVERFLOW']}
+    if url.database in (None, '', ':memory:') or url.query.get('mode') == 'memory':
+        return {}
+    return {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        # Writers wait this long for the lock instead of failing with 'database is locked'
+        'connect_args': {'check_same_thread': False, 'timeout': config['SQLITE_BUSY_TIMEOUT_MS'] / 1000}
+    }
+
+def init_db(app: Flask):
+    """Create any missing tables.
+
+    Kept out of create_app so starting a worker never touches the schema; run
+    it once per deployment (`flask --app src.main:create_app init-db`, or
+    `src/server.py --init-db`).
+    """
+    with app.app_context():
+        db.create_all()
+
+_app = None
+
+def __getattr__(name):
+    # `from src.main import app` still works, but importing this module no longer builds an app
+    global _app
+    if name == 'app':
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    # Development server; use src/server.py in production
+    dev_app = create_app()
+    init_db(dev_app)
+    dev_app.run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,150 @@
+import datetime
+from typing import Dict, Any
+from src.models.user import db
+
+
+def _utcnow() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def _normalized(value: Any, case) -> Any:
+    return case(value.strip()) if isinstance(value, str) else value
+
+
+# Snapshot column -> path into the recommendations payload; stored as plain
+# columns so history series never have to load or parse the JSON blobs
+SNAPSHOT_METRICS = {
+    'emergency_fund': ('emergencyFund', 'recommendedAmount'),
+    'emergency_gap': ('emergencyFund', 'currentGap'),
+    'growth_budget': ('growthFund', 'totalBudget'),
+    'benefits_budget': ('employeeBenefitsFund', 'totalBudget'),
+    'tax_liability': ('taxPlanning', 'estimatedTaxLiability'),
+    'total_debt': ('debtManagement', 'totalDebt'),
+    'net_cash_flow': ('cashFlowForecast', 'annualSummary', 'totalNetCashFlow')
+}
+# Response key for each metric column
+METRIC_NAMES = {
+    'monthly_revenue': 'monthlyRevenue',
+    'emergency_fund': 'emergencyFund',
+    'emergency_gap': 'emergencyGap',
+    'growth_budget': 'growthBudget',
+    'benefits_budget': 'benefitsBudget',
+    'tax_liability': 'taxLiability',
+    'total_debt': 'totalDebt',
+    'net_cash_flow': 'netCashFlow'
+}
+
+
+class BusinessProfile(db.Model):
+    __tablename__ = 'business_profile'
+    __table_args__ = (
+        db.Index('ix_business_profile_user_id_id', 'user_id', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False, index=True)
+    name = db.Column(db.String(120))
+    industry = db.Column(db.String(50), nullable=False, index=True)
+    country = db.Column(db.String(10), index=True)
+    currency = db.Column(db.String(3))
+    employee_count = db.Column(db.Integer)
+    monthly_revenue = db.Column(db.Float)
+    business_data = db.deferred(db.Column(db.JSON, nullable=False))
+    created_at = db.Column(db.DateTime, nullable=False, default=_utcnow, index=True)
+    updated_at = db.Column(db.DateTime, nullable=False, default=_utcnow, onupdate=_utcnow)
+
+    user = db.relationship('User', backref=db.backref(
+        'profiles', lazy='dynamic', cascade='all, delete-orphan', passive_deletes=True
+    ))
+
+    def __repr__(self):
+        return f'<BusinessProfile {self.id} {self.name}>'
+
+    @staticmethod
+    def columns_from(business_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Indexed/summary column values taken from a businessData payload.
+
+        Industry is stored lowercase and country and currency uppercase, the
+        forms the list filters compare against with plain (indexed) equality.
+        """
+        return {
+            'industry': _normalized(business_data.get('industry'), str.lower),
+            'country': _normalized((business_data.get('location') or {}).get('country'), str.upper),
+            'currency': _normalized(business_data.get('currency'), str.upper),
+            'employee_count': business_data.get('employeeCount'),
+            'monthly_revenue': business_data.get('monthlyRevenue'),
+            'business_data': business_data
+        }
+
+    def to_dict(self, include_data: bool = False):
+        result = {
+            'id': self.id,
+            'userId': self.user_id,
+            'name': self.name,
+            'industry': self.industry,
+            'country': self.country,
+            'currency': self.currency,
+            'employeeCount': self.employee_count,
+            'monthlyRevenue': self.monthly_revenue,
+            'createdAt': self.created_at.isoformat(),
+            'updatedAt': self.updated_at.isoformat()
+        }
+        if include_data:
+            result['businessData'] = self.business_data
+        return result
+
+
+class RecommendationSnapshot(db.Model):
+    __tablename__ = 'recommendation_snapshot'
+    __table_args__ = (
+        # Keyset pages and metric series walk a profile's (or user's) snapshots by id
+        db.Index('ix_recommendation_snapshot_profile_id_id', 'profile_id', 'id'),
+        db.Index('ix_recommendation_snapshot_user_id_id', 'user_id', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    profile_id = db.Column(db.Integer, db.ForeignKey('business_profile.id', ondelete='CASCADE'), nullable=False)
+    # Denormalized from the profile so per-user history needs no join
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    data_version = db.Column(db.String(32))
+    created_at = db.Column(db.DateTime, nullable=False, default=_utcnow, index=True)
+    monthly_revenue = db.Column(db.Float)
+    emergency_fund = db.Column(db.Float)
+    emergency_gap = db.Column(db.Float)
+    growth_budget = db.Column(db.Float)
+    benefits_budget = db.Column(db.Float)
+    tax_liability = db.Column(db.Float)
+    total_debt = db.Column(db.Float)
+    net_cash_flow = db.Column(db.Float)
+    recommendations = db.deferred(db.Column(db.JSON, nullable=False))
+
+    profile = db.relationship('BusinessProfile', backref=db.backref(
+        'snapshots', lazy='dynamic', cascade='all, delete-orphan', passive_deletes=True
+    ))
+
+    def __repr__(self):
+        return f'<RecommendationSnapshot {self.id} profile={self.profile_id}>'
+
+    @staticmethod
+    def columns_from(business_data: Dict[str, Any], recommendations: Dict[str, Any]) -> Dict[str, Any]:
+        """Metric column values extracted once, at write time"""
+        columns = {'monthly_revenue': business_data.get('monthlyRevenue'), 'recommendations': recommendations}
+        for column, path in SNAPSHOT_METRICS.items():
+            value = recommendations
+            for key in path:
+                value = value.get(key) if isinstance(value, dict) else None
+            columns[column] = value
+        return columns
+
+    def to_dict(self, include_recommendations: bool = False):
+        result = {
+            'id': self.id,
+            'profileId': self.profile_id,
+            'userId': self.user_id,
+            'dataVersion': self.data_version,
+            'createdAt': self.created_at.isoformat(),
+            'metrics': {name: getattr(self, column) for column, name in METRIC_NAMES.items()}
+        }
+        if include_recommendations:
+            result['recommendations'] = self.recommendations
+        return result
@@ -1,19 +1,113 @@
-from flask import Blueprint, request, jsonify, send_file
-from src.services.financial_calculator import FinancialCalculator
-from src.services.report_generator import ReportGenerator
+from flask import Blueprint, request, jsonify, send_file, Response, stream_with_context, g, current_app
+from werkzeug.wsgi import ClosingIterator
+from src.services.app_services import get_services
+from src.services.metrics import metrics, PROMETHEUS_CONTENT_TYPE
+from src.services.request_profiler import profiling_active
+from src.services.report_jobs import ReportQueueFull, REPORT_FORMATS, prepare_report
+from src.services.report_archive import BulkReportArchive, BULK_FORMATS
+from src.services.result_cache import canonical_key
+from src.services.parameter_plans import MAX_FORECAST_MONTHS
 import json
-import os
 
 # Create blueprint
 financial_bp = Blueprint('financial', __name__)
 
-# Initialize services
-calculator = FinancialCalculator()
-report_generator = ReportGenerator()
+CACHE_BYPASS_HEADER = 'X-Cache-Bypass'
+DATA_VERSION_HEADER = 'X-Data-Version'
+
+def _snapshot():
+    """Reference-data snapshot for the current request, fixed for its whole duration"""
+    if 'calculator' not in g:
+        g.calculator = get_services().reference_data.current()
+    return g.calculator
+
+@financial_bp.after_request
+def add_data_version(response):
+    """Tell clients which reference-data version produced the response"""
+    if 'calculator' in g:
+        response.headers[DATA_VERSION_HEADER] = g.calculator.data_version
+    return response
+
+def _reference_response(serialized):
+    """Serve pre-serialized reference data with its ETag, answering If-None-Match with 304"""
+    response = Response(serialized.body, mimetype='application/json')
+    response.set_etag(serialized.etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config['REFERENCE_CACHE_MAX_AGE']
+    return response.make_conditional(request)
+
+def _cache_bypassed() -> bool:
+    """Whether the client asked to skip the result cache (debugging), or the request is being profiled"""
+    if profiling_active():
+        return True
+    if request.headers.get(CACHE_BYPASS_HEADER, '').lower() in ('1', 'true', 'yes'):
+        return True
+    return 'no-cache' in request.headers.get('Cache-Control', '').lower()
+
+def _is_deterministic(data) -> bool:
+    """Unseeded simulations differ on every call and must not be cached"""
+    simulation = data.get('simulation')
+    return not simulation or (isinstance(simulation, dict) and simulation.get('seed') is not None)
+
+def _forecast_months_error(data):
+    """Validate the optional forecast horizons (forecastMonths and simulation.months)"""
+    simulation = data.get('simulation')
+    horizons = (
+        ('forecastMonths', data.get('forecastMonths')),
+        ('simulation.months', simulation.get('months') if isinstance(simulation, dict) else None)
+    )
+    for field, months in horizons:
+        if months is None:
+            continue
+        if isinstance(months, bool) or not isinstance(months, int) or not 1 <= months <= MAX_FORECAST_MONTHS:
+            return f'{field} must be an integer between 1 and {MAX_FORECAST_MONTHS}'
+    return None
+
+def _sweep_options_error(data):
+    """Validate the sweep's sample count and seed before they reach NumPy"""
+    for field in ('samples', 'seed'):
+        value = data.get(field)
+        if value is None:
+            continue
+        if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+            return f'{field} must be a non-negative integer'
+    return None
+
+def _stream_requested() -> bool:
+    """Whether the client asked for NDJSON streaming instead of one JSON document"""
+    if request.args.get('stream', '').lower() in ('1', 'true', 'ndjson'):
+        return True
+    return 'application/x-ndjson' in request.headers.get('Accept', '')
+
+def _currency_info(calculator, source_currency, target_currency):
+    """Describe a conversion applied to a response"""
+    source_currency = (source_currency or 'USD').upper()
+    target_currency = target_currency.upper()
+    return {
+        'code': target_currency,
+        'symbol': calculator.currency_engine.symbol(target_currency),
+        'sourceCurrency': source_currency,
+        'rate': calculator.currency_engine.rate(source_currency, target_currency)
+    }
+
+def _stream_recommendations(calculator, data, target_currency=None):
+    """Stream recommendation events as newline-delimited JSON"""
+    def generate():
+        try:
+            for event in calculator.stream_recommendations(data):
+                if target_currency:
+                    event['data'] = calculator.convert_currency(event['data'], data.get('currency'), target_currency)
+                yield json.dumps(event) + '\n'
+            yield json.dumps({'type': 'end'}) + '\n'
+        except Exception as e:
+            # Headers are already sent, so errors are reported in-band
+            yield json.dumps({'type': 'error', 'error': str(e)}) + '\n'
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
 
 @financial_bp.route('/calculate-recommendations', methods=['POST'])
 def calculate_recommendations():
     """Calculate  financial recommendations"""
+    calculator = _snapshot()
     try:
         data = request.get_json()
         
@@ -26,30 +120,199 @@ def calculate_recommendations():
             if field not in data:
                 return jsonify({'error': f'Missing required field: {field}'}), 400
         
+        months_error = _forecast_months_error(data)
+        if months_error:
+            return jsonify({'error': months_error}), 400
+        
+        # Optional conversion of every monetary field into another currency
+        target_currency = request.args.get('currency')
+        currency_info = None
+        if target_currency:
+            try:
+                currency_info = _currency_info(calculator, data.get('currency'), target_currency)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+        
+        # Long forecasts can be streamed as they are produced
+        if _stream_requested():
+            return _stream_recommendations(calculator, data, target_currency)
+        
+        # Serve identical profiles from the cache unless bypassed
+        cacheable = _is_deterministic(data)
+        bypass = _cache_bypassed()
+        cache_key = canonical_key(data, calculator.data_version)
+        recommendations = None
+        if cacheable and not bypass:
+            recommendations = get_services().recommendation_cache.get(cache_key)
+        cache_status = 'HIT' if recommendations is not None else ('BYPASS' if bypass or not cacheable else 'MISS')
+        
         # Generate recommendations
-        recommendations = calculator.generate__recommendations(data)
+        if recommendations is None:
+            recommendations = calculator.generate__recommendations(data)
+            if cacheable:
+                get_services().recommendation_cache.put(cache_key, recommendations)
+        
+        body = {'success': True}
+        if currency_info:
+            # Cached results stay in the business currency; convert a copy
+            body['data'] = calculator.convert_currency(recommendations, data.get('currency'), target_currency)
+            body['currency'] = currency_info
+        else:
+            body['data'] = recommendations
+        
+        response = jsonify(body)
+        response.headers['X-Cache'] = cache_status
+        return response
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@financial_bp.route('/calculate-recommendations/batch', methods=['POST'])
+def calculate_recommendations_batch():
+    """Calculate financial recommendations for many business profiles at once"""
+    calculator = _snapshot()
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        profiles = data.get('profiles')
+        if not isinstance(profiles, list):
+            return jsonify({'error': 'Field "profiles" must be a list of business profiles'}), 400
+        
+        # Validate required fields on every profile
+        required_fields = ['industry', 'employeeCount', 'monthlyRevenue']
+        for index, profile in enumerate(profiles):
+            if not isinstance(profile, dict):
+                return jsonify({'error': f'Profile {index} must be an object'}), 400
+            for field in required_fields:
+                if field not in profile:
+                    return jsonify({'error': f'Missing required field: {field} (profile {index})'}), 400
+            months_error = _forecast_months_error(profile)
+            if months_error:
+                return jsonify({'error': f'{months_error} (profile {index})'}), 400
+        
+        # Generate recommendations for the whole portfolio
+        recommendations = calculator.generate_recommendations_batch(profiles)
         
         return jsonify({
             'success': True,
+            'count': len(recommendations),
             'data': recommendations
         })
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@financial_bp.route('/calculate-recommendations/sweep', methods=['POST'])
+def calculate_recommendations_sweep():
+    """Evaluate recommendations over ranges of inputs (what-if scenarios)"""
+    calculator = _snapshot()
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        business_data = data.get('businessData')
+        if not isinstance(business_data, dict):
+            return jsonify({'error': 'Missing business data'}), 400
+        
+        # Validate required fields
+        required_fields = ['industry', 'employeeCount', 'monthlyRevenue']
+        for field in required_fields:
+            if field not in business_data:
+                return jsonify({'error': f'Missing required field: {field}'}), 400
+        
+        options_error = _sweep_options_error(data)
+        if options_error:
+            return jsonify({'error': options_error}), 400
+        
+        try:
+            sweep = calculator.sweep_recommendations(
+                business_data,
+                data.get('axes'),
+                mode=data.get('mode', 'grid'),
+                samples=data.get('samples', 1000),
+                seed=data.get('seed'),
+                metrics=data.get('metrics')
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify({
+            'success': True,
+            'data': sweep
+        })
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@financial_bp.route('/debt-payoff', methods=['POST'])
+def simulate_debt_payoff():
+    """Compare month-by-month debt payoff strategies"""
+    calculator = _snapshot()
+    try:
+        data = request.get_json()
+
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+
+        debt_obligations = data.get('debtObligations')
+        if not isinstance(debt_obligations, list) or not debt_obligations:
+            return jsonify({'error': 'Missing required field: debtObligations'}), 400
+
+        try:
+            payoff_plan = calculator.simulate_debt_payoff(data, data.get('options'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        return jsonify({
+            'success': True,
+            'data': payoff_plan
+        })
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@financial_bp.route('/tax-liability', methods=['POST'])
+def evaluate_tax_liability():
+    """Evaluate tax liability for many entities in one vectorized pass"""
+    calculator = _snapshot()
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        items = data.get('items')
+        if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+            return jsonify({'error': 'Field "items" must be a list of objects'}), 400
+        
+        # Each item: country, optional region, annualProfit, annualPayroll, valueAdded
+        liabilities = calculator.tax_engine.evaluate_batch(items) if items else []
+        
+        return jsonify({
+            'success': True,
+            'count': len(liabilities),
+            'data': liabilities
+        })
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @financial_bp.route('/tax-rates/<country>', methods=['GET'])
 def get_tax_rates(country):
     """Get tax rates for a specific country"""
+    calculator = _snapshot()
     try:
-        tax_data = calculator.tax_rates['countries'].get(country.upper())
+        serialized = calculator.reference_responses.tax_rate(country)
         
-        if not tax_data:
+        if not serialized:
             return jsonify({'error': 'Country not found'}), 404
         
-        return jsonify({
-            'success': True,
-            'data': tax_data
-        })
+        return _reference_response(serialized)
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -57,16 +320,14 @@ def get_tax_rates(country):
 @financial_bp.route('/industry-benchmarks/<industry>', methods=['GET'])
 def get_industry_benchmarks(industry):
     """Get benchmarks for a specific industry"""
+    calculator = _snapshot()
     try:
-        industry_data = calculator.industry_benchmarks['industries'].get(industry.lower())
+        serialized = calculator.reference_responses.industry_benchmark(industry)
         
-        if not industry_data:
+        if not serialized:
             return jsonify({'error': 'Industry not found'}), 404
         
-        return jsonify({
-            'success': True,
-            'data': industry_data
-        })
+        return _reference_response(serialized)
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -74,16 +335,14 @@ def get_industry_benchmarks(industry):
 @financial_bp.route('/exchange-rates/<base_currency>', methods=['GET'])
 def get_exchange_rates(base_currency):
     """Get exchange rates for a base currency"""
+    calculator = _snapshot()
     try:
-        currency_data = calculator.currencies['currencies'].get(base_currency.upper())
+        serialized = calculator.reference_responses.exchange_rate(base_currency)
         
-        if not currency_data:
+        if not serialized:
             return jsonify({'error': 'Currency not found'}), 404
         
-        return jsonify({
-            'success': True,
-            'data': currency_data
-        })
+        return _reference_response(serialized)
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -91,19 +350,9 @@ def get_exchange_rates(base_currency):
 @financial_bp.route('/countries', methods=['GET'])
 def get_countries():
     """Get list of supported countries"""
+    calculator = _snapshot()
     try:
-        countries = []
-        for code, data in calculator.tax_rates['countries'].items():
-            countries.append({
-                'code': code,
-                'name': data['name'],
-                'currency': data['currency']
-            })
-        
-        return jsonify({
-            'success': True,
-            'data': countries
-        })
+        return _reference_response(calculator.reference_responses.countries)
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -111,19 +360,9 @@ def get_countries():
 @financial_bp.route('/industries', methods=['GET'])
 def get_industries():
     """Get list of supported industries"""
+    calculator = _snapshot()
     try:
-        industries = []
-        for code, data in calculator.industry_benchmarks['industries'].items():
-            industries.append({
-                'code': code,
-                'name': data['name'],
-                'riskLevel': data['riskLevel']
-            })
-        
-        return jsonify({
-            'success': True,
-            'data': industries
-        })
+        return _reference_response(calculator.reference_responses.industries)
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -131,70 +370,204 @@ def get_industries():
 @financial_bp.route('/currencies', methods=['GET'])
 def get_currencies():
     """Get list of supported currencies"""
+    calculator = _snapshot()
     try:
-        currencies = []
-        for code, data in calculator.currencies['currencies'].items():
-            currencies.append({
-                'code': code,
-                'name': data['name'],
-                'symbol': data['symbol']
-            })
-        
-        return jsonify({
-            'success': True,
-            'data': currencies
-        })
+        return _reference_response(calculator.reference_responses.currencies)
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@financial_bp.route('/bootstrap', methods=['GET'])
+def get_bootstrap():
+    """Get countries, industries and currencies for the business form in one response"""
+    calculator = _snapshot()
+    try:
+        return _reference_response(calculator.reference_responses.bootstrap)
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _send_report(path, report_format):
+    """Send a spooled report file as a download"""
+    extension, mimetype = REPORT_FORMATS[report_format]
+    return send_file(
+        path,
+        as_attachment=True,
+        download_name=f'financial_planning_report{extension}',
+        mimetype=mimetype
+    )
+
 @financial_bp.route('/generate-report', methods=['POST'])
 def generate_report():
     """Generate downloadable report (PDF or Excel)"""
+    calculator = _snapshot()
     try:
         data = request.get_json()
         
         if not data:
             return jsonify({'error': 'No data provided'}), 400
         
-        business_data = data.get('businessData', {})
-        recommendations = data.get('recommendations', {})
-        report_format = data.get('format', 'pdf').lower()
+        try:
+            report = prepare_report(calculator, data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        if not business_data or not recommendations:
-            return jsonify({'error': 'Missing business data or recommendations'}), 400
+        # Same worker pool as the job API, waited on in place; a profiled
+        # request renders on its own thread so the profile shows the rendering
+        report_jobs = get_services().report_jobs
+        job = report_jobs.run(
+            *report, timeout=current_app.config['REPORT_TIMEOUT_SECONDS'], use_cache=not _cache_bypassed(),
+            inline=profiling_active()
+        )
+        response = _send_report(report_jobs.path(job.job_id, report[0]), report[0])
+        # Nobody polls for this job; cached artifacts are hard links, so the spooled file can go
+        # once sent. A passthrough body is closed by the server, not Response.close, so
+        # call_on_close would never fire: the body itself carries the callback.
+        response.response = ClosingIterator(response.response, lambda: report_jobs.discard(job.job_id))
+        return response
+    
+    except TimeoutError:
+        return jsonify({'error': 'Report generation timed out'}), 504
+    except ReportQueueFull as e:
+        return jsonify({'error': str(e)}), 503
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@financial_bp.route('/reports', methods=['POST'])
+def submit_report():
+    """Queue a report for rendering; poll its status and download it when completed"""
+    calculator = _snapshot()
+    try:
+        data = request.get_json()
         
-        if report_format == 'pdf':
-            buffer = report_generator.generate_pdf_report(business_data, recommendations)
-            return send_file(
-                buffer,
-                as_attachment=True,
-                download_name='financial_planning_report.pdf',
-                mimetype='application/pdf'
-            )
-        elif report_format == 'excel':
-            buffer = report_generator.generate_excel_report(business_data, recommendations)
-            return send_file(
-                buffer,
-                as_attachment=True,
-                download_name='financial_planning_report.xlsx',
-                mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            )
-        else:
-            return jsonify({'error': 'Unsupported format. Use "pdf" or "excel"'}), 400
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        try:
+            report = prepare_report(calculator, data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        report_jobs = get_services().report_jobs
+        job = report_jobs.submit(*report, use_cache=not _cache_bypassed())
+        status = report_jobs.status(job.job_id)
+        status['statusUrl'] = f'{request.script_root}/api/reports/{job.job_id}'
+        status['downloadUrl'] = f'{status["statusUrl"]}/download'
+        response = jsonify({
+            'success': True,
+            'data': status
+        })
+        response.headers['Location'] = status['statusUrl']
+        return response, 202
+    
+    except ReportQueueFull as e:
+        return jsonify({'error': str(e)}), 503
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@financial_bp.route('/reports/bulk', methods=['POST'])
+def generate_bulk_reports():
+    """Render reports for many business profiles, streamed back as one ZIP archive"""
+    calculator = _snapshot()
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        profiles = data.get('profiles')
+        if not isinstance(profiles, list) or not profiles:
+            return jsonify({'error': 'Field "profiles" must be a non-empty list'}), 400
+        max_profiles = current_app.config['BULK_REPORT_MAX_PROFILES']
+        if len(profiles) > max_profiles:
+            return jsonify({'error': f'At most {max_profiles} profiles per request'}), 400
+        for index, profile in enumerate(profiles):
+            if not isinstance(profile, dict) or not isinstance(profile.get('businessData'), dict):
+                return jsonify({'error': f'Profile {index} must be an object with businessData'}), 400
+        
+        formats = BULK_FORMATS.get(str(data.get('format', 'pdf')).lower())
+        if formats is None:
+            return jsonify({'error': 'Unsupported format. Use "pdf", "excel" or "both"'}), 400
+        
+        # Entries are written as soon as each worker finishes; failures go in manifest.json
+        archive = BulkReportArchive(calculator, get_services().report_jobs)
+        return Response(
+            stream_with_context(archive.stream(profiles, formats, data.get('currency'))),
+            mimetype='application/zip',
+            headers={'Content-Disposition': 'attachment; filename=financial_planning_reports.zip'}
+        )
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@financial_bp.route('/reports/<job_id>', methods=['GET'])
+def get_report_status(job_id):
+    """Get the status of a queued report"""
+    try:
+        status = get_services().report_jobs.status(job_id)
+        if status is None:
+            return jsonify({'error': 'Report job not found or expired'}), 404
+        return jsonify({
+            'success': True,
+            'data': status
+        })
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@financial_bp.route('/reports/<job_id>/download', methods=['GET'])
+def download_report(job_id):
+    """Download a completed report"""
+    try:
+        report_jobs = get_services().report_jobs
+        artifact = report_jobs.find_artifact(job_id)
+        if artifact is None:
+            status = report_jobs.status(job_id)
+            if status is None:
+                return jsonify({'error': 'Report job not found or expired'}), 404
+            if status['status'] == 'failed':
+                return jsonify({'error': status['error']}), 500
+            return jsonify({'error': 'Report is not ready yet', 'data': status}), 409
+        return _send_report(artifact['path'], artifact['format'])
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@financial_bp.route('/cache-stats', methods=['GET'])
+def get_cache_stats():
+    """Get recommendation cache counters"""
+    calculator = _snapshot()
+    services = get_services()
+    stats = services.recommendation_cache.stats()
+    stats['dataVersion'] = calculator.data_version
+    if services.report_cache is not None:
+        stats['reportCache'] = services.report_cache.stats()
+    return jsonify({
+        'success': True,
+        'data': stats
+    })
+
 @financial_bp.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
+    services = get_services()
     return jsonify({
         'success': True,
         'message': 'Financial Planning API is running',
-        'version': '1.0.0'
+        'version': '1.0.0',
+        'referenceData': services.reference_data.status(),
+        'reportJobs': services.report_jobs.stats(),
+        'admission': services.admission.stats()
     })
 
+@financial_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Request, calculator and report metrics of every worker process, in Prometheus text format"""
+    try:
+        return Response(metrics.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # Error handlers
 @financial_bp.errorhandler(404)
 def not_found(error):
@@ -0,0 +1,308 @@
+from flask import Blueprint, request, jsonify
+from sqlalchemy import insert, select
+from src.models.user import User, db
+from src.models.financial import BusinessProfile, RecommendationSnapshot, METRIC_NAMES
+from src.services.app_services import get_services
+import datetime
+
+history_bp = Blueprint('history', __name__)
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+MAX_SERIES_POINTS = 5000
+REQUIRED_FIELDS = ['industry', 'employeeCount', 'monthlyRevenue']
+# Snapshot listings read only these columns, never the recommendations blob
+SNAPSHOT_SUMMARY_COLUMNS = [
+    RecommendationSnapshot.id, RecommendationSnapshot.profile_id, RecommendationSnapshot.user_id,
+    RecommendationSnapshot.data_version, RecommendationSnapshot.created_at
+] + [getattr(RecommendationSnapshot, column) for column in METRIC_NAMES]
+
+def _page_args(max_limit=MAX_PAGE_SIZE, default_limit=DEFAULT_PAGE_SIZE):
+    """Parse ?limit= and ?cursor= (the last id of the previous page)"""
+    limit = request.args.get('limit', default_limit, type=int)
+    cursor = request.args.get('cursor', type=int)
+    if limit is None or not 1 <= limit <= max_limit:
+        raise ValueError(f'limit must be an integer between 1 and {max_limit}')
+    return limit, cursor
+
+def _time_arg(name):
+    """Parse an optional ISO 8601 date/datetime query argument"""
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'{name} must be an ISO 8601 date or datetime')
+
+def _business_data_error(business_data):
+    if not isinstance(business_data, dict):
+        return 'businessData must be an object'
+    for field in REQUIRED_FIELDS:
+        if field not in business_data:
+            return f'Missing required field: {field}'
+    return None
+
+def _snapshot_summary(row):
+    return {
+        'id': row.id,
+        'profileId': row.profile_id,
+        'userId': row.user_id,
+        'dataVersion': row.data_version,
+        'createdAt': row.created_at.isoformat(),
+        'metrics': {name: getattr(row, column) for column, name in METRIC_NAMES.items()}
+    }
+
+def _insert_profiles(user_id, entries):
+    """Bulk insert profiles and a snapshot of each one's recommendations in the current session.
+
+    ``entries`` are (name, businessData) pairs; recommendations come from one
+    vectorized batch run. Returns (profile ids, snapshot ids) in input order.
+    """
+    calculator = get_services().reference_data.current()
+    recommendations = calculator.generate_recommendations_batch([business_data for _, business_data in entries])
+    profile_rows = [
+        dict(BusinessProfile.columns_from(business_data), user_id=user_id, name=name)
+        for name, business_data in entries
+    ]
+    profile_ids = list(db.session.scalars(
+        insert(BusinessProfile).returning(BusinessProfile.id, sort_by_parameter_order=True),
+        profile_rows
+    ))
+    snapshot_rows = [
+        dict(RecommendationSnapshot.columns_from(business_data, result),
+             profile_id=profile_id, user_id=user_id, data_version=calculator.data_version)
+        for profile_id, (_, business_data), result in zip(profile_ids, entries, recommendations)
+    ]
+    snapshot_ids = list(db.session.scalars(
+        insert(RecommendationSnapshot).returning(RecommendationSnapshot.id, sort_by_parameter_order=True),
+        snapshot_rows
+    ))
+    return profile_ids, snapshot_ids
+
+@history_bp.route('/users/<int:user_id>/profiles', methods=['POST'])
+def create_profile(user_id):
+    """Save a business profile and a snapshot of its current recommendations"""
+    db.get_or_404(User, user_id)
+    try:
+        data = request.get_json()
+
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+
+        business_data = data.get('businessData')
+        error = _business_data_error(business_data)
+        if error:
+            return jsonify({'error': error}), 400
+
+        profile_ids, snapshot_ids = _insert_profiles(user_id, [(data.get('name'), business_data)])
+        db.session.commit()
+
+        return jsonify({
+            'success': True,
+            'data': {
+                'profile': db.session.get(BusinessProfile, profile_ids[0]).to_dict(),
+                'snapshot': db.session.get(RecommendationSnapshot, snapshot_ids[0]).to_dict(include_recommendations=True)
+            }
+        }), 201
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@history_bp.route('/users/<int:user_id>/profiles/batch', methods=['POST'])
+def create_profiles_batch(user_id):
+    """Save many business profiles, with recommendation snapshots, in one transaction"""
+    db.get_or_404(User, user_id)
+    try:
+        data = request.get_json()
+
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+
+        profiles = data.get('profiles')
+        if not isinstance(profiles, list) or not profiles:
+            return jsonify({'error': 'Field "profiles" must be a non-empty list'}), 400
+
+        entries = []
+        for index, profile in enumerate(profiles):
+            if not isinstance(profile, dict):
+                return jsonify({'error': f'Profile {index} must be an object'}), 400
+            error = _business_data_error(profile.get('businessData'))
+            if error:
+                return jsonify({'error': f'{error} (profile {index})'}), 400
+            entries.append((profile.get('name'), profile['businessData']))
+
+        profile_ids, snapshot_ids = _insert_profiles(user_id, entries)
+        db.session.commit()
+
+        return jsonify({
+            'success': True,
+            'count': len(profile_ids),
+            'data': [
+                {'profileId': profile_id, 'snapshotId': snapshot_id}
+                for profile_id, snapshot_id in zip(profile_ids, snapshot_ids)
+            ]
+        }), 201
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@history_bp.route('/users/<int:user_id>/profiles', methods=['GET'])
+def list_profiles(user_id):
+    """Page through a user's business profiles, newest first"""
+    try:
+        try:
+            limit, cursor = _page_args()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        query = BusinessProfile.query.filter(BusinessProfile.user_id == user_id)
+        industry = request.args.get('industry')
+        if industry:
+            query = query.filter(BusinessProfile.industry == industry.strip().lower())
+        country = request.args.get('country')
+        if country:
+            query = query.filter(BusinessProfile.country == country.strip().upper())
+        if cursor is not None:
+            query = query.filter(BusinessProfile.id < cursor)
+        profiles = query.order_by(BusinessProfile.id.desc()).limit(limit + 1).all()
+
+        return jsonify({
+            'success': True,
+            'data': [profile.to_dict() for profile in profiles[:limit]],
+            'nextCursor': profiles[limit - 1].id if len(profiles) > limit else None
+        })
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@history_bp.route('/profiles/<int:profile_id>', methods=['GET'])
+def get_profile(profile_id):
+    """Get a business profile including its full businessData"""
+    profile = db.get_or_404(BusinessProfile, profile_id)
+    return jsonify({
+        'success': True,
+        'data': profile.to_dict(include_data=True)
+    })
+
+@history_bp.route('/profiles/<int:profile_id>/snapshots', methods=['POST'])
+def create_snapshot(profile_id):
+    """Recalculate a saved profile's recommendations and store them as a new snapshot"""
+    profile = db.get_or_404(BusinessProfile, profile_id)
+    try:
+        data = request.get_json(silent=True) or {}
+
+        # Optionally update the profile first, e.g. with this month's revenue
+        business_data = data.get('businessData')
+        if business_data is not None:
+            error = _business_data_error(business_data)
+            if error:
+                return jsonify({'error': error}), 400
+            for column, value in BusinessProfile.columns_from(business_data).items():
+                setattr(profile, column, value)
+        business_data = profile.business_data
+
+        calculator = get_services().reference_data.current()
+        snapshot = RecommendationSnapshot(
+            profile_id=profile.id,
+            user_id=profile.user_id,
+            data_version=calculator.data_version,
+            **RecommendationSnapshot.columns_from(business_data, calculator.generate__recommendations(business_data))
+        )
+        db.session.add(snapshot)
+        db.session.commit()
+
+        return jsonify({
+            'success': True,
+            'data': snapshot.to_dict(include_recommendations=True)
+        }), 201
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@history_bp.route('/profiles/<int:profile_id>/snapshots', methods=['GET'])
+def list_snapshots(profile_id):
+    """Page through a profile's snapshots, newest first, without loading the recommendation blobs"""
+    try:
+        try:
+            limit, cursor = _page_args()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        query = select(*SNAPSHOT_SUMMARY_COLUMNS).where(RecommendationSnapshot.profile_id == profile_id)
+        if cursor is not None:
+            query = query.where(RecommendationSnapshot.id < cursor)
+        rows = db.session.execute(query.order_by(RecommendationSnapshot.id.desc()).limit(limit + 1)).all()
+
+        return jsonify({
+            'success': True,
+            'data': [_snapshot_summary(row) for row in rows[:limit]],
+            'nextCursor': rows[limit - 1].id if len(rows) > limit else None
+        })
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@history_bp.route('/profiles/<int:profile_id>/snapshots/<int:snapshot_id>', methods=['GET'])
+def get_snapshot(profile_id, snapshot_id):
+    """Get one snapshot including its full recommendations"""
+    snapshot = db.get_or_404(RecommendationSnapshot, snapshot_id)
+    if snapshot.profile_id != profile_id:
+        return jsonify({'error': 'Snapshot not found'}), 404
+    return jsonify({
+        'success': True,
+        'data': snapshot.to_dict(include_recommendations=True)
+    })
+
+@history_bp.route('/profiles/<int:profile_id>/metrics', methods=['GET'])
+def get_profile_metrics(profile_id):
+    """Key metrics of a profile's snapshots as a compact, oldest-first time series"""
+    try:
+        limit = request.args.get('limit', MAX_SERIES_POINTS, type=int)
+        if limit is None or not 1 <= limit <= MAX_SERIES_POINTS:
+            return jsonify({'error': f'limit must be an integer between 1 and {MAX_SERIES_POINTS}'}), 400
+
+        names = request.args.get('metrics')
+        columns = list(METRIC_NAMES)
+        if names:
+            by_name = {name: column for column, name in METRIC_NAMES.items()}
+            unknown = [name for name in names.split(',') if name not in by_name]
+            if unknown:
+                return jsonify({'error': f'Unknown metrics: {", ".join(unknown)}'}), 400
+            columns = [by_name[name] for name in names.split(',')]
+
+        query = select(
+            RecommendationSnapshot.id, RecommendationSnapshot.created_at,
+            *[getattr(RecommendationSnapshot, column) for column in columns]
+        ).where(RecommendationSnapshot.profile_id == profile_id)
+        try:
+            since, until = _time_arg('since'), _time_arg('until')
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if since:
+            query = query.where(RecommendationSnapshot.created_at >= since)
+        if until:
+            query = query.where(RecommendationSnapshot.created_at < until)
+        # The newest points, returned oldest first
+        rows = db.session.execute(query.order_by(RecommendationSnapshot.id.desc()).limit(limit)).all()
+        rows.reverse()
+
+        return jsonify({
+            'success': True,
+            'data': {
+                'profileId': profile_id,
+                'count': len(rows),
+                'snapshotIds': [row[0] for row in rows],
+                'timestamps': [row[1].isoformat() for row in rows],
+                'metrics': {
+                    METRIC_NAMES[column]: [row[position] for row in rows]
+                    for position, column in enumerate(columns, 2)
+                }
+            }
+        })
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
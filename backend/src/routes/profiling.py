@@ -0,0 +1,60 @@
+from flask import Blueprint, request, jsonify, send_file
+from src.services.app_services import get_services
+from src.services.request_profiler import CAPTURE_FORMATS
+
+profiling_bp = Blueprint('profiling', __name__)
+
+MAX_LISTED_CAPTURES = 200
+
+@profiling_bp.before_request
+def require_admin_token():
+    """Captures expose code paths and timings; only holders of the admin token may read them"""
+    if not get_services().profiler.is_admin(request.headers):
+        return jsonify({'error': 'Profiling endpoints require a valid X-Profile-Token header'}), 403
+
+@profiling_bp.route('/profiling/captures', methods=['GET'])
+def list_captures():
+    """List retained profile captures, newest first"""
+    try:
+        limit = request.args.get('limit', MAX_LISTED_CAPTURES, type=int)
+        if limit is None or not 1 <= limit <= MAX_LISTED_CAPTURES:
+            return jsonify({'error': f'limit must be an integer between 1 and {MAX_LISTED_CAPTURES}'}), 400
+        profiler = get_services().profiler
+        return jsonify({
+            'success': True,
+            'data': profiler.list(limit),
+            'stats': profiler.stats()
+        })
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@profiling_bp.route('/profiling/captures/<capture_id>', methods=['GET'])
+def get_capture(capture_id):
+    """Get a capture's summary, including the functions with the most own time"""
+    summary = get_services().profiler.get(capture_id)
+    if summary is None:
+        return jsonify({'error': 'Capture not found'}), 404
+    summary['files'] = {
+        capture_format: f'{request.script_root}/api/profiling/captures/{capture_id}/{capture_format}'
+        for capture_format in CAPTURE_FORMATS
+    }
+    return jsonify({
+        'success': True,
+        'data': summary
+    })
+
+@profiling_bp.route('/profiling/captures/<capture_id>/<capture_format>', methods=['GET'])
+def download_capture(capture_id, capture_format):
+    """Download a capture as pstats (for pstats/snakeviz) or collapsed stacks (for flamegraph.pl/speedscope)"""
+    if capture_format not in CAPTURE_FORMATS:
+        return jsonify({'error': 'Unsupported format. Use "pstats" or "collapsed"'}), 400
+    path = get_services().profiler.path(capture_id, capture_format)
+    if path is None:
+        return jsonify({'error': 'Capture not found'}), 404
+    return send_file(
+        path,
+        as_attachment=True,
+        download_name=f'{capture_id}{CAPTURE_FORMATS[capture_format]}',
+        mimetype='application/octet-stream' if capture_format == 'pstats' else 'text/plain'
+    )
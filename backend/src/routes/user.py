@@ -1,22 +1,166 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, Response, stream_with_context
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
 from src.models.user import User, db
+import json
 
 user_bp = Blueprint('user', __name__)
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+STREAM_CHUNK_SIZE = 1000
+MAX_BULK_USERS = 10000
+# Stay well under SQLite's bound-parameter limit in IN (...) lookups
+LOOKUP_CHUNK_SIZE = 500
+USER_COLUMNS = (User.id, User.username, User.email)
+
+def _row_dict(row):
+    return {'id': row.id, 'username': row.username, 'email': row.email}
+
+def _user_rows(after=None, limit=None):
+    """Column-only keyset query: plain rows, no ORM identity map or instances"""
+    query = select(*USER_COLUMNS).order_by(User.id)
+    if after is not None:
+        query = query.where(User.id > after)
+    if limit is not None:
+        query = query.limit(limit)
+    return db.session.execute(query).all()
+
+def _stream_requested():
+    if request.args.get('stream', '').lower() in ('1', 'true', 'ndjson'):
+        return True
+    return 'application/x-ndjson' in request.headers.get('Accept', '')
+
 @user_bp.route('/users', methods=['GET'])
 def get_users():
-    users = User.query.all()
-    return jsonify([user.to_dict() for user in users])
+    """List users: everything, a keyset page (?limit=&cursor=) or an NDJSON stream (?stream=1)"""
+    cursor = request.args.get('cursor', type=int)
+    if _stream_requested():
+        def generate():
+            last_id = cursor
+            while True:
+                rows = _user_rows(last_id, STREAM_CHUNK_SIZE)
+                if not rows:
+                    break
+                yield ''.join(json.dumps(_row_dict(row)) + '\n' for row in rows)
+                last_id = rows[-1].id
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+    if 'limit' not in request.args and cursor is None:
+        return jsonify([_row_dict(row) for row in _user_rows()])
+
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    if limit is None or not 1 <= limit <= MAX_PAGE_SIZE:
+        return jsonify({'error': f'limit must be an integer between 1 and {MAX_PAGE_SIZE}'}), 400
+    rows = _user_rows(cursor, limit + 1)
+    return jsonify({
+        'success': True,
+        'data': [_row_dict(row) for row in rows[:limit]],
+        'nextCursor': rows[limit - 1].id if len(rows) > limit else None
+    })
 
 @user_bp.route('/users', methods=['POST'])
 def create_user():
-    
+
     data = request.json
     user = User(username=data['username'], email=data['email'])
     db.session.add(user)
     db.session.commit()
     return jsonify(user.to_dict()), 201
 
+def _user_error(item):
+    """Validation message for one bulk row, or None"""
+    if not isinstance(item, dict):
+        return 'Row must be an object'
+    username, email = item.get('username'), item.get('email')
+    if not isinstance(username, str) or not username.strip() or len(username) > 80:
+        return 'username must be a non-empty string of at most 80 characters'
+    if not isinstance(email, str) or '@' not in email or len(email) > 120:
+        return 'email must be an email address of at most 120 characters'
+    return None
+
+def _existing_users(column, values):
+    """{value: (id, username, email)} for existing users matching any of values"""
+    values = list(values)
+    found = {}
+    for start in range(0, len(values), LOOKUP_CHUNK_SIZE):
+        chunk = values[start:start + LOOKUP_CHUNK_SIZE]
+        for row in db.session.execute(select(*USER_COLUMNS).where(column.in_(chunk))):
+            found[getattr(row, column.key)] = row
+    return found
+
+@user_bp.route('/users/bulk', methods=['POST'])
+def bulk_upsert_users():
+    """Insert or update many users (matched by username) in one transaction, reporting errors per row"""
+    data = request.get_json(silent=True) or {}
+    items = data.get('users')
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'Field "users" must be a non-empty list'}), 400
+    if len(items) > MAX_BULK_USERS:
+        return jsonify({'error': f'At most {MAX_BULK_USERS} users per request'}), 400
+
+    results = [None] * len(items)
+    seen_usernames, seen_emails = set(), set()
+    for index, item in enumerate(items):
+        error = _user_error(item)
+        if error is None and item['username'] in seen_usernames:
+            error = 'Duplicate username in request'
+        if error is None and item['email'] in seen_emails:
+            error = 'Duplicate email in request'
+        if error:
+            results[index] = {'index': index, 'status': 'error', 'error': error}
+            continue
+        seen_usernames.add(item['username'])
+        seen_emails.add(item['email'])
+
+    by_username = _existing_users(User.username, seen_usernames)
+    by_email = _existing_users(User.email, seen_emails)
+    rows = []
+    for index, item in enumerate(items):
+        if results[index] is not None:
+            continue
+        existing = by_username.get(item['username'])
+        owner = by_email.get(item['email'])
+        if owner is not None and (existing is None or owner.id != existing.id):
+            results[index] = {'index': index, 'status': 'error', 'error': 'email already belongs to another user'}
+        elif existing is not None and existing.email == item['email']:
+            results[index] = {'index': index, 'status': 'unchanged', 'id': existing.id}
+        else:
+            results[index] = {'index': index, 'status': 'updated' if existing else 'inserted'}
+            rows.append({'username': item['username'], 'email': item['email']})
+
+    if rows:
+        statement = sqlite_insert(User)
+        statement = statement.on_conflict_do_update(
+            index_elements=[User.username],
+            set_={'email': statement.excluded.email}
+        )
+        try:
+            db.session.execute(statement, rows)
+            db.session.commit()
+        except IntegrityError:
+            # A concurrent writer took one of the emails after validation
+            db.session.rollback()
+            return jsonify({'error': 'Conflicting concurrent update; no users were changed, retry the request'}), 409
+
+        ids = _existing_users(User.username, [row['username'] for row in rows])
+        for index, item in enumerate(items):
+            if results[index]['status'] in ('inserted', 'updated'):
+                results[index]['id'] = ids[item['username']].id
+
+    counts = {status: 0 for status in ('inserted', 'updated', 'unchanged', 'error')}
+    for result in results:
+        counts[result['status']] += 1
+    return jsonify({
+        'success': counts['error'] == 0,
+        'inserted': counts['inserted'],
+        'updated': counts['updated'],
+        'unchanged': counts['unchanged'],
+        'failed': counts['error'],
+        'results': results
+    })
+
 @user_bp.route('/users/<int:user_id>', methods=['GET'])
 def get_user(user_id):
     user = User.query.get_or_404(user_id)
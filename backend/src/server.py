@@ -0,0 +1,236 @@
+import os
+import sys
+# Same import root as main.py, so `python src/server.py` works
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import argparse
+import gc
+import logging
+import signal
+import socket
+import threading
+import time
+from typing import Dict, Any
+from werkzeug.serving import make_server
+from src.main import create_app, init_db
+from src.models.user import db
+from src.services.app_services import EXTENSION_KEY
+from src.services.metrics import metrics
+
+logger = logging.getLogger('financial_planning.server')
+
+DEFAULT_BIND = '0.0.0.0:5000'
+GRACEFUL_TIMEOUT = 30.0
+# A worker that dies sooner than this after starting is respawned with a delay
+MIN_WORKER_LIFETIME = 1.0
+
+
+class PreforkServer:
+    """Pre-forking production server: load once in a master, serve from forked workers.
+
+    The master binds the listening socket, builds the application (reference
+    data compiled, report libraries imported and warmed) and freezes the
+    garbage collector's view of those objects, then forks the workers. Each
+    worker accepts on the shared socket, so the kernel spreads connections
+    across cores, and every page a worker never writes to stays shared with
+    the master copy-on-write.
+
+    Signals to the master:
+      SIGHUP           rebuild the app (configuration, reference data) and
+                       replace the workers; old workers finish in-flight
+                       requests while the new ones already accept
+      SIGTERM, SIGINT  stop accepting, drain in-flight requests and exit
+      SIGTTIN, SIGTTOU one worker more / fewer
+    """
+
+    def __init__(self, bind: str = DEFAULT_BIND, workers: int = None, config: Dict[str, Any] = None,
+                 graceful_timeout: float = GRACEFUL_TIMEOUT, create_tables: bool = False, warm_up: bool = True):
+        host, _, port = bind.rpartition(':')
+        self.host = host or '0.0.0.0'
+        self.port = int(port)
+        self.num_workers = workers or os.cpu_count() or 1
+        self.config = dict(config or {})
+        self.graceful_timeout = graceful_timeout
+        self.create_tables = create_tables
+        self.warm_up = warm_up
+        self.app = None
+        self.socket = None
+        self.generation = 0
+        self.workers = {}
+        self._signals = []
+
+    def load(self):
+        """Build and warm the application in the master, ready to be shared by forked workers"""
+        gc.unfreeze()
+        app = create_app(self.config)
+        if self.create_tables and not self.generation:
+            init_db(app)
+        if self.warm_up:
+            # Import the report libraries once here rather than in every worker's first report
+            app.extensions[EXTENSION_KEY].warm_up()
+        with app.app_context():
+            # Connections must never be shared across a fork
+            db.engine.dispose()
+        self.app = app
+        self.generation += 1
+        # Move everything built so far out of the collector's reach, so collections
+        # in the workers don't write to (and un-share) these pages
+        gc.collect()
+        gc.freeze()
+        logger.info('Application loaded (generation %d)', self.generation)
+
+    def bind(self):
+        family = socket.AF_INET6 if ':' in self.host else socket.AF_INET
+        self.socket = socket.socket(family, socket.SOCK_STREAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.socket.bind((self.host, self.port))
+        self.socket.listen(1024)
+        self.socket.set_inheritable(True)
+        self.port = self.socket.getsockname()[1]
+
+    def spawn(self):
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = (self.generation, time.monotonic())
+            return
+        exit_code = 0
+        try:
+            self._serve()
+        except BaseException:
+            logger.exception('Worker %d crashed', os.getpid())
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+
+    def _serve(self):
+        """Worker body: serve from the shared socket until told to stop"""
+        for signum in (signal.SIGHUP, signal.SIGTTIN, signal.SIGTTOU):
+            signal.signal(signum, signal.SIG_IGN)
+        # Ctrl-C reaches the whole process group; only the master reacts to it
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        with self.app.app_context():
+            db.engine.dispose(close=False)
+
+        server = make_server(self.host, self.port, self.app, threaded=True, fd=self.socket.fileno())
+        # Make server_close() wait for request threads, so stopping drains in-flight requests
+        server.daemon_threads = False
+        server.block_on_close = True
+
+        def stop(signum, frame):
+            # shutdown() blocks until serve_forever returns, so it can't run on this thread
+            threading.Thread(target=server.shutdown, daemon=True).start()
+
+        signal.signal(signal.SIGTERM, stop)
+        logger.info('Worker %d serving on %s:%d', os.getpid(), self.host, self.port)
+        server.serve_forever()
+        server.server_close()
+        self.app.extensions[EXTENSION_KEY].shutdown()
+
+    def _on_signal(self, signum, frame):
+        self._signals.append(signum)
+
+    def _reap(self):
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.workers.clear()
+                return
+            if not pid:
+                return
+            worker = self.workers.pop(pid, None)
+            if worker and os.waitstatus_to_exitcode(status) != 0:
+                logger.warning('Worker %d exited with status %d', pid, os.waitstatus_to_exitcode(status))
+                if time.monotonic() - worker[1] < MIN_WORKER_LIFETIME:
+                    time.sleep(MIN_WORKER_LIFETIME)
+
+    def _stop(self, pids):
+        """SIGTERM the given workers and wait for them to drain, killing stragglers"""
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + self.graceful_timeout
+        while any(pid in self.workers for pid in pids) and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        for pid in pids:
+            if pid in self.workers:
+                logger.warning('Worker %d did not stop in %.0fs, killing it', pid, self.graceful_timeout)
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+        while any(pid in self.workers for pid in pids):
+            self._reap()
+            time.sleep(0.05)
+
+    def reload(self):
+        """Start a new generation of workers, then retire the old one"""
+        old = [pid for pid, (generation, _) in self.workers.items() if generation == self.generation]
+        try:
+            self.load()
+        except Exception:
+            logger.exception('Reload failed; keeping the current workers')
+            return
+        for _ in range(self.num_workers):
+            self.spawn()
+        self._stop(old)
+
+    def run(self):
+        self.bind()
+        self.load()
+        # Counters start from zero with each master; totals of replaced workers are kept until then
+        metrics.clear_directory()
+        for signum in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT, signal.SIGTTIN, signal.SIGTTOU):
+            signal.signal(signum, self._on_signal)
+        logger.info('Master %d listening on %s:%d with %d workers', os.getpid(), self.host, self.port, self.num_workers)
+
+        while True:
+            self._reap()
+            while self._signals:
+                signum = self._signals.pop(0)
+                if signum in (signal.SIGTERM, signal.SIGINT):
+                    logger.info('Shutting down')
+                    self._stop(list(self.workers))
+                    self.socket.close()
+                    return
+                if signum == signal.SIGHUP:
+                    self.reload()
+                elif signum == signal.SIGTTIN:
+                    self.num_workers += 1
+                elif signum == signal.SIGTTOU and self.num_workers > 1:
+                    self.num_workers -= 1
+
+            current = [pid for pid, (generation, _) in self.workers.items() if generation == self.generation]
+            for _ in range(self.num_workers - len(current)):
+                self.spawn()
+            if len(current) > self.num_workers:
+                self._stop(current[self.num_workers:])
+            time.sleep(0.2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the Financial Planning API with pre-forked workers')
+    parser.add_argument('--bind', default=os.getenv('BIND', DEFAULT_BIND), help='host:port to listen on')
+    parser.add_argument('--workers', type=int, default=int(os.getenv('WEB_CONCURRENCY', '0')) or None,
+                        help='worker processes (default: number of CPUs)')
+    parser.add_argument('--graceful-timeout', type=float, default=GRACEFUL_TIMEOUT,
+                        help='seconds a stopping worker gets to finish in-flight requests')
+    parser.add_argument('--init-db', action='store_true', help='create missing database tables before serving')
+    parser.add_argument('--no-warm-up', dest='warm_up', action='store_false',
+                        help='load the report libraries on the first report request instead of at startup')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(process)d] %(levelname)s %(message)s')
+
+    workers = args.workers or os.cpu_count() or 1
+    config = {}
+    if not os.getenv('REPORT_WORKERS'):
+        # Every web worker gets its own report pool; split the cores between them
+        config['REPORT_WORKERS'] = max(1, (os.cpu_count() or 1) // workers)
+    PreforkServer(args.bind, workers, config, args.graceful_timeout, args.init_db, args.warm_up).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional, Tuple
+from flask import g, jsonify, request
+from src.services.metrics import metrics
+
+DEFAULT_QUEUE_TIMEOUT = 5.0
+# Weight of the newest request in the running average of how long a slot is held
+HOLD_TIME_WEIGHT = 0.2
+
+
+def default_limits(report_workers: int, queue_timeout: float) -> Dict[str, Tuple[int, int, float]]:
+    """Endpoint -> (concurrent requests, queued requests, queue deadline) for the expensive endpoints.
+
+    Report renders wait on the process pool, so they are admitted one per
+    pool worker; batch and sweep calculations run on the request thread.
+    """
+    cpus = os.cpu_count() or 1
+    workers = max(report_workers, 1)
+    return {
+        'financial.generate_report': (workers, 2 * workers, queue_timeout),
+        'financial.generate_bulk_reports': (1, 1, queue_timeout),
+        'financial.calculate_recommendations_batch': (cpus, 2 * cpus, queue_timeout),
+        'financial.calculate_recommendations_sweep': (cpus, 2 * cpus, queue_timeout)
+    }
+
+
+def parse_limits(spec: str, queue_timeout: float) -> Dict[str, Optional[Tuple[int, int, float]]]:
+    """Parse ``endpoint=concurrent[:queued[:deadline]],...``; a limit of 0 turns limiting off"""
+    limits = {}
+    for item in (spec or '').split(','):
+        if not item.strip():
+            continue
+        endpoint, _, values = item.partition('=')
+        parts = values.split(':')
+        try:
+            concurrent = int(parts[0])
+            queued = int(parts[1]) if len(parts) > 1 and parts[1] else 2 * concurrent
+            deadline = float(parts[2]) if len(parts) > 2 and parts[2] else queue_timeout
+        except ValueError:
+            raise ValueError(f'Invalid ADMISSION_LIMITS entry: {item.strip()!r}')
+        limits[endpoint.strip()] = (concurrent, queued, deadline) if concurrent > 0 else None
+    return limits
+
+
+class Rejected(Exception):
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class EndpointLimiter:
+    """At most ``limit`` requests at a time, then up to ``max_queued`` waiting in FIFO order.
+
+    A request that finds the queue full is rejected at once; a queued one
+    gives up after ``queue_timeout`` seconds. A finishing request hands its
+    slot straight to the oldest waiter, so a newcomer never overtakes the queue.
+    """
+
+    def __init__(self, limit: int, max_queued: int, queue_timeout: float):
+        self.limit = limit
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self._waiters = deque()
+        self._lock = threading.Lock()
+        self._hold_time = None
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free: the queue ahead drained at the observed pace"""
+        hold_time = self._hold_time or 1.0
+        return max(1, math.ceil(hold_time * (len(self._waiters) + 1) / self.limit))
+
+    def acquire(self) -> float:
+        """Take a slot, waiting if needed; returns the seconds spent queued or raises Rejected"""
+        with self._lock:
+            if self.in_flight < self.limit and not self._waiters:
+                self.in_flight += 1
+                self.admitted += 1
+                return 0.0
+            if len(self._waiters) >= self.max_queued:
+                self.rejected += 1
+                raise Rejected('queue_full', self.retry_after())
+            waiter = threading.Event()
+            self._waiters.append(waiter)
+        started = time.perf_counter()
+        waiter.wait(self.queue_timeout)
+        with self._lock:
+            # A slot may have been handed over just as the wait timed out; it is ours either way
+            if waiter.is_set():
+                self.admitted += 1
+                return time.perf_counter() - started
+            self._waiters.remove(waiter)
+            self.timed_out += 1
+            raise Rejected('deadline', self.retry_after())
+
+    def release(self, held: float):
+        with self._lock:
+            if self._hold_time is None:
+                self._hold_time = held
+            else:
+                self._hold_time += HOLD_TIME_WEIGHT * (held - self._hold_time)
+            if self._waiters:
+                self._waiters.popleft().set()
+            else:
+                self.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'inFlight': self.in_flight,
+            'queued': len(self._waiters),
+            'limit': self.limit,
+            'maxQueued': self.max_queued,
+            'queueTimeoutSeconds': self.queue_timeout,
+            'admitted': self.admitted,
+            'rejected': self.rejected,
+            'timedOut': self.timed_out
+        }
+
+
+class AdmissionController:
+    """Per-endpoint concurrency limits for the expensive endpoints of this process.
+
+    Endpoints without a limit (health, reference data, single calculations)
+    are never queued, so their latency stays flat while reports pile up.
+    Rejections answer 429 when the queue is already full and 503 when a
+    queued request hits its deadline, both with a Retry-After header.
+    """
+
+    def __init__(self, limits: Dict[str, Optional[Tuple[int, int, float]]]):
+        self.limiters = {
+            endpoint: EndpointLimiter(*limit) for endpoint, limit in limits.items() if limit is not None
+        }
+
+    def limiter(self, endpoint: str) -> Optional[EndpointLimiter]:
+        return self.limiters.get(endpoint)
+
+    def stats(self) -> Dict[str, Any]:
+        """Current load of this worker process, for /api/health"""
+        endpoints = {endpoint: limiter.stats() for endpoint, limiter in sorted(self.limiters.items())}
+        return {
+            'pid': os.getpid(),
+            'inFlight': sum(stats['inFlight'] for stats in endpoints.values()),
+            'queued': sum(stats['queued'] for stats in endpoints.values()),
+            'saturated': any(stats['queued'] for stats in endpoints.values()),
+            'endpoints': endpoints
+        }
+
+
+def init_app(app, controller: AdmissionController):
+    """Admit or reject limited requests before they run; free their slot once the response is done.
+
+    Registered after the metrics hooks, so queue time counts in the request
+    duration and rejections are counted like any other response.
+    """
+
+    @app.before_request
+    def admit_request():
+        limiter = controller.limiter(request.endpoint)
+        if limiter is None:
+            return None
+        labels = (('endpoint', request.endpoint),)
+        try:
+            waited = limiter.acquire()
+        except Rejected as e:
+            metrics.inc('http_admission_rejected_total', labels + (('reason', e.reason),))
+            if e.reason == 'queue_full':
+                response = jsonify({'error': 'Too many concurrent requests for this endpoint, retry later'})
+                response.status_code = 429
+            else:
+                response = jsonify({'error': 'Server is busy, the request waited too long to start'})
+                response.status_code = 503
+            response.headers['Retry-After'] = str(e.retry_after)
+            return response
+        metrics.observe('http_admission_wait_seconds', waited, labels)
+        g.admission_slot = (limiter, time.perf_counter())
+        return None
+
+    @app.teardown_request
+    def release_slot(error=None):
+        # Runs once the response is complete, after a streamed body too (stream_with_context)
+        slot = g.pop('admission_slot', None)
+        if slot is not None:
+            limiter, started = slot
+            limiter.release(time.perf_counter() - started)
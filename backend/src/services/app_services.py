@@ -0,0 +1,85 @@
+from typing import Dict, Any
+from flask import current_app
+from src.services.admission import AdmissionController, default_limits, parse_limits
+from src.services.cash_flow_simulator import SimulationPool
+from src.services.compression import ResponseCompressor
+from src.services.financial_calculator import FinancialCalculator
+from src.services.metrics import metrics
+from src.services.reference_data import ReferenceDataStore
+from src.services.report_cache import ReportArtifactCache
+from src.services.report_jobs import ReportJobQueue
+from src.services.request_profiler import RequestProfiler
+from src.services.result_cache import ResultCache
+
+EXTENSION_KEY = 'financial_planning'
+
+
+class AppServices:
+    """Long-lived service objects shared by every request of one application"""
+
+    def __init__(self, config: Dict[str, Any]):
+        # Every process of a deployment (web and report workers) shares one metrics directory
+        metrics.configure(config['METRICS_DIR'], config['METRICS_FLUSH_INTERVAL'])
+        # Monte Carlo chunks run on one pool shared by every reference-data snapshot
+        self.simulation_pool = SimulationPool(config['SIMULATION_WORKERS'])
+        # Reference data is reloaded in the background when the JSON files change
+        self.reference_data = ReferenceDataStore(
+            data_dir=config['REFERENCE_DATA_DIR'],
+            check_interval=config['REFERENCE_DATA_CHECK_INTERVAL'],
+            factory=lambda data_dir: FinancialCalculator(data_dir, simulation_pool=self.simulation_pool)
+        )
+        self.recommendation_cache = ResultCache(
+            max_entries=config['RESULT_CACHE_SIZE'],
+            ttl_seconds=config['RESULT_CACHE_TTL']
+        )
+        # Rendered reports are cached on disk by a hash of their inputs (0 bytes disables it)
+        self.report_cache = ReportArtifactCache(
+            cache_dir=config['REPORT_CACHE_DIR'],
+            max_bytes=config['REPORT_CACHE_MAX_BYTES']
+        ) if config['REPORT_CACHE_MAX_BYTES'] > 0 else None
+        # PDF/Excel rendering runs in a worker pool; finished files are spooled to disk
+        self.report_jobs = ReportJobQueue(
+            spool_dir=config['REPORT_SPOOL_DIR'],
+            max_workers=config['REPORT_WORKERS'],
+            retention_seconds=config['REPORT_RETENTION_SECONDS'],
+            max_pending=config['REPORT_QUEUE_SIZE'],
+            start_method=config['REPORT_START_METHOD'],
+            cache=self.report_cache
+        )
+        # Opt-in request profiling: off unless an admin token or a sample rate is configured
+        self.profiler = RequestProfiler(
+            directory=config['PROFILE_DIR'],
+            admin_token=config['PROFILE_ADMIN_TOKEN'],
+            sample_rate=config['PROFILE_SAMPLE_RATE'],
+            max_captures=config['PROFILE_MAX_CAPTURES'],
+            max_bytes=config['PROFILE_MAX_BYTES'],
+            sample_interval=config['PROFILE_SAMPLE_INTERVAL']
+        )
+        # Concurrency limits with a bounded wait queue for the expensive endpoints
+        limits = default_limits(self.report_jobs.max_workers, config['ADMISSION_QUEUE_TIMEOUT'])
+        limits.update(parse_limits(config['ADMISSION_LIMITS'], config['ADMISSION_QUEUE_TIMEOUT']))
+        self.admission = AdmissionController(limits)
+        # gzip (and brotli when installed) for clients that accept it
+        self.compressor = ResponseCompressor(
+            min_bytes=config['COMPRESSION_MIN_BYTES'],
+            gzip_level=config['COMPRESSION_GZIP_LEVEL'],
+            brotli_quality=config['COMPRESSION_BROTLI_QUALITY']
+        )
+
+    def warm_up(self):
+        """Load the report libraries and warm caches ahead of the first request.
+
+        Optional: without it they load on the first report request instead.
+        """
+        from src.services.report_generator import ReportGenerator
+        ReportGenerator().warm_up()
+
+    def shutdown(self):
+        self.report_jobs.shutdown()
+        self.simulation_pool.shutdown()
+        metrics.flush()
+
+
+def get_services() -> AppServices:
+    """Services of the current application"""
+    return current_app.extensions[EXTENSION_KEY]
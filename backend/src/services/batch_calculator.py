@@ -0,0 +1,480 @@
+import numpy as np
+from typing import Dict, Any, List
+from src.services.parameter_plans import DEFAULT_FORECAST_MONTHS, MONTH_BANDS
+from src.services.debt_payoff import annual_rate, HIGH_INTEREST_THRESHOLD
+
+MONTHS = list(range(1, 13))
+
+AVALANCHE_STRATEGY = "Debt Avalanche: Pay minimums on all debts, then focus extra payments on highest interest rate debt"
+SINGLE_DEBT_STRATEGY = "Focus on consistent payments and consider refinancing if better rates are available"
+
+RETIREMENT_PLANS = [
+    "Solo 401(k)", "Individual Retirement Account",
+    "SEP IRA", "Small Business Pension Plan",
+    "401(k) Plan", "Corporate Pension Plan"
+]
+
+TAX_SAVING_STRATEGIES = (
+    "Maximize business expense deductions",
+    "Consider equipment purchases for depreciation benefits",
+    "Implement employee benefit programs for tax advantages",
+    "Plan major expenses at year-end for tax optimization"
+)
+
+RETIREMENT_TAX_BENEFITS = [
+    "Tax-deferred growth and deductible contributions", "Tax advantages vary by country",
+    "Employer contributions are tax-deductible", "Tax advantages vary by country",
+    "Employer matching and tax-deferred growth", "Tax advantages vary by country"
+]
+
+
+class BatchCalculator:
+    """Evaluate many business profiles together on columnar NumPy arrays.
+
+    Every formula mirrors the scalar ``FinancialCalculator.calculate_*``
+    methods operation for operation, so each returned dict is identical to
+    what ``generate__recommendations`` produces for the same profile.
+    """
+
+    def __init__(self, calculator):
+        self.calculator = calculator
+        plans = calculator.plans
+
+        # Unknown codes map to one extra trailing row holding the compiled defaults
+        self.industry_index = {code: i for i, code in enumerate(plans.industries)}
+        industry_rows = list(plans.industries.values()) + [plans.default_industry]
+        self.emergency_multiplier = [row.emergency_fund_multiplier for row in industry_rows]
+        self.growth_percentage = [row.growth_investment_percentage for row in industry_rows]
+        self.benefits_percentage = [row.employee_benefits_percentage for row in industry_rows]
+        self.average_employee_cost = [row.average_employee_cost for row in industry_rows]
+        self.seasonality_factor = [row.seasonality_factor for row in industry_rows]
+        self.industry_rows = industry_rows
+
+        self.country_index = {code: i for i, code in enumerate(plans.countries)}
+        country_rows = list(plans.countries.values()) + [plans.default_country]
+        self.deductions = [row.deductions for row in country_rows]
+
+        # Per-industry seasonal multipliers for the three forecast bands
+        self.band_multipliers = [
+            tuple(row.seasonal_multipliers[month - 1] for month in (1, 3, 12)) for row in industry_rows
+        ]
+
+    def columnarize(self, profiles: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Extract the inputs of every profile into flat NumPy columns"""
+        n = len(profiles)
+        default_industry = len(self.industry_index)
+        default_country = len(self.country_index)
+
+        industry = np.empty(n, dtype=np.intp)
+        country = np.empty(n, dtype=np.intp)
+        is_us = np.empty(n, dtype=bool)
+        tax_region = np.zeros(n, dtype=np.intp)
+        tax_engine = self.calculator.tax_engine
+        revenue = [0] * n
+        ratio_revenue = [0] * n
+        employee_count = [0] * n
+        savings = [0] * n
+        operating = [0] * n
+        debt_owner, debt_amount, debt_rate, debt_payment, debt_float = [], [], [], [], []
+        debt_count = np.zeros(n, dtype=np.intp)
+
+        for i, business_data in enumerate(profiles):
+            industry[i] = self.industry_index.get(business_data.get('industry', 'technology'), default_industry)
+            country_code = business_data.get('location', {}).get('country', 'US')
+            country[i] = self.country_index.get(country_code, default_country)
+            is_us[i] = country_code == 'US'
+            tax_region[i] = tax_engine.region_position(country_code, business_data.get('location', {}).get('region'))
+            revenue[i] = business_data.get('monthlyRevenue', 0)
+            ratio_revenue[i] = business_data.get('monthlyRevenue', 1)
+            employee_count[i] = business_data.get('employeeCount', 0)
+            savings[i] = business_data.get('currentSavings', 0)
+            operating[i] = sum(business_data.get('operatingExpenses', {}).values())
+
+            debts = business_data.get('debtObligations', [])
+            if debts:
+                debt_count[i] = len(debts)
+                for debt in debts:
+                    amount = debt.get('amount', 0)
+                    debt_owner.append(i)
+                    debt_amount.append(amount)
+                    debt_rate.append(annual_rate(debt))
+                    debt_payment.append(debt.get('monthlyPayment', 0))
+                    debt_float.append(not isinstance(amount, int))
+
+        return {
+            'industry': industry,
+            'country': country,
+            'isUS': is_us,
+            'taxRegion': tax_region,
+            'revenue': np.array(revenue, dtype=float),
+            'ratioRevenue': np.array(ratio_revenue, dtype=float),
+            'employeeCountRaw': employee_count,
+            'employeeCount': np.array(employee_count, dtype=float),
+            'savings': np.array(savings, dtype=float),
+            'operating': np.array(operating, dtype=float),
+            'debtCount': debt_count,
+            'debtOwner': np.array(debt_owner, dtype=np.intp),
+            'debtAmount': np.array(debt_amount, dtype=float),
+            'debtRate': np.array(debt_rate, dtype=float),
+            'debtPayment': np.array(debt_payment, dtype=float),
+            'debtPaymentFloat': np.array([not isinstance(p, int) for p in debt_payment], dtype=bool),
+            'debtAmountFloat': np.array(debt_float, dtype=bool),
+        }
+
+    @staticmethod
+    def round_values(values: np.ndarray, ndigits: int = 2, int_mask: np.ndarray = None) -> List[Any]:
+        """Round a column exactly like Python's ``round`` so results match the scalar path.
+
+        ``np.rint(x * 10**n) / 10**n`` only disagrees with ``round`` when the
+        scaled value lands within its own rounding error of a .5 boundary (or
+        is too large to hold a fraction), so just those entries fall back to
+        the builtin.
+        """
+        scale = 10.0 ** ndigits
+        scaled = values * scale
+        with np.errstate(invalid='ignore'):
+            magnitude = np.abs(scaled)
+            distance = np.abs(scaled - np.floor(scaled) - 0.5)
+            ambiguous = ~((distance > magnitude * 2.0 ** -45) & (magnitude < 2.0 ** 52))
+        rounded = (np.rint(scaled) / scale).tolist()
+        if ambiguous.any():
+            raw = values.tolist()
+            for i in np.flatnonzero(ambiguous).tolist():
+                rounded[i] = round(raw[i], ndigits)
+        if int_mask is not None and int_mask.any():
+            raw = values.tolist()
+            for i in np.flatnonzero(int_mask).tolist():
+                rounded[i] = int(raw[i])
+        return rounded
+
+    @staticmethod
+    def _sum_by_owner(owner: np.ndarray, values: np.ndarray, is_float: np.ndarray, n: int):
+        """Sum per-debt values per profile in input order, tracking whether Python would keep an int"""
+        totals = np.bincount(owner, weights=values, minlength=n)
+        float_count = np.bincount(owner, weights=is_float.astype(float), minlength=n)
+        return totals, float_count == 0
+
+    def generate_recommendations(self, profiles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Generate all financial recommendations for a list of profiles"""
+        n = len(profiles)
+        if n == 0:
+            return []
+        cols = self.columnarize(profiles)
+        sections = self.evaluate(cols)
+        industry = cols['industry']
+        country = cols['country']
+        emergency = sections['emergencyFund']
+        growth = sections['growthFund']
+        benefits = sections['employeeBenefitsFund']
+        tax = sections['taxPlanning']
+        retirement = sections['retirementPlanning']
+        debt = self._debt_management(cols, n)
+        forecast = self._cash_flow_forecast(sections['cashFlowForecast'], industry)
+        # Tax engine rows follow tax_rates.json order with the defaults last, like country indexes here
+        tax_breakdown = self.calculator.tax_engine.breakdown(
+            country, cols['taxRegion'],
+            *self.calculator.tax_engine.profile_inputs(
+                cols['revenue'], cols['operating'], cols['employeeCount'],
+                np.array(self.average_employee_cost, dtype=float)[industry]
+            )
+        )
+
+        industry_list = industry.tolist()
+        country_list = country.tolist()
+        employee_raw = cols['employeeCountRaw']
+        results = []
+        for i in range(n):
+            ind = industry_list[i]
+            ctry = country_list[i]
+            results.append({
+                'emergencyFund': {
+                    'recommendedAmount': emergency['recommendedAmount'][i],
+                    'currentGap': emergency['currentGap'][i],
+                    'monthlyContribution': emergency['monthlyContribution'][i],
+                    'timeToGoal': emergency['timeToGoal'][i],
+                    'monthlyExpenses': emergency['monthlyExpenses'][i],
+                    'multiplier': self.emergency_multiplier[ind]
+                },
+                'employeeBenefitsFund': {
+                    'totalBudget': benefits['totalBudget'][i],
+                    'healthBenefits': benefits['healthBenefits'][i],
+                    'retirementContribution': benefits['retirementContribution'][i],
+                    'bonusPool': benefits['bonusPool'][i],
+                    'benefitsPercentage': self.benefits_percentage[ind],
+                    'perEmployeeMonthly': benefits['perEmployeeMonthly'][i]
+                },
+                'growthFund': {
+                    'totalBudget': growth['totalBudget'][i],
+                    'marketingBudget': growth['marketingBudget'][i],
+                    'hiringBudget': growth['hiringBudget'][i],
+                    'equipmentUpgrade': growth['equipmentUpgrade'][i],
+                    'researchDevelopment': growth['researchDevelopment'][i],
+                    'growthPercentage': self.growth_percentage[ind]
+                },
+                'taxPlanning': {
+                    'estimatedTaxLiability': tax['estimatedTaxLiability'][i],
+                    'corporateTax': tax['corporateTax'][i],
+                    'payrollTax': tax['payrollTax'][i],
+                    'corporateTaxRate': tax['corporateTaxRate'][i],
+                    'recommendedDeductions': list(self.deductions[ctry]),
+                    'taxSavingStrategies': list(TAX_SAVING_STRATEGIES),
+                    'annualProfit': tax['annualProfit'][i],
+                    'taxBreakdown': tax_breakdown[i]
+                },
+                'debtManagement': debt[i],
+                'retirementPlanning': {
+                    'recommendedPlan': retirement['recommendedPlan'][i],
+                    'maxContribution': retirement['maxContribution'][i],
+                    'recommendedContribution': retirement['recommendedContribution'][i],
+                    'taxBenefits': retirement['taxBenefits'][i],
+                    'employeeCount': employee_raw[i],
+                    'contributionPercentage': 0.12
+                },
+                'cashFlowForecast': forecast[i]
+            })
+        
+        # Stochastic forecasts and payoff plans are opt-in per profile and simulated individually
+        for business_data, result in zip(profiles, results):
+            if business_data.get('forecastMonths', DEFAULT_FORECAST_MONTHS) != DEFAULT_FORECAST_MONTHS:
+                # Non-default horizons (and their simulations) come from the scalar forecast
+                result['cashFlowForecast'] = self.calculator.calculate_cash_flow_forecast(business_data)
+            elif business_data.get('simulation'):
+                simulation = business_data['simulation']
+                result['cashFlowForecast']['simulation'] = self.calculator.simulate_cash_flow(business_data, simulation)
+            debt_payoff = business_data.get('debtPayoff')
+            if debt_payoff and business_data.get('debtObligations'):
+                result['debtManagement']['payoffPlan'] = self.calculator.simulate_debt_payoff(business_data, debt_payoff)
+        return results
+
+    def evaluate(self, cols: Dict[str, Any]) -> Dict[str, Any]:
+        """Run every fixed-shape section over columnar inputs, returning rounded columns"""
+        industry = cols['industry']
+        revenue = cols['revenue']
+        employee_count = cols['employeeCount']
+
+        multiplier = np.array(self.emergency_multiplier, dtype=float)[industry]
+        growth_pct = np.array(self.growth_percentage, dtype=float)[industry]
+        benefits_pct = np.array(self.benefits_percentage, dtype=float)[industry]
+        avg_cost = np.array(self.average_employee_cost, dtype=float)[industry]
+
+        monthly_expenses = cols['operating'] + (avg_cost * employee_count) / 12
+
+        return {
+            'emergencyFund': self._emergency_fund(monthly_expenses, multiplier, cols['savings']),
+            'growthFund': self._growth_fund(revenue, growth_pct),
+            'employeeBenefitsFund': self._employee_benefits(revenue, employee_count, avg_cost, benefits_pct),
+            'taxPlanning': self._tax_planning(cols, revenue, monthly_expenses, employee_count, avg_cost),
+            'retirementPlanning': self._retirement_planning(revenue, employee_count, cols['isUS']),
+            'cashFlowForecast': self._cash_flow_summary(revenue, monthly_expenses, industry)
+        }
+
+    def _emergency_fund(self, monthly_expenses, multiplier, savings) -> Dict[str, List[Any]]:
+        recommended = monthly_expenses * multiplier
+        shortfall = recommended - savings
+        gap_is_zero = ~(shortfall > 0)
+        gap = np.where(gap_is_zero, 0.0, shortfall)
+        contribution_is_zero = ~(gap > 0)
+        contribution = np.where(contribution_is_zero, 0.0, gap / 12)
+        time_is_zero = ~(contribution > 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            time_to_goal = np.where(time_is_zero, 0.0, gap / contribution)
+        return {
+            'recommendedAmount': self.round_values(recommended),
+            'currentGap': self.round_values(gap, 2, gap_is_zero),
+            'monthlyContribution': self.round_values(contribution, 2, contribution_is_zero),
+            'timeToGoal': self.round_values(time_to_goal, 1, time_is_zero),
+            'monthlyExpenses': self.round_values(monthly_expenses)
+        }
+
+    def _growth_fund(self, revenue, growth_pct) -> Dict[str, List[Any]]:
+        total = revenue * growth_pct
+        return {
+            'totalBudget': self.round_values(total),
+            'marketingBudget': self.round_values(total * 0.4),
+            'hiringBudget': self.round_values(total * 0.3),
+            'equipmentUpgrade': self.round_values(total * 0.2),
+            'researchDevelopment': self.round_values(total * 0.1)
+        }
+
+    def _employee_benefits(self, revenue, employee_count, avg_cost, benefits_pct) -> Dict[str, List[Any]]:
+        revenue_based = revenue * benefits_pct
+        employee_based = (avg_cost * employee_count * benefits_pct) / 12
+        total = np.where(employee_based > revenue_based, employee_based, revenue_based)
+        return {
+            'totalBudget': self.round_values(total),
+            'healthBenefits': self.round_values(total * 0.6),
+            'retirementContribution': self.round_values(total * 0.25),
+            'bonusPool': self.round_values(total * 0.15),
+            'perEmployeeMonthly': self.round_values(total / np.where(1 > employee_count, 1, employee_count))
+        }
+
+    def _tax_planning(self, cols, revenue, monthly_expenses, employee_count, avg_cost) -> Dict[str, List[Any]]:
+        tax_engine = self.calculator.tax_engine
+        annual_profit = revenue * 12 - monthly_expenses * 12
+        # Headline figures are the progressive breakdown's, as in the scalar path
+        components = tax_engine.evaluate(
+            cols['country'], cols['taxRegion'],
+            *tax_engine.profile_inputs(revenue, cols['operating'], employee_count, avg_cost)
+        )
+        return {
+            'estimatedTaxLiability': self.round_values(components['totalLiability']),
+            'corporateTax': self.round_values(components['corporateTax']),
+            'payrollTax': self.round_values(components['payrollTax']),
+            'corporateTaxRate': self.round_values(components['corporateEffectiveRate'], 4),
+            'annualProfit': self.round_values(annual_profit)
+        }
+
+    def _debt_management(self, cols: Dict[str, Any], n: int) -> List[Dict[str, Any]]:
+        debt_count = cols['debtCount']
+        owner = cols['debtOwner']
+        amount = cols['debtAmount']
+        rate = cols['debtRate']
+
+        total_debt, debt_is_int = self._sum_by_owner(owner, amount, cols['debtAmountFloat'], n)
+        total_payment, payment_is_int = self._sum_by_owner(owner, cols['debtPayment'], cols['debtPaymentFloat'], n)
+
+        high = rate > HIGH_INTEREST_THRESHOLD
+        high_owner = owner[high]
+        high_count = np.bincount(high_owner, minlength=n)
+        high_amount, high_is_int = self._sum_by_owner(high_owner, amount[high], cols['debtAmountFloat'][high], n)
+        high_rate = np.bincount(high_owner, weights=rate[high], minlength=n)
+        has_opportunity = high_count > 1
+        with np.errstate(divide='ignore', invalid='ignore'):
+            avg_rate = high_rate / high_count
+        new_rate = avg_rate * 0.8
+        monthly_savings = self.round_values(high_amount * (avg_rate - avg_rate * 0.8) / 12)
+        potential_savings = self.round_values(np.array(monthly_savings, dtype=float) * 12)
+
+        has_debt = debt_count > 0
+        ratio_revenue = cols['ratioRevenue'] * 12
+        if np.any(has_debt & (ratio_revenue == 0)):
+            raise ZeroDivisionError('float division by zero')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            debt_ratio = self.round_values(total_debt / ratio_revenue)
+
+        total_debt_out = self.round_values(total_debt, 2, debt_is_int)
+        total_payment_out = self.round_values(total_payment, 2, payment_is_int)
+        high_amount_out = self.round_values(high_amount, 2, high_is_int)
+        avg_rate_out = self.round_values(avg_rate, 4)
+        new_rate_out = self.round_values(new_rate, 4)
+
+        results = []
+        for i, (count, opportunity) in enumerate(zip(debt_count.tolist(), has_opportunity.tolist())):
+            if not count:
+                results.append({
+                    'totalDebt': 0,
+                    'monthlyPayments': 0,
+                    'consolidationOpportunities': [],
+                    'payoffStrategy': 'No debt to manage',
+                    'potentialSavings': 0
+                })
+                continue
+            opportunities = []
+            if opportunity:
+                opportunities.append({
+                    'type': 'High Interest Debt Consolidation',
+                    'totalAmount': high_amount_out[i],
+                    'currentAvgRate': avg_rate_out[i],
+                    'potentialNewRate': new_rate_out[i],
+                    'monthlySavings': monthly_savings[i]
+                })
+            results.append({
+                'totalDebt': total_debt_out[i],
+                'monthlyPayments': total_payment_out[i],
+                'consolidationOpportunities': opportunities,
+                'payoffStrategy': AVALANCHE_STRATEGY if count > 1 else SINGLE_DEBT_STRATEGY,
+                'potentialSavings': potential_savings[i] if opportunity else 0,
+                'debtToRevenueRatio': debt_ratio[i]
+            })
+        return results
+
+    def _retirement_planning(self, revenue, employee_count, is_us) -> Dict[str, List[Any]]:
+        annual_revenue = revenue * 12
+        size = np.where(employee_count <= 1, 0, np.where(employee_count <= 25, 1, 2))
+        plan = size * 2 + ~is_us
+
+        sep_limit = annual_revenue * 0.25
+        sep_is_int = ~(sep_limit < 58000)
+        max_contribution = np.select(
+            [plan == 0, plan == 1, plan == 2, plan == 3, plan == 4],
+            [58000.0, 6000.0, np.where(sep_is_int, 58000.0, sep_limit),
+             annual_revenue * 0.15, 22500.0],
+            annual_revenue * 0.20
+        )
+        max_is_int = np.isin(plan, (0, 1, 4)) | ((plan == 2) & sep_is_int)
+
+        annual_recommended = annual_revenue * 0.12
+        keep_max = ~(annual_recommended < max_contribution)
+        recommended = np.where(keep_max, max_contribution, annual_recommended)
+
+        plan_list = plan.tolist()
+        return {
+            'recommendedPlan': [RETIREMENT_PLANS[p] for p in plan_list],
+            'taxBenefits': [RETIREMENT_TAX_BENEFITS[p] for p in plan_list],
+            'maxContribution': self.round_values(max_contribution, 2, max_is_int),
+            'recommendedContribution': self.round_values(recommended, 2, keep_max & max_is_int)
+        }
+
+    def _cash_flow_summary(self, revenue, monthly_expenses, industry) -> Dict[str, Any]:
+        band_multipliers = np.array(self.band_multipliers, dtype=float)[industry]
+        band_revenue = revenue[:, None] * band_multipliers
+        band_net = band_revenue - monthly_expenses[:, None]
+
+        revenue_rounded = np.array(self.round_values(band_revenue.ravel()), dtype=float).reshape(band_revenue.shape)
+        expenses_rounded = np.array(self.round_values(monthly_expenses), dtype=float)
+
+        # Accumulate month by month so the float sums match the scalar loop
+        total_revenue = np.zeros(len(revenue))
+        total_expenses = np.zeros(len(revenue))
+        for band in MONTH_BANDS:
+            total_revenue = total_revenue + revenue_rounded[:, band]
+            total_expenses = total_expenses + expenses_rounded
+
+        return {
+            'bandRevenue': revenue_rounded,
+            'bandNetCashFlow': band_net,
+            'expenses': expenses_rounded,
+            'totalRevenue': self.round_values(total_revenue),
+            'totalExpenses': self.round_values(total_expenses),
+            'totalNetCashFlow': self.round_values(total_revenue - total_expenses),
+            'averageMonthlyRevenue': self.round_values(total_revenue / 12),
+            'averageMonthlyExpenses': self.round_values(total_expenses / 12)
+        }
+
+    def _cash_flow_forecast(self, summary: Dict[str, Any], industry) -> List[Dict[str, Any]]:
+        band_net = summary['bandNetCashFlow']
+        revenue_out = summary['bandRevenue'].tolist()
+        net_out = [tuple(row) for row in zip(*(self.round_values(band_net[:, b]) for b in range(3)))]
+        expenses_out = summary['expenses'].tolist()
+        multiplier_out = [
+            tuple(row.rounded_seasonal_multipliers[month - 1] for month in (1, 3, 12)) for row in self.industry_rows
+        ]
+
+        results = []
+        for i, ind in enumerate(industry.tolist()):
+            month_revenue = revenue_out[i]
+            month_net = net_out[i]
+            month_expenses = expenses_out[i]
+            month_multiplier = multiplier_out[ind]
+            results.append({
+                'monthlyForecast': [
+                    {
+                        'month': month,
+                        'revenue': month_revenue[band],
+                        'expenses': month_expenses,
+                        'netCashFlow': month_net[band],
+                        'seasonalMultiplier': month_multiplier[band]
+                    }
+                    for month, band in zip(MONTHS, MONTH_BANDS)
+                ],
+                'annualSummary': {
+                    'totalRevenue': summary['totalRevenue'][i],
+                    'totalExpenses': summary['totalExpenses'][i],
+                    'totalNetCashFlow': summary['totalNetCashFlow'][i],
+                    'averageMonthlyRevenue': summary['averageMonthlyRevenue'][i],
+                    'averageMonthlyExpenses': summary['averageMonthlyExpenses'][i]
+                },
+                'seasonalityFactor': self.seasonality_factor[ind]
+            })
+        return results
+
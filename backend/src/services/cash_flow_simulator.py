@@ -0,0 +1,176 @@
+import logging
+import threading
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Monthly log-volatility of (revenue, expenses) for each industry risk level
+RISK_VOLATILITY = {
+    'low': (0.04, 0.02),
+    'medium': (0.08, 0.03),
+    'high': (0.15, 0.05)
+}
+DEFAULT_RISK_LEVEL = 'medium'
+
+# Spread of the per-path seasonal amplitude around the benchmark seasonality
+SEASONAL_AMPLITUDE_VOLATILITY = 0.25
+
+PERCENTILES = (5, 25, 50, 75, 95)
+DEFAULT_PATHS = 10000
+MAX_PATHS = 1000000
+# Upper bound on the elements of one (paths x months) array, about 8 MB of float64
+CHUNK_ELEMENTS = 1000000
+
+
+def _simulate_chunk(params: Dict[str, Any], seed: np.random.SeedSequence, paths: int) -> Dict[str, Any]:
+    """Simulate one chunk of paths and reduce it to mergeable statistics"""
+    rng = np.random.default_rng(seed)
+    months = params['months']
+    seasonal = np.asarray(params['seasonalMultipliers'])
+    revenue_sigma = params['revenueVolatility']
+    expense_sigma = params['expenseVolatility']
+
+    # Each path scales the seasonal swing around 1.0 by its own amplitude
+    amplitude = rng.normal(1.0, SEASONAL_AMPLITUDE_VOLATILITY, size=(paths, 1))
+    seasonality = 1.0 + (seasonal - 1.0) * amplitude
+
+    # Revenue level follows a driftless geometric random walk, expenses are i.i.d. lognormal
+    revenue_shocks = rng.standard_normal((paths, months)) * revenue_sigma - revenue_sigma ** 2 / 2
+    revenue = params['monthlyRevenue'] * seasonality * np.exp(np.cumsum(revenue_shocks, axis=1))
+    del revenue_shocks, seasonality
+    expenses = params['monthlyExpenses'] * np.exp(
+        rng.standard_normal((paths, months)) * expense_sigma - expense_sigma ** 2 / 2
+    )
+
+    net_cash_flow = revenue - expenses
+    del expenses
+    balance = params['startingBalance'] + np.cumsum(net_cash_flow, axis=1)
+    minimum_balance = balance.min(axis=1)
+
+    return {
+        'paths': paths,
+        'revenue': np.percentile(revenue, PERCENTILES, axis=0),
+        'netCashFlow': np.percentile(net_cash_flow, PERCENTILES, axis=0),
+        'cashBalance': np.percentile(balance, PERCENTILES, axis=0),
+        'negativePaths': int(np.count_nonzero(minimum_balance < 0)),
+        'negativeByMonth': np.count_nonzero(balance < 0, axis=0),
+        'minimumBalanceSum': float(minimum_balance.sum())
+    }
+
+
+class SimulationPool:
+    """Worker processes shared by every simulation of one application.
+
+    Sized from configuration, never by the client, and created on first use
+    so importing or forking never starts processes. With ``max_workers`` of
+    1 or less chunks are simulated on the request thread.
+    """
+
+    def __init__(self, max_workers: int = 1):
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def parallel(self) -> bool:
+        return self.max_workers > 1
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+    def map(self, function, *iterables) -> list:
+        try:
+            return list(self._get_executor().map(function, *iterables))
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); the next simulation starts a fresh pool
+            logger.error('Simulation worker pool broken, restarting it')
+            with self._lock:
+                self._executor = None
+            raise
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+
+class CashFlowSimulator:
+    """Monte Carlo cash-flow simulation over (paths x months) arrays.
+
+    Paths are generated in chunks of at most ``chunk_elements`` values per
+    array so peak memory stays bounded, each chunk drawing from its own
+    child seed. Results are therefore reproducible for a given seed whether
+    the chunks run inline or on a shared ``SimulationPool``. Percentile
+    bands are the path-weighted mean of the per-chunk percentiles.
+    """
+
+    def __init__(self, chunk_elements: int = CHUNK_ELEMENTS, pool: SimulationPool = None):
+        self.chunk_elements = chunk_elements
+        self.pool = pool
+
+    def _chunk_sizes(self, paths: int, months: int) -> List[int]:
+        chunk_paths = max(1, self.chunk_elements // months)
+        full, remainder = divmod(paths, chunk_paths)
+        return [chunk_paths] * full + ([remainder] if remainder else [])
+
+    def simulate(self, monthly_revenue: float, monthly_expenses: float, starting_balance: float,
+                 seasonal_multipliers: Tuple[float, ...], risk_level: str, months: int = 12,
+                 paths: int = DEFAULT_PATHS, seed: int = None) -> Dict[str, Any]:
+        """Simulate revenue/expense paths and summarize the cash position"""
+        paths = max(1, min(int(paths), MAX_PATHS))
+        if seed is None:
+            # Keep generated seeds within the integer range JSON clients can echo back
+            seed = np.random.SeedSequence().entropy % 2 ** 53
+        revenue_sigma, expense_sigma = RISK_VOLATILITY.get(risk_level, RISK_VOLATILITY[DEFAULT_RISK_LEVEL])
+
+        params = {
+            'monthlyRevenue': float(monthly_revenue),
+            'monthlyExpenses': float(monthly_expenses),
+            'startingBalance': float(starting_balance),
+            'seasonalMultipliers': [seasonal_multipliers[m % len(seasonal_multipliers)] for m in range(months)],
+            'revenueVolatility': revenue_sigma,
+            'expenseVolatility': expense_sigma,
+            'months': months
+        }
+        sizes = self._chunk_sizes(paths, months)
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+        if self.pool is not None and self.pool.parallel and len(sizes) > 1:
+            chunks = self.pool.map(_simulate_chunk, [params] * len(sizes), seeds, sizes)
+        else:
+            chunks = [_simulate_chunk(params, s, n) for s, n in zip(seeds, sizes)]
+
+        return self._merge(chunks, paths, seed, params)
+
+    def _merge(self, chunks: List[Dict[str, Any]], paths: int, seed: int, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Combine per-chunk statistics into the simulation summary"""
+        weights = np.array([chunk['paths'] for chunk in chunks], dtype=float) / paths
+
+        def bands(key):
+            merged = np.tensordot(weights, np.stack([chunk[key] for chunk in chunks]), axes=1)
+            return {f'p{p}': np.round(row, 2).tolist() for p, row in zip(PERCENTILES, merged)}
+
+        negative_by_month = sum(chunk['negativeByMonth'] for chunk in chunks) / paths
+        return {
+            'paths': paths,
+            'months': params['months'],
+            'seed': seed,
+            'revenueVolatility': params['revenueVolatility'],
+            'expenseVolatility': params['expenseVolatility'],
+            'percentiles': list(PERCENTILES),
+            'bands': {
+                'revenue': bands('revenue'),
+                'netCashFlow': bands('netCashFlow'),
+                'cashBalance': bands('cashBalance')
+            },
+            'probabilityNegativeCash': round(sum(chunk['negativePaths'] for chunk in chunks) / paths, 4),
+            'monthlyProbabilityNegativeCash': np.round(negative_by_month, 4).tolist(),
+            'expectedMinimumBalance': round(sum(chunk['minimumBalanceSum'] for chunk in chunks) / paths, 2)
+        }
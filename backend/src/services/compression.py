@@ -0,0 +1,184 @@
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Iterable, Optional
+from flask import request
+from src.services.metrics import metrics
+
+try:
+    import brotli
+except ImportError:
+    # Optional: without the brotli package only gzip is offered
+    brotli = None
+
+DEFAULT_MIN_BYTES = 1024
+DEFAULT_GZIP_LEVEL = 6
+DEFAULT_BROTLI_QUALITY = 5
+# Formats that are already compressed (xlsx is a zip archive); recompressing only costs CPU
+INCOMPRESSIBLE_TYPES = (
+    'application/zip',
+    'application/gzip',
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'image/',
+    'audio/',
+    'video/',
+    'font/woff'
+)
+# Compressed bodies of responses with a strong ETag (pre-serialized reference data) are kept
+COMPRESSED_CACHE_SIZE = 64
+
+
+def _encoder(encoding: str, gzip_level: int, brotli_quality: int):
+    """(compress(chunk), flush(), finish()) for one response body"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=brotli_quality)
+        return compressor.process, compressor.flush, compressor.finish
+    compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+
+class CompressedStream:
+    """Compresses a streamed body chunk by chunk, so nothing is buffered.
+
+    Generated streams (NDJSON) are flushed after every chunk, which keeps
+    each event deliverable as soon as it is produced; file downloads are
+    not, for a better ratio.
+    """
+
+    def __init__(self, body: Iterable[bytes], encoding: str, flush_chunks: bool, labels, compressor: 'ResponseCompressor'):
+        self.body = body
+        self.encoding = encoding
+        self.flush_chunks = flush_chunks
+        self.labels = labels
+        self.compressor = compressor
+
+    def __iter__(self):
+        compress, flush, finish = _encoder(self.encoding, self.compressor.gzip_level, self.compressor.brotli_quality)
+        original = compressed = 0
+        for chunk in self.body:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            if not chunk:
+                continue
+            original += len(chunk)
+            data = compress(chunk)
+            if self.flush_chunks:
+                data += flush()
+            if data:
+                compressed += len(data)
+                yield data
+        data = finish()
+        compressed += len(data)
+        yield data
+        _record(self.labels, original, compressed)
+
+    def close(self):
+        # The original body may hold a file or a database cursor
+        close = getattr(self.body, 'close', None)
+        if close is not None:
+            close()
+
+
+def _record(labels, original: int, compressed: int):
+    metrics.inc('http_compression_input_bytes_total', labels, original)
+    metrics.inc('http_compression_output_bytes_total', labels, compressed)
+    if original:
+        metrics.observe('http_response_compression_ratio', compressed / original, labels)
+
+
+class ResponseCompressor:
+    """gzip/brotli Content-Encoding negotiated from Accept-Encoding.
+
+    Bodies smaller than ``min_bytes``, partial and conditional responses,
+    responses already carrying a Content-Encoding (or Cache-Control:
+    no-transform) and already-compressed formats are sent as they are.
+    Streamed responses are compressed as they stream. A compressed
+    response's strong ETag becomes weak, since its bytes differ from the
+    identity encoding; If-None-Match still matches it.
+    """
+
+    def __init__(self, min_bytes: int = DEFAULT_MIN_BYTES, gzip_level: int = DEFAULT_GZIP_LEVEL,
+                 brotli_quality: int = DEFAULT_BROTLI_QUALITY):
+        self.min_bytes = min_bytes
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.encodings = ('br', 'gzip') if brotli is not None else ('gzip',)
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def negotiate(self, accept_encodings) -> Optional[str]:
+        """The encoding the client prefers among those offered (brotli wins ties), or None"""
+        best = accept_encodings.best_match(self.encodings)
+        return best if best in self.encodings else None
+
+    def compressible(self, response) -> bool:
+        if response.status_code < 200 or response.status_code in (204, 206, 304):
+            return False
+        if 'Content-Encoding' in response.headers or 'no-transform' in response.headers.get('Cache-Control', ''):
+            return False
+        mimetype = response.mimetype or ''
+        return not any(mimetype.startswith(prefix) for prefix in INCOMPRESSIBLE_TYPES)
+
+    def compress(self, data: bytes, encoding: str) -> bytes:
+        compress, _, finish = _encoder(encoding, self.gzip_level, self.brotli_quality)
+        return compress(data) + finish()
+
+    def _cached(self, etag: str, data: bytes, encoding: str) -> bytes:
+        key = (etag, encoding)
+        with self._lock:
+            body = self._cache.get(key)
+            if body is not None:
+                self._cache.move_to_end(key)
+                return body
+        body = self.compress(data, encoding)
+        with self._lock:
+            self._cache[key] = body
+            while len(self._cache) > COMPRESSED_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return body
+
+    def process(self, response):
+        """Compress the response in place if the client accepts it and it is worth it"""
+        if request.method == 'HEAD' or not self.compressible(response):
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = self.negotiate(request.accept_encodings)
+        if encoding is None:
+            return response
+        if response.content_length is not None and response.content_length < self.min_bytes:
+            return response
+
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        labels = (('encoding', encoding), ('route', route))
+        etag, weak = response.get_etag()
+        if response.is_streamed:
+            # Generated bodies are flushed per chunk; files (send_file) stream in large blocks anyway
+            flush_chunks = not response.direct_passthrough
+            response.response = CompressedStream(response.response, encoding, flush_chunks, labels, self)
+            response.direct_passthrough = False
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_bytes:
+                return response
+            body = self._cached(etag, data, encoding) if etag and not weak else self.compress(data, encoding)
+            response.set_data(body)
+            _record(labels, len(data), len(body))
+        response.headers['Content-Encoding'] = encoding
+        # Byte ranges would refer to the identity encoding
+        response.headers.pop('Accept-Ranges', None)
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+
+def init_app(app, compressor: ResponseCompressor):
+    """Compress the responses of the application.
+
+    Registered after the metrics hooks, so it runs before them and the
+    recorded response sizes are the bytes actually sent.
+    """
+
+    @app.after_request
+    def compress_response(response):
+        return compressor.process(response)
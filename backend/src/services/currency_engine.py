@@ -0,0 +1,146 @@
+import numpy as np
+from typing import Dict, Any, List, Tuple
+
+DEFAULT_CURRENCY = 'USD'
+
+# Cost of one conversion hop when choosing between quotes: a quoted rate is
+# preferred over the inverse of the opposite quote, and both over triangulation
+DIRECT_HOP_COST = 1.0
+INVERSE_HOP_COST = 1.01
+
+# Keys whose values are amounts of money. Lists and objects under these keys
+# (forecast bands, payoff schedules, operating expense lines) are money throughout.
+MONETARY_FIELDS = frozenset({
+    # Business inputs
+    'monthlyRevenue', 'currentSavings', 'operatingExpenses', 'amount', 'monthlyPayment',
+    # Emergency, benefits and growth funds
+    'recommendedAmount', 'currentGap', 'monthlyContribution', 'monthlyExpenses',
+    'totalBudget', 'healthBenefits', 'retirementContribution', 'bonusPool', 'perEmployeeMonthly',
+    'marketingBudget', 'hiringBudget', 'equipmentUpgrade', 'researchDevelopment',
+    # Tax and retirement
+    'estimatedTaxLiability', 'corporateTax', 'payrollTax', 'annualProfit',
+    'regionalTax', 'tradeTax', 'vatPayable', 'totalLiability', 'annualPayroll', 'valueAdded',
+    'maxContribution', 'recommendedContribution',
+    # Debt management and payoff plans
+    'totalDebt', 'monthlyPayments', 'totalAmount', 'monthlySavings', 'potentialSavings',
+    'extraPayment', 'monthlyBudget', 'totalInterest', 'totalPaid', 'interestPaid',
+    'balance', 'payment', 'interest', 'debtBalances',
+    # Cash flow forecast and simulation
+    'revenue', 'expenses', 'netCashFlow', 'cashBalance', 'totalRevenue', 'totalExpenses',
+    'totalNetCashFlow', 'averageMonthlyRevenue', 'averageMonthlyExpenses', 'expectedMinimumBalance'
+})
+
+
+class CurrencyEngine:
+    """Dense exchange-rate matrix built once from the sparse pairwise quotes.
+
+    ``rates[i, j]`` is the amount of currency j bought by one unit of currency
+    i. Pairs without a quote use the inverse of the opposite quote, and pairs
+    with neither are triangulated through whichever intermediate currency
+    gives the cheapest chain of quotes (Floyd-Warshall over hop costs).
+    """
+
+    def __init__(self, currencies: Dict[str, Any]):
+        currency_data = currencies['currencies']
+        codes = list(currency_data)
+        for data in currency_data.values():
+            codes.extend(code for code in data.get('exchangeRates', {}) if code not in codes)
+        self.codes = codes
+        self.index = {code: i for i, code in enumerate(codes)}
+        self.symbols = {code: currency_data.get(code, {}).get('symbol', code) for code in codes}
+
+        n = len(codes)
+        rates = np.ones((n, n))
+        cost = np.full((n, n), np.inf)
+        np.fill_diagonal(cost, 0.0)
+        quoted = np.zeros((n, n), dtype=bool)
+        for base, data in currency_data.items():
+            for quote, rate in data.get('exchangeRates', {}).items():
+                i, j = self.index[base], self.index[quote]
+                if rate and i != j:
+                    rates[i, j] = rate
+                    cost[i, j] = DIRECT_HOP_COST
+                    quoted[i, j] = True
+
+        # Fill one-sided pairs with the inverse of the opposite quote
+        inverse = ~quoted & quoted.T
+        rates[inverse] = 1.0 / rates.T[inverse]
+        cost[inverse] = INVERSE_HOP_COST
+
+        # Relax every pair through each intermediate currency in turn
+        via = np.full((n, n), -1)
+        for k in range(n):
+            through = cost[:, k, None] + cost[None, k, :]
+            better = through < cost
+            if better.any():
+                rates = np.where(better, rates[:, k, None] * rates[None, k, :], rates)
+                via = np.where(better, k, via)
+                cost = np.where(better, through, cost)
+
+        self.rates = rates
+        self.reachable = np.isfinite(cost)
+        self.via = via
+
+    def _position(self, code: str) -> int:
+        position = self.index.get((code or '').upper())
+        if position is None:
+            raise ValueError(f'Unsupported currency: {code}')
+        return position
+
+    def symbol(self, code: str) -> str:
+        """Display symbol for a currency code (falls back to the code itself)"""
+        return self.symbols.get((code or '').upper(), code)
+
+    def rate(self, from_currency: str, to_currency: str) -> float:
+        """Rate converting one unit of from_currency into to_currency"""
+        i, j = self._position(from_currency), self._position(to_currency)
+        if not self.reachable[i, j]:
+            raise ValueError(f'No exchange rate path from {from_currency} to {to_currency}')
+        return float(self.rates[i, j])
+
+    def rates_for(self, base_currency: str) -> Dict[str, Any]:
+        """Every resolved rate from a base currency, and which ones were triangulated"""
+        i = self._position(base_currency)
+        row = np.round(self.rates[i], 6).tolist()
+        return {
+            'rates': {code: rate for j, (code, rate) in enumerate(zip(self.codes, row)) if j != i and self.reachable[i, j]},
+            'triangulated': {
+                code: self.codes[self.via[i, j]] for j, code in enumerate(self.codes) if self.via[i, j] >= 0
+            }
+        }
+
+    def _collect(self, value: Any, monetary: bool, refs: List[Tuple[Any, Any]], amounts: List[float]) -> Any:
+        """Copy a JSON-like structure, recording where each monetary number goes"""
+        if isinstance(value, dict):
+            copy = {}
+            for key, item in value.items():
+                is_money = monetary or key in MONETARY_FIELDS
+                copy[key] = self._collect(item, is_money, refs, amounts)
+                if is_money and self._is_number(item):
+                    refs.append((copy, key))
+                    amounts.append(item)
+            return copy
+        if isinstance(value, list):
+            copy = [self._collect(item, monetary, refs, amounts) for item in value]
+            if monetary:
+                for position, item in enumerate(value):
+                    if self._is_number(item):
+                        refs.append((copy, position))
+                        amounts.append(item)
+            return copy
+        return value
+
+    @staticmethod
+    def _is_number(value: Any) -> bool:
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+    def convert_payload(self, payload: Any, from_currency: str, to_currency: str) -> Any:
+        """Return a copy of payload with every monetary field converted, in one array multiply"""
+        rate = self.rate(from_currency, to_currency)
+        refs, amounts = [], []
+        converted = self._collect(payload, False, refs, amounts)
+        if amounts:
+            values = np.round(np.asarray(amounts, dtype=float) * rate, 2).tolist()
+            for (container, key), value in zip(refs, values):
+                container[key] = value
+        return converted
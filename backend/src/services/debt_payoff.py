@@ -0,0 +1,193 @@
+import datetime
+import numpy as np
+from typing import Dict, Any, List, Optional
+
+# Debt ``interestRate`` inputs are annual percentages, as the debt form sends them (7.5 means 7.5%)
+INTEREST_RATE_UNIT = 100.0
+HIGH_INTEREST_THRESHOLD = 0.08
+# Consolidated loans are assumed to get a 20% lower rate, as in calculate_debt_management
+CONSOLIDATION_RATE_FACTOR = 0.8
+PAYOFF_STRATEGIES = ('avalanche', 'snowball', 'consolidation')
+DEFAULT_HORIZON_MONTHS = 360
+MAX_HORIZON_MONTHS = 600
+PAID_OFF_EPSILON = 0.005
+
+
+def annual_rate(debt: Dict[str, Any]) -> float:
+    """A debt's annual interest rate as a fraction of its balance"""
+    return float(debt.get('interestRate', 0)) / INTEREST_RATE_UNIT
+
+
+def _add_months(start: datetime.date, months: int) -> str:
+    month_index = start.year * 12 + start.month - 1 + months
+    return f'{month_index // 12:04d}-{month_index % 12 + 1:02d}'
+
+
+class DebtPayoffSimulator:
+    """Month-by-month amortization of every debt under avalanche, snowball and consolidation.
+
+    Each month is a handful of array operations across all debts: interest
+    accrues, minimum payments are made, and the rest of the fixed monthly
+    budget (minimums plus any extra payment, so freed-up minimums roll over)
+    is poured into debts in strategy priority order using a cumulative sum.
+    """
+
+    def __init__(self, horizon_months: int = DEFAULT_HORIZON_MONTHS):
+        self.horizon_months = horizon_months
+
+    def _amortize(self, balance: np.ndarray, monthly_rate: np.ndarray, minimum: np.ndarray,
+                  order: np.ndarray, budget: float, horizon: int) -> Dict[str, Any]:
+        """Run the payoff loop for one priority order"""
+        balance = balance.copy()
+        count = balance.size
+        payoff_month = np.zeros(count, dtype=np.int64)
+        interest_paid = np.zeros(count)
+        balances = np.zeros((horizon, count))
+        payments = np.zeros(horizon)
+        interests = np.zeros(horizon)
+
+        months = 0
+        for month in range(horizon):
+            if not (balance > PAID_OFF_EPSILON).any():
+                break
+            interest = balance * monthly_rate
+            balance += interest
+            payment = np.minimum(minimum, balance)
+
+            # Pour what is left of the budget into debts in priority order
+            remaining = (balance - payment)[order]
+            available = max(budget - payment.sum(), 0.0)
+            already_covered = np.cumsum(remaining) - remaining
+            payment[order] += np.clip(available - already_covered, 0.0, remaining)
+
+            balance -= payment
+            balance[balance <= PAID_OFF_EPSILON] = 0.0
+            newly_paid = (balance == 0.0) & (payoff_month == 0)
+            payoff_month[newly_paid] = month + 1
+
+            interest_paid += interest
+            balances[month] = balance
+            payments[month] = payment.sum()
+            interests[month] = interest.sum()
+            months = month + 1
+
+        paid_off = not (balance > PAID_OFF_EPSILON).any()
+        return {
+            'months': months,
+            'paidOff': paid_off,
+            'payoffMonth': payoff_month,
+            'interestPaid': interest_paid,
+            'balances': balances[:months],
+            'payments': payments[:months],
+            'interests': interests[:months]
+        }
+
+    def _strategy_result(self, name: str, run: Dict[str, Any], debts: List[Dict[str, Any]],
+                         start: datetime.date, full_schedule: bool) -> Dict[str, Any]:
+        months = run['months']
+        payoff_month = run['payoffMonth'].tolist()
+        interest_paid = np.round(run['interestPaid'], 2).tolist()
+        result = {
+            'strategy': name,
+            'paidOff': run['paidOff'],
+            'months': months if run['paidOff'] else None,
+            'payoffDate': _add_months(start, months) if run['paidOff'] else None,
+            'totalInterest': round(float(run['interestPaid'].sum()), 2),
+            'totalPaid': round(float(run['payments'].sum()), 2),
+            'debts': [
+                dict(debt, payoffMonth=month or None,
+                     payoffDate=_add_months(start, month) if month else None,
+                     interestPaid=interest)
+                for debt, month, interest in zip(debts, payoff_month, interest_paid)
+            ],
+            # Columnar per-month totals rather than one dict per month
+            'schedule': {
+                'balance': np.round(run['balances'].sum(axis=1), 2).tolist(),
+                'payment': np.round(run['payments'], 2).tolist(),
+                'interest': np.round(run['interests'], 2).tolist()
+            }
+        }
+        if full_schedule:
+            # Each debt's balances stop at its payoff month instead of trailing zeros
+            result['schedule']['debtBalances'] = [
+                np.round(run['balances'][:month or months, i], 2).tolist()
+                for i, month in enumerate(payoff_month)
+            ]
+        return result
+
+    def simulate(self, debt_obligations: List[Dict[str, Any]], extra_payment: float = 0,
+                 strategies: List[str] = None, horizon_months: int = None,
+                 start_date: Optional[str] = None, full_schedule: bool = False) -> Dict[str, Any]:
+        """Compare payoff strategies for a set of debts"""
+        strategies = list(strategies or PAYOFF_STRATEGIES)
+        unknown = [name for name in strategies if name not in PAYOFF_STRATEGIES]
+        if unknown:
+            raise ValueError(f'Unknown payoff strategies: {", ".join(unknown)}')
+        horizon = max(1, min(int(horizon_months or self.horizon_months), MAX_HORIZON_MONTHS))
+        extra_payment = max(float(extra_payment or 0), 0.0)
+        start = (datetime.datetime.strptime(start_date, '%Y-%m').date() if start_date
+                 else datetime.date.today().replace(day=1))
+
+        debts = [
+            {
+                'index': i,
+                'type': debt.get('type', 'Debt'),
+                'amount': float(debt.get('amount', 0)),
+                'interestRate': float(debt.get('interestRate', 0)),
+                'monthlyPayment': float(debt.get('monthlyPayment', 0))
+            }
+            for i, debt in enumerate(debt_obligations)
+        ]
+        results = {}
+        if debts:
+            balance = np.array([debt['amount'] for debt in debts])
+            rate = np.array([annual_rate(debt) for debt in debts])
+            minimum = np.array([debt['monthlyPayment'] for debt in debts])
+            budget = float(minimum.sum()) + extra_payment
+            # Stable sorts keep input order between equal rates or balances
+            orders = {
+                'avalanche': np.argsort(-rate, kind='stable'),
+                'snowball': np.argsort(balance, kind='stable')
+            }
+            for name in strategies:
+                if name == 'consolidation':
+                    results[name] = self._consolidation(debts, rate, budget, horizon, start, full_schedule)
+                    continue
+                run = self._amortize(balance, rate / 12, minimum, orders[name], budget, horizon)
+                results[name] = self._strategy_result(name, run, debts, start, full_schedule)
+
+        finished = [r for r in results.values() if r['paidOff']]
+        best = min(finished, key=lambda r: (r['totalInterest'], r['months']))['strategy'] if finished else None
+        return {
+            'startDate': _add_months(start, 0),
+            'horizonMonths': horizon,
+            'extraPayment': round(extra_payment, 2),
+            'monthlyBudget': round(sum(debt['monthlyPayment'] for debt in debts) + extra_payment, 2),
+            'recommendedStrategy': best,
+            'strategies': results
+        }
+
+    def _consolidation(self, debts: List[Dict[str, Any]], rate: np.ndarray, budget: float, horizon: int,
+                       start: datetime.date, full_schedule: bool) -> Dict[str, Any]:
+        """Merge high-interest debts into one cheaper loan, then pay down avalanche-style"""
+        high = rate > HIGH_INTEREST_THRESHOLD
+        if high.sum() > 1:
+            merged = [debts[i] for i in np.flatnonzero(high)]
+            consolidated = {
+                'index': None,
+                'type': 'Consolidated Loan',
+                'consolidates': [debt['index'] for debt in merged],
+                'amount': sum(debt['amount'] for debt in merged),
+                'interestRate': round(float(rate[high].mean()) * CONSOLIDATION_RATE_FACTOR * INTEREST_RATE_UNIT, 4),
+                'monthlyPayment': sum(debt['monthlyPayment'] for debt in merged)
+            }
+            restructured = [consolidated] + [debts[i] for i in np.flatnonzero(~high)]
+        else:
+            restructured = debts
+        balance = np.array([debt['amount'] for debt in restructured])
+        new_rate = np.array([annual_rate(debt) for debt in restructured])
+        minimum = np.array([debt['monthlyPayment'] for debt in restructured])
+        run = self._amortize(balance, new_rate / 12, minimum, np.argsort(-new_rate, kind='stable'), budget, horizon)
+        result = self._strategy_result('consolidation', run, restructured, start, full_schedule)
+        result['applicable'] = restructured is not debts
+        return result
@@ -1,31 +1,107 @@
+import hashlib
+import itertools
 import json
 import os
-from typing import Dict, Any, List
+import time
+from typing import Dict, Any, List, Iterator
+from src.services.batch_calculator import BatchCalculator
+from src.services.parameter_plans import ParameterPlans, EvaluationContext, DEFAULT_FORECAST_MONTHS, MAX_FORECAST_MONTHS, MONTH_BANDS
+from src.services.cash_flow_simulator import CashFlowSimulator, SimulationPool, DEFAULT_PATHS
+from src.services.scenario_sweep import ScenarioSweep
+from src.services.debt_payoff import DebtPayoffSimulator, annual_rate, HIGH_INTEREST_THRESHOLD
+from src.services.currency_engine import CurrencyEngine, DEFAULT_CURRENCY
+from src.services.tax_engine import TaxEngine
+from src.services.reference_responses import ReferenceResponses
+from src.services.metrics import metrics
+
+REFERENCE_DATA_FILES = ('tax_rates.json', 'industry_benchmarks.json', 'currencies.json')
+# Response key -> calculate_* method, in response order
+SECTIONS = (
+    ('emergencyFund', 'calculate_emergency_fund'),
+    ('employeeBenefitsFund', 'calculate_employee_benefits_fund'),
+    ('growthFund', 'calculate_growth_fund'),
+    ('taxPlanning', 'calculate_tax_planning'),
+    ('debtManagement', 'calculate_debt_management'),
+    ('retirementPlanning', 'calculate_retirement_planning'),
+    ('cashFlowForecast', 'calculate_cash_flow_forecast')
+)
+# Per-section timings of every request, recorded with one lock round trip
+section_timings = metrics.histogram_group(
+    'calculator_section_duration_seconds', 'section', tuple(name for name, _ in SECTIONS)
+)
+
+class ForecastTotals:
+    """Running forecast totals, summed month by month in forecast order"""
 
-class FinancialCalculator:
     def __init__(self):
-        self.data_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
+        self.months = 0
+        self.revenue = 0
+        self.expenses = 0
+        self._first_year = None
+
+    def add(self, month: Dict[str, Any]):
+        self.months += 1
+        self.revenue += month['revenue']
+        self.expenses += month['expenses']
+        if self.months == DEFAULT_FORECAST_MONTHS:
+            self._first_year = (self.months, self.revenue, self.expenses)
+
+    def extend(self, months: List[Dict[str, Any]]):
+        """Add a whole forecast; the same sums as calling add month by month, on locals"""
+        count, revenue, expenses = self.months, self.revenue, self.expenses
+        for month in months:
+            count += 1
+            revenue += month['revenue']
+            expenses += month['expenses']
+            if count == DEFAULT_FORECAST_MONTHS:
+                self._first_year = (count, revenue, expenses)
+        self.months, self.revenue, self.expenses = count, revenue, expenses
+
+    def first_year(self):
+        """(months, revenue, expenses) over the first year, or the whole forecast if shorter"""
+        return self._first_year or (max(self.months, 1), self.revenue, self.expenses)
+
+
+class FinancialCalculator:
+    def __init__(self, data_dir: str = None, simulation_pool: SimulationPool = None):
+        self.data_dir = data_dir or os.path.join(os.path.dirname(__file__), '..', 'data')
+        self._fingerprint = hashlib.sha256()
         self.tax_rates = self._load_json('tax_rates.json')
         self.industry_benchmarks = self._load_json('industry_benchmarks.json')
         self.currencies = self._load_json('currencies.json')
+        # Changes whenever any reference data file changes; used in cache keys
+        self.data_version = self._fingerprint.hexdigest()[:16]
+        self.plans = ParameterPlans(self.industry_benchmarks, self.tax_rates)
+        self.batch_calculator = BatchCalculator(self)
+        self.cash_flow_simulator = CashFlowSimulator(pool=simulation_pool)
+        self.scenario_sweep = ScenarioSweep(self.batch_calculator)
+        self.debt_payoff_simulator = DebtPayoffSimulator()
+        self.currency_engine = CurrencyEngine(self.currencies)
+        self.tax_engine = TaxEngine(self.tax_rates)
+        self.reference_responses = ReferenceResponses(self)
     
     def _load_json(self, filename: str) -> Dict:
         """Load JSON data from file"""
         file_path = os.path.join(self.data_dir, filename)
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+        self._fingerprint.update(filename.encode('utf-8') + b'\0' + raw)
+        return json.loads(raw.decode('utf-8'))
     
-    def calculate_emergency_fund(self, business_data: Dict[str, Any]) -> Dict[str, Any]:
+    def create_context(self, business_data: Dict[str, Any]) -> EvaluationContext:
+        """Resolve the parameter plan and shared intermediates for one request"""
+        return EvaluationContext(business_data, self.plans)
+    
+    def calculate_emergency_fund(self, business_data: Dict[str, Any], context: EvaluationContext = None) -> Dict[str, Any]:
         """Calculate emergency fund recommendations"""
-        monthly_expenses = self._calculate_monthly_expenses(business_data)
-        industry = business_data.get('industry', 'technology')
+        context = context or self.create_context(business_data)
+        monthly_expenses = context.monthly_expenses
         
         # Get industry-specific multiplier
-        industry_data = self.industry_benchmarks['industries'].get(industry, {})
-        multiplier = industry_data.get('emergencyFundMultiplier', 4)
+        multiplier = context.plan.industry.emergency_fund_multiplier
         
         recommended_amount = monthly_expenses * multiplier
-        current_savings = business_data.get('currentSavings', 0)
+        current_savings = context.current_savings
         gap = max(0, recommended_amount - current_savings)
         
         # Calculate monthly contribution needed (assuming 12 months to reach goal)
@@ -41,13 +117,11 @@ class FinancialCalculator:
             'multiplier': multiplier
         }
     
-    def calculate_growth_fund(self, business_data: Dict[str, Any]) -> Dict[str, Any]:
+    def calculate_growth_fund(self, business_data: Dict[str, Any], context: EvaluationContext = None) -> Dict[str, Any]:
         """Calculate growth fund recommendations"""
-        monthly_revenue = business_data.get('monthlyRevenue', 0)
-        industry = business_data.get('industry', 'technology')
-        
-        industry_data = self.industry_benchmarks['industries'].get(industry, {})
-        growth_percentage = industry_data.get('growthInvestmentPercentage', 0.15)
+        context = context or self.create_context(business_data)
+        monthly_revenue = context.monthly_revenue
+        growth_percentage = context.plan.industry.growth_investment_percentage
         
         total_growth_budget = monthly_revenue * growth_percentage
         
@@ -66,15 +140,14 @@ class FinancialCalculator:
             'growthPercentage': growth_percentage
         }
     
-    def calculate_employee_benefits_fund(self, business_data: Dict[str, Any]) -> Dict[str, Any]:
+    def calculate_employee_benefits_fund(self, business_data: Dict[str, Any], context: EvaluationContext = None) -> Dict[str, Any]:
         """Calculate employee benefits fund recommendations"""
-        employee_count = business_data.get('employeeCount', 0)
-        monthly_revenue = business_data.get('monthlyRevenue', 0)
-        industry = business_data.get('industry', 'technology')
+        context = context or self.create_context(business_data)
+        employee_count = context.employee_count
+        monthly_revenue = context.monthly_revenue
         
-        industry_data = self.industry_benchmarks['industries'].get(industry, {})
-        benefits_percentage = industry_data.get('employeeBenefitsPercentage', 0.12)
-        avg_employee_cost = industry_data.get('averageEmployeeCost', 50000)
+        benefits_percentage = context.plan.industry.employee_benefits_percentage
+        avg_employee_cost = context.plan.industry.average_employee_cost
         
         # Calculate based on revenue percentage
         revenue_based_budget = monthly_revenue * benefits_percentage
@@ -99,27 +172,19 @@ class FinancialCalculator:
             'perEmployeeMonthly': round(total_benefits_budget / max(employee_count, 1), 2)
         }
     
-    def calculate_tax_planning(self, business_data: Dict[str, Any]) -> Dict[str, Any]:
+    def calculate_tax_planning(self, business_data: Dict[str, Any], context: EvaluationContext = None) -> Dict[str, Any]:
         """Calculate tax planning recommendations"""
-        country = business_data.get('location', {}).get('country', 'US')
-        monthly_revenue = business_data.get('monthlyRevenue', 0)
-        monthly_expenses = self._calculate_monthly_expenses(business_data)
-        
-        annual_revenue = monthly_revenue * 12
-        annual_expenses = monthly_expenses * 12
-        annual_profit = annual_revenue - annual_expenses
+        context = context or self.create_context(business_data)
+        annual_profit = context.annual_profit
         
-        tax_data = self.tax_rates['countries'].get(country, {})
-        corporate_tax_rate = tax_data.get('corporateTaxRate', 0.21)
-        payroll_tax_rate = tax_data.get('payrollTaxRate', 0.15)
+        country_params = context.plan.country
         
-        # Calculate estimated tax liability
-        corporate_tax = annual_profit * corporate_tax_rate if annual_profit > 0 else 0
-        payroll_tax = (business_data.get('employeeCount', 0) * 50000) * payroll_tax_rate
-        total_tax_liability = corporate_tax + payroll_tax
+        # Headline figures come from the progressive breakdown, on the industry's real payroll;
+        # corporateTaxRate is the effective bracket rate, corporateTax over taxable profit
+        breakdown = self.calculate_tax_breakdown(business_data, context)
         
         # Get available deductions
-        deductions = tax_data.get('deductions', [])
+        deductions = list(country_params.deductions)
         
         # Tax saving strategies
         strategies = [
@@ -130,16 +195,25 @@ class FinancialCalculator:
         ]
         
         return {
-            'estimatedTaxLiability': round(total_tax_liability, 2),
-            'corporateTax': round(corporate_tax, 2),
-            'payrollTax': round(payroll_tax, 2),
-            'corporateTaxRate': corporate_tax_rate,
+            'estimatedTaxLiability': breakdown['totalLiability'],
+            'corporateTax': breakdown['corporateTax'],
+            'payrollTax': breakdown['payrollTax'],
+            'corporateTaxRate': breakdown['corporateEffectiveRate'],
             'recommendedDeductions': deductions,
             'taxSavingStrategies': strategies,
-            'annualProfit': round(annual_profit, 2)
+            'annualProfit': round(annual_profit, 2),
+            'taxBreakdown': breakdown
         }
     
-    def calculate_debt_management(self, business_data: Dict[str, Any]) -> Dict[str, Any]:
+    def calculate_tax_breakdown(self, business_data: Dict[str, Any], context: EvaluationContext = None) -> Dict[str, Any]:
+        """Calculate progressive corporate, regional, trade, payroll and VAT liability"""
+        context = context or self.create_context(business_data)
+        return self.tax_engine.profile_breakdown(
+            context.country, context.region, context.monthly_revenue, context.total_operating,
+            context.employee_count, context.plan.industry.average_employee_cost
+        )
+    
+    def calculate_debt_management(self, business_data: Dict[str, Any], context: EvaluationContext = None) -> Dict[str, Any]:
         """Calculate debt management recommendations"""
         debt_obligations = business_data.get('debtObligations', [])
         
@@ -155,16 +229,13 @@ class FinancialCalculator:
         total_debt = sum(debt.get('amount', 0) for debt in debt_obligations)
         total_monthly_payments = sum(debt.get('monthlyPayment', 0) for debt in debt_obligations)
         
-        # Sort debts by interest rate (highest first) for avalanche method
-        sorted_debts = sorted(debt_obligations, key=lambda x: x.get('interestRate', 0), reverse=True)
-        
         # Identify consolidation opportunities (debts with high interest rates)
-        high_interest_debts = [debt for debt in debt_obligations if debt.get('interestRate', 0) > 0.08]
+        high_interest_debts = [debt for debt in debt_obligations if annual_rate(debt) > HIGH_INTEREST_THRESHOLD]
         
         consolidation_opportunities = []
         if len(high_interest_debts) > 1:
             total_high_interest = sum(debt.get('amount', 0) for debt in high_interest_debts)
-            avg_interest_rate = sum(debt.get('interestRate', 0) for debt in high_interest_debts) / len(high_interest_debts)
+            avg_interest_rate = sum(annual_rate(debt) for debt in high_interest_debts) / len(high_interest_debts)
             
             consolidation_opportunities.append({
                 'type': 'High Interest Debt Consolidation',
@@ -185,7 +256,7 @@ class FinancialCalculator:
         else:
             payoff_strategy = "No debt to manage"
         
-        return {
+        result = {
             'totalDebt': round(total_debt, 2),
             'monthlyPayments': round(total_monthly_payments, 2),
             'consolidationOpportunities': consolidation_opportunities,
@@ -193,14 +264,34 @@ class FinancialCalculator:
             'potentialSavings': round(potential_savings, 2),
             'debtToRevenueRatio': round(total_debt / (business_data.get('monthlyRevenue', 1) * 12), 2)
         }
+        
+        # Optional month-by-month payoff simulation of each strategy
+        debt_payoff = business_data.get('debtPayoff')
+        if debt_payoff:
+            result['payoffPlan'] = self.simulate_debt_payoff(business_data, debt_payoff)
+        
+        return result
+    
+    def simulate_debt_payoff(self, business_data: Dict[str, Any], options: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Simulate avalanche, snowball and consolidation payoff of the business debts"""
+        options = options if isinstance(options, dict) else {}
+        return self.debt_payoff_simulator.simulate(
+            business_data.get('debtObligations', []),
+            extra_payment=options.get('extraPayment', 0),
+            strategies=options.get('strategies'),
+            horizon_months=options.get('horizonMonths'),
+            start_date=options.get('startDate'),
+            full_schedule=options.get('schedule') == 'full'
+        )
     
     TAX_ADVANTAGES_VARY = "Tax advantages vary by country"
 
-    def calculate_retirement_planning(self, business_data: Dict[str, Any]) -> Dict[str, Any]:
+    def calculate_retirement_planning(self, business_data: Dict[str, Any], context: EvaluationContext = None) -> Dict[str, Any]:
         """Calculate retirement planning recommendations"""
-        employee_count = business_data.get('employeeCount', 0)
-        monthly_revenue = business_data.get('monthlyRevenue', 0)
-        country = business_data.get('location', {}).get('country', 'US')
+        context = context or self.create_context(business_data)
+        employee_count = context.employee_count
+        monthly_revenue = context.monthly_revenue
+        country = context.country
         
         # Determine recommended plan based on business size and country
         if employee_count <= 1:
@@ -245,80 +336,173 @@ class FinancialCalculator:
             'contributionPercentage': 0.12
         }
     
-    def calculate_cash_flow_forecast(self, business_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Calculate 12-month cash flow forecast"""
-        monthly_revenue = business_data.get('monthlyRevenue', 0)
-        monthly_expenses = self._calculate_monthly_expenses(business_data)
-        industry = business_data.get('industry', 'technology')
-        
-        industry_data = self.industry_benchmarks['industries'].get(industry, {})
-        seasonality_factor = industry_data.get('seasonalityFactor', 1.0)
-        
-        # Generate 12-month forecast with seasonality
-        forecast = []
-        for month in range(1, 13):
-            # Apply seasonality (peak in Q4 for most businesses)
-            if month in [11, 12]:  # November, December
-                seasonal_multiplier = seasonality_factor
-            elif month in [1, 2]:  # January, February
-                seasonal_multiplier = 1 / seasonality_factor
-            else:
-                seasonal_multiplier = 1.0
-            
-            month_revenue = monthly_revenue * seasonal_multiplier
-            month_expenses = monthly_expenses
-            net_cash_flow = month_revenue - month_expenses
-            
-            forecast.append({
+    def calculate_cash_flow_forecast(self, business_data: Dict[str, Any], context: EvaluationContext = None) -> Dict[str, Any]:
+        """Calculate cash flow forecast (12 months unless forecastMonths is given)"""
+        context = context or self.create_context(business_data)
+        calendar, month_expenses = self._forecast_calendar(context)
+        # Built in one comprehension rather than through the forecast_months generator
+        forecast = [
+            {
                 'month': month,
-                'revenue': round(month_revenue, 2),
-                'expenses': round(month_expenses, 2),
-                'netCashFlow': round(net_cash_flow, 2),
-                'seasonalMultiplier': round(seasonal_multiplier, 2)
-            })
+                'revenue': month_revenue,
+                'expenses': month_expenses,
+                'netCashFlow': net_cash_flow,
+                'seasonalMultiplier': rounded_multiplier
+            }
+            for month, (month_revenue, net_cash_flow, rounded_multiplier)
+            in zip(range(1, context.forecast_months + 1), itertools.cycle(calendar))
+        ]
+        totals = ForecastTotals()
+        totals.extend(forecast)
+        
+        result = {'monthlyForecast': forecast}
+        result.update(self.summarize_cash_flow_forecast(business_data, totals, context))
+        return result
+    
+    def forecast_months(self, context: EvaluationContext, months: int = None) -> Iterator[Dict[str, Any]]:
+        """Yield the cash flow forecast one month at a time"""
+        months = months or context.forecast_months
+        calendar, month_expenses = self._forecast_calendar(context)
+        for month in range(1, months + 1):
+            month_revenue, net_cash_flow, rounded_multiplier = calendar[(month - 1) % 12]
+            yield {
+                'month': month,
+                'revenue': month_revenue,
+                'expenses': month_expenses,
+                'netCashFlow': net_cash_flow,
+                'seasonalMultiplier': rounded_multiplier
+            }
+    
+    def _forecast_calendar(self, context: EvaluationContext):
+        """(revenue, net cash flow, multiplier) of each calendar month, and the flat monthly expenses"""
+        monthly_revenue = context.monthly_revenue
+        monthly_expenses = context.monthly_expenses
+        industry_params = context.plan.industry
+        
+        # Expenses are flat across the year, so round them once
+        month_expenses = round(monthly_expenses, 2)
+        
+        # Seasonality (peak in Q4 for most businesses) repeats every year and
+        # has only three bands, so each band is computed once and reused
+        bands = []
+        for seasonal_multiplier, rounded_multiplier in industry_params.seasonal_bands:
+            month_revenue = monthly_revenue * seasonal_multiplier
+            net_cash_flow = month_revenue - monthly_expenses
+            bands.append((round(month_revenue, 2), round(net_cash_flow, 2), rounded_multiplier))
+        return [bands[band] for band in MONTH_BANDS], month_expenses
+    
+    def summarize_cash_flow_forecast(self, business_data: Dict[str, Any], totals: 'ForecastTotals',
+                                     context: EvaluationContext = None) -> Dict[str, Any]:
+        """Summarize forecast months that were already produced by forecast_months"""
+        context = context or self.create_context(business_data)
         
-        # Calculate summary statistics
-        total_revenue = sum(month['revenue'] for month in forecast)
-        total_expenses = sum(month['expenses'] for month in forecast)
+        # The annual summary always covers the first year of the forecast
+        year_months, total_revenue, total_expenses = totals.first_year()
         total_net_cash_flow = total_revenue - total_expenses
         
-        return {
-            'monthlyForecast': forecast,
+        result = {
             'annualSummary': {
                 'totalRevenue': round(total_revenue, 2),
                 'totalExpenses': round(total_expenses, 2),
                 'totalNetCashFlow': round(total_net_cash_flow, 2),
-                'averageMonthlyRevenue': round(total_revenue / 12, 2),
-                'averageMonthlyExpenses': round(total_expenses / 12, 2)
+                'averageMonthlyRevenue': round(total_revenue / year_months, 2),
+                'averageMonthlyExpenses': round(total_expenses / year_months, 2)
             },
-            'seasonalityFactor': seasonality_factor
+            'seasonalityFactor': context.plan.industry.seasonality_factor
         }
-    
-    def _calculate_monthly_expenses(self, business_data: Dict[str, Any]) -> float:
-        """Calculate total monthly expenses"""
-        operating_expenses = business_data.get('operatingExpenses', {})
-        employee_count = business_data.get('employeeCount', 0)
-        industry = business_data.get('industry', 'technology')
         
-        # Sum all operating expenses
-        total_operating = sum(operating_expenses.values())
+        # Longer or shorter horizons also get a summary over the whole forecast
+        if totals.months != DEFAULT_FORECAST_MONTHS:
+            result['forecastMonths'] = totals.months
+            result['horizonSummary'] = {
+                'months': totals.months,
+                'totalRevenue': round(totals.revenue, 2),
+                'totalExpenses': round(totals.expenses, 2),
+                'totalNetCashFlow': round(totals.revenue - totals.expenses, 2),
+                'averageMonthlyRevenue': round(totals.revenue / totals.months, 2),
+                'averageMonthlyExpenses': round(totals.expenses / totals.months, 2)
+            }
         
-        # Add estimated payroll costs
-        industry_data = self.industry_benchmarks['industries'].get(industry, {})
-        avg_employee_cost = industry_data.get('averageEmployeeCost', 50000)
-        monthly_payroll = (avg_employee_cost * employee_count) / 12
+        # Optional stochastic mode on top of the deterministic forecast
+        simulation = business_data.get('simulation')
+        if simulation:
+            result['simulation'] = self.simulate_cash_flow(business_data, simulation, context)
         
-        return total_operating + monthly_payroll
+        return result
+    
+    def simulate_cash_flow(self, business_data: Dict[str, Any], options: Dict[str, Any] = None,
+                           context: EvaluationContext = None) -> Dict[str, Any]:
+        """Run a Monte Carlo cash flow simulation driven by industry seasonality and risk"""
+        context = context or self.create_context(business_data)
+        options = options if isinstance(options, dict) else {}
+        industry_params = context.plan.industry
+        months = options.get('months', context.forecast_months)
+        if isinstance(months, bool) or not isinstance(months, int) or not 1 <= months <= MAX_FORECAST_MONTHS:
+            raise ValueError(f'simulation.months must be an integer between 1 and {MAX_FORECAST_MONTHS}')
+        return self.cash_flow_simulator.simulate(
+            monthly_revenue=context.monthly_revenue,
+            monthly_expenses=context.monthly_expenses,
+            starting_balance=context.current_savings,
+            seasonal_multipliers=industry_params.seasonal_multipliers,
+            risk_level=industry_params.risk_level,
+            months=months,
+            paths=options.get('paths', DEFAULT_PATHS),
+            seed=options.get('seed')
+        )
+    
+    def _calculate_monthly_expenses(self, business_data: Dict[str, Any]) -> float:
+        """Calculate total monthly expenses"""
+        return self.create_context(business_data).monthly_expenses
     
     def generate__recommendations(self, business_data: Dict[str, Any]) -> Dict[str, Any]:
         """Generate all financial recommendations"""
-        return {
-            'emergencyFund': self.calculate_emergency_fund(business_data),
-            'employeeBenefitsFund': self.calculate_employee_benefits_fund(business_data),
-            'growthFund': self.calculate_growth_fund(business_data),
-            'taxPlanning': self.calculate_tax_planning(business_data),
-            'debtManagement': self.calculate_debt_management(business_data),
-            'retirementPlanning': self.calculate_retirement_planning(business_data),
-            'cashFlowForecast': self.calculate_cash_flow_forecast(business_data)
+        context = self.create_context(business_data)
+        result = {}
+        durations = []
+        clock = time.perf_counter
+        started = clock()
+        for name, method in SECTIONS:
+            result[name] = getattr(self, method)(business_data, context)
+            finished = clock()
+            durations.append(finished - started)
+            started = finished
+        section_timings.record(durations)
+        return result
+
+    def stream_recommendations(self, business_data: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Yield recommendations as events: each section, then forecast months one by one, then the forecast summary"""
+        context = self.create_context(business_data)
+        durations = []
+        clock = time.perf_counter
+        for name, method in SECTIONS[:-1]:
+            started = clock()
+            data = getattr(self, method)(business_data, context)
+            durations.append(clock() - started)
+            yield {'type': 'section', 'section': name, 'data': data}
+        # The forecast is interleaved with sending, so only the other sections are timed
+        section_timings.record(durations)
+
+        totals = ForecastTotals()
+        for month in self.forecast_months(context):
+            totals.add(month)
+            yield {'type': 'forecastMonth', 'section': 'cashFlowForecast', 'data': month}
+        yield {
+            'type': 'forecastSummary',
+            'section': 'cashFlowForecast',
+            'data': self.summarize_cash_flow_forecast(business_data, totals, context)
         }
 
+    def convert_currency(self, payload: Any, from_currency: str, to_currency: str) -> Any:
+        """Convert every monetary field of a business profile or recommendations payload"""
+        if (from_currency or DEFAULT_CURRENCY).upper() == (to_currency or DEFAULT_CURRENCY).upper():
+            return payload
+        return self.currency_engine.convert_payload(payload, from_currency or DEFAULT_CURRENCY, to_currency)
+    
+    def generate_recommendations_batch(self, profiles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Generate all financial recommendations for many profiles in one vectorized pass"""
+        return self.batch_calculator.generate_recommendations(profiles)
+    
+    def sweep_recommendations(self, business_data: Dict[str, Any], axes: Dict[str, Any], mode: str = 'grid',
+                              samples: int = 1000, seed: Any = None, metrics: List[str] = None) -> Dict[str, Any]:
+        """Evaluate recommendations over a grid or Latin-hypercube sample of input variations"""
+        return self.scenario_sweep.sweep(business_data, axes, mode, samples, seed, metrics)
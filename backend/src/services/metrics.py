@@ -0,0 +1,394 @@
+import atexit
+import bisect
+from collections import deque
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Dict, Any, List, Tuple
+from flask import g, request
+
+try:
+    import fcntl
+except ImportError:
+    # Without file locks (Windows) the files of exited processes are kept as they are
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+DEFAULT_FLUSH_INTERVAL = 1.0
+# Recorded-but-unbucketed value sets a HistogramGroup holds before bucketing inline
+MAX_PENDING = 1000
+# Totals of processes that have exited, merged into one file by the next scrape
+RETIRED_FILE = 'retired.json'
+LOCK_FILE = 'metrics.lock'
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = tuple(float(4 ** n) for n in range(5, 16))  # 1 KiB .. 1 GiB
+RATIO_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+
+# name -> (type, help, histogram buckets); summaries are histograms without buckets
+METRICS = {
+    'http_requests_total': ('counter', 'HTTP requests by route, method and status', None),
+    'http_request_errors_total': ('counter', 'HTTP requests answered with a 5xx status', None),
+    'http_request_duration_seconds': (
+        'histogram', 'Time until the response is returned to the server (first byte for streams)', LATENCY_BUCKETS
+    ),
+    'http_response_bytes': ('histogram', 'Response body sizes, where known before sending', SIZE_BUCKETS),
+    'http_compression_input_bytes_total': ('counter', 'Response bytes before Content-Encoding was applied', None),
+    'http_compression_output_bytes_total': ('counter', 'Response bytes after Content-Encoding was applied', None),
+    'http_response_compression_ratio': (
+        'histogram', 'Compressed size over original size of each compressed response', RATIO_BUCKETS
+    ),
+    'http_admission_rejected_total': (
+        'counter', 'Requests turned away by admission control (queue_full: 429, deadline: 503)', None
+    ),
+    'http_admission_wait_seconds': ('histogram', 'Time admitted requests spent queued for a slot', LATENCY_BUCKETS),
+    # A summary (sum and count, no buckets) keeps the per-request cost of seven sections low
+    'calculator_section_duration_seconds': (
+        'summary', 'Time spent in each FinancialCalculator.calculate_* section', ()
+    ),
+    'report_phase_duration_seconds': (
+        'histogram', 'Report rendering time by phase (pdf: story, build; excel: sheets, save)', LATENCY_BUCKETS
+    ),
+    'report_output_bytes': ('histogram', 'Sizes of rendered reports and bulk archives', SIZE_BUCKETS)
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+class MetricsRegistry:
+    """Process-local counters and histograms, aggregated across processes through files.
+
+    Recording only takes a lock and bumps numbers in a dict. A background
+    thread writes this process's totals to ``<directory>/<pid>.json`` at most
+    once per ``flush_interval`` while something changed, and a scrape sums the
+    files of every process sharing the directory: web workers, report pool
+    workers and processes that have already exited, so counters never go
+    backwards when a worker is replaced. The files of exited processes are
+    merged into one by the next scrape. A forked child starts from zero.
+    """
+
+    def __init__(self, directory: str = None, flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._histograms = {}
+        self._groups = []
+        self._launch_pid = None
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+        atexit.register(self.flush)
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        # Serializes whole flushes so an older snapshot never replaces a newer one
+        self._flush_lock = threading.Lock()
+        self._counters = {}
+        # Series lists are held by HistogramGroups, so they are zeroed, never replaced
+        for series in self._histograms.values():
+            series[:] = [0] * (len(series) - 1) + [0.0]
+        for group in self._groups:
+            group.pending.clear()
+        self._dirty = False
+        self._flusher = None
+        self.pid = os.getpid()
+
+    def configure(self, directory: str = None, flush_interval: float = None):
+        """Set the directory shared by all processes of a deployment.
+
+        Without one, each launch gets its own temporary directory, inherited
+        by forked workers and removed when the launching process exits, so
+        separate deployments on one host never add up each other's totals.
+        """
+        if flush_interval:
+            self.flush_interval = flush_interval
+        if directory:
+            self.directory = directory
+            os.makedirs(self.directory, exist_ok=True)
+        elif self._launch_pid is None:
+            # Kept on reconfiguration (a reloaded app), so counters don't restart
+            self.directory = tempfile.mkdtemp(prefix='financial-planning-metrics-')
+            self._launch_pid = os.getpid()
+            atexit.register(self._remove_launch_directory)
+
+    def _remove_launch_directory(self):
+        # atexit handlers run in forked children too; only the launching process owns the directory
+        if os.getpid() != self._launch_pid or not self.directory:
+            return
+        directory, self.directory = self.directory, None
+        shutil.rmtree(directory, ignore_errors=True)
+
+    def clear_directory(self):
+        """Forget every process's totals (the pre-fork master does this once at startup)"""
+        if not self.directory:
+            return
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(('.json', '.tmp')):
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+    def _changed(self):
+        # Called with the lock held, when the first change since the last flush is recorded
+        self._dirty = True
+        if self._flusher is None and self.directory:
+            self._flusher = threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True)
+            self._flusher.start()
+
+    def inc(self, name: str, labels: Labels = (), value: float = 1):
+        key = (name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+            if not self._dirty:
+                self._changed()
+
+    def _series(self, name: str, labels: Labels) -> list:
+        """Histogram series: one count per bucket plus +Inf (not cumulative), then the sum"""
+        key = (name, labels)
+        series = self._histograms.get(key)
+        if series is None:
+            with self._lock:
+                series = self._histograms.setdefault(key, [0] * (len(METRICS[name][2]) + 1) + [0.0])
+        return series
+
+    def observe(self, name: str, value: float, labels: Labels = ()):
+        series = self._series(name, labels)
+        with self._lock:
+            series[bisect.bisect_left(METRICS[name][2], value)] += 1
+            series[-1] += value
+            if not self._dirty:
+                self._changed()
+
+    def histogram_group(self, name: str, label: str, values: Tuple[str, ...]) -> 'HistogramGroup':
+        group = HistogramGroup(self, name, label, values)
+        self._groups.append(group)
+        return group
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            if self._dirty:
+                try:
+                    self.flush()
+                except OSError as e:
+                    logger.error('Could not write metrics: %s', e)
+
+    def flush(self):
+        """Write this process's totals for other processes to read"""
+        if not self.directory:
+            return
+        with self._flush_lock:
+            with self._lock:
+                for group in self._groups:
+                    group.drain()
+                if not self._counters and not self._histograms:
+                    return
+                data = {
+                    'counters': [[name, labels, value] for (name, labels), value in self._counters.items()],
+                    'histograms': [
+                        [name, labels, list(series)] for (name, labels), series in self._histograms.items() if any(series)
+                    ]
+                }
+                self._dirty = False
+            path = os.path.join(self.directory, f'{self.pid}.json')
+            temp_path = path + '.tmp'
+            with open(temp_path, 'w') as metrics_file:
+                json.dump(data, metrics_file, separators=(',', ':'))
+            os.replace(temp_path, path)
+
+    def collect(self) -> Tuple[Dict[Any, float], Dict[Any, list]]:
+        """(counters, histograms) summed over every process sharing the directory"""
+        if not self.directory:
+            with self._lock:
+                for group in self._groups:
+                    group.drain()
+                return dict(self._counters), {key: list(series) for key, series in self._histograms.items()}
+        self.flush()
+        try:
+            self._retire_exited()
+        except OSError as e:
+            logger.error('Could not merge metrics of exited processes: %s', e)
+        counters, histograms = {}, {}
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.json'):
+                _accumulate(_read(entry.path), counters, histograms)
+        return counters, histograms
+
+    def _retire_exited(self):
+        """Merge the files of processes that have exited into RETIRED_FILE"""
+        if fcntl is None:
+            return
+        exited = [
+            entry.path for entry in os.scandir(self.directory)
+            if entry.name.endswith('.json') and entry.name[:-5].isdigit() and not _alive(int(entry.name[:-5]))
+        ]
+        if not exited:
+            return
+        with open(os.path.join(self.directory, LOCK_FILE), 'a') as lock_file:
+            # Scrapes in several workers must not merge the same file twice
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            exited = [path for path in exited if os.path.exists(path)]
+            if not exited:
+                return
+            retired_path = os.path.join(self.directory, RETIRED_FILE)
+            counters, histograms = {}, {}
+            for path in [retired_path] + exited:
+                _accumulate(_read(path), counters, histograms)
+            temp_path = retired_path + '.tmp'
+            with open(temp_path, 'w') as metrics_file:
+                json.dump({
+                    'counters': [[name, labels, value] for (name, labels), value in counters.items()],
+                    'histograms': [[name, labels, series] for (name, labels), series in histograms.items()]
+                }, metrics_file, separators=(',', ':'))
+            os.replace(temp_path, retired_path)
+            for path in exited:
+                os.remove(path)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        counters, histograms = self.collect()
+        lines = []
+        for name, (kind, help_text, buckets) in METRICS.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            if kind == 'counter':
+                for (_, labels), value in sorted(item for item in counters.items() if item[0][0] == name):
+                    lines.append(f'{name}{_format_labels(labels)} {_number(value)}')
+                continue
+            for (_, labels), series in sorted(item for item in histograms.items() if item[0][0] == name):
+                cumulative = 0
+                for bound, count in zip(buckets + (float('inf'),), series):
+                    cumulative += count
+                    if kind == 'summary':
+                        continue
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{name}_bucket{_format_labels(labels + (("le", le),))} {_number(cumulative)}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {_number(series[-1])}')
+                lines.append(f'{name}_count{_format_labels(labels)} {_number(cumulative)}')
+        return '\n'.join(lines) + '\n'
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _read(path: str) -> Dict[str, Any]:
+    try:
+        with open(path) as metrics_file:
+            return json.load(metrics_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _accumulate(data: Dict[str, Any], counters: Dict[Any, float], histograms: Dict[Any, list]):
+    """Add the totals of one metrics file to counters and histograms"""
+    for name, labels, value in data.get('counters', []):
+        key = (name, tuple(tuple(pair) for pair in labels))
+        counters[key] = counters.get(key, 0) + value
+    for name, labels, series in data.get('histograms', []):
+        if name not in METRICS or len(series) != len(METRICS[name][2]) + 2:
+            # Written with different buckets by an older version
+            continue
+        key = (name, tuple(tuple(pair) for pair in labels))
+        total = histograms.setdefault(key, [0] * len(series))
+        for position, value in enumerate(series):
+            total[position] += value
+
+
+class HistogramGroup:
+    """Series of one histogram for a fixed tuple of label values, recorded together.
+
+    Made for hot paths: ``record`` only appends the raw values to a deque
+    (thread-safe without a lock); they are sorted into buckets by the flush
+    thread or the next scrape, or inline once ``MAX_PENDING`` sets pile up.
+    """
+
+    def __init__(self, registry: MetricsRegistry, name: str, label: str, values: Tuple[str, ...]):
+        self.registry = registry
+        self.buckets = METRICS[name][2]
+        self.series = [registry._series(name, ((label, value),)) for value in values]
+        self.pending = deque()
+
+    def record(self, values: List[float]):
+        """Observe values[i] in the series of the i-th label value (a shorter list skips the rest)"""
+        registry = self.registry
+        if len(values) != len(self.series):
+            # Off the fast path: partial sets are bucketed right away
+            with registry._lock:
+                self._add([values])
+                registry._changed()
+            return
+        self.pending.append(values)
+        if not registry._dirty or len(self.pending) > MAX_PENDING:
+            with registry._lock:
+                self.drain()
+                registry._changed()
+
+    def drain(self):
+        """Move pending values into the buckets; called with the registry lock held"""
+        pending = self.pending
+        batch = [pending.popleft() for _ in range(len(pending))]
+        if batch:
+            self._add(batch)
+
+    def _add(self, batch: List[List[float]]):
+        buckets = self.buckets
+        for series, column in zip(self.series, zip(*batch)):
+            if buckets:
+                for value in column:
+                    series[bisect.bisect_left(buckets, value)] += 1
+            else:
+                series[0] += len(column)
+            series[-1] += sum(column)
+
+
+# One registry per process; services record into it wherever they run
+metrics = MetricsRegistry()
+
+
+def init_app(app):
+    """Count and time every request of the application"""
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        started = g.pop('request_started', None)
+        if started is None:
+            return response
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        labels = (('method', request.method), ('route', route))
+        metrics.observe('http_request_duration_seconds', time.perf_counter() - started, labels)
+        metrics.inc('http_requests_total', labels + (('status', str(response.status_code)),))
+        if response.status_code >= 500:
+            metrics.inc('http_request_errors_total', labels)
+        if response.content_length is not None:
+            metrics.observe('http_response_bytes', response.content_length, labels)
+        return response
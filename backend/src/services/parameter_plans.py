@@ -0,0 +1,143 @@
+from dataclasses import dataclass
+from typing import Dict, Any, Tuple
+
+DEFAULT_INDUSTRY = 'technology'
+DEFAULT_COUNTRY = 'US'
+DEFAULT_FORECAST_MONTHS = 12
+MAX_FORECAST_MONTHS = 600
+# Seasonality band of each forecast month: 0 = Jan/Feb, 1 = Mar-Oct, 2 = Nov/Dec
+MONTH_BANDS = (0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 2, 2)
+
+
+@dataclass(frozen=True)
+class IndustryParameters:
+    """Industry benchmarks with every calculator default already resolved"""
+    code: Any
+    emergency_fund_multiplier: Any
+    growth_investment_percentage: Any
+    employee_benefits_percentage: Any
+    average_employee_cost: Any
+    seasonality_factor: Any
+    seasonal_multipliers: Tuple[float, ...]
+    rounded_seasonal_multipliers: Tuple[float, ...]
+    # (multiplier, rounded multiplier) of each band in MONTH_BANDS
+    seasonal_bands: Tuple[Tuple[float, float], ...]
+    risk_level: str
+
+    @classmethod
+    def compile(cls, code: Any, industry_data: Dict[str, Any]) -> 'IndustryParameters':
+        seasonality_factor = industry_data.get('seasonalityFactor', 1.0)
+        # Peak in Q4 (November, December), trough in January and February
+        low_season = 1 / seasonality_factor
+        seasonal_multipliers = tuple(
+            seasonality_factor if month in (11, 12) else low_season if month in (1, 2) else 1.0
+            for month in range(1, 13)
+        )
+        return cls(
+            code=code,
+            emergency_fund_multiplier=industry_data.get('emergencyFundMultiplier', 4),
+            growth_investment_percentage=industry_data.get('growthInvestmentPercentage', 0.15),
+            employee_benefits_percentage=industry_data.get('employeeBenefitsPercentage', 0.12),
+            average_employee_cost=industry_data.get('averageEmployeeCost', 50000),
+            seasonality_factor=seasonality_factor,
+            seasonal_multipliers=seasonal_multipliers,
+            rounded_seasonal_multipliers=tuple(round(m, 2) for m in seasonal_multipliers),
+            seasonal_bands=tuple(
+                (seasonal_multipliers[month - 1], round(seasonal_multipliers[month - 1], 2)) for month in (1, 3, 12)
+            ),
+            risk_level=industry_data.get('riskLevel', 'medium')
+        )
+
+
+@dataclass(frozen=True)
+class CountryParameters:
+    """Country tax parameters with every calculator default already resolved"""
+    code: Any
+    payroll_tax_rate: Any
+    deductions: Tuple[str, ...]
+
+    @classmethod
+    def compile(cls, code: Any, tax_data: Dict[str, Any]) -> 'CountryParameters':
+        return cls(
+            code=code,
+            payroll_tax_rate=tax_data.get('payrollTaxRate', 0.15),
+            deductions=tuple(tax_data.get('deductions', []))
+        )
+
+
+@dataclass(frozen=True)
+class ParameterPlan:
+    """Immutable parameters for one (industry, country) pair"""
+    industry: IndustryParameters
+    country: CountryParameters
+
+
+class ParameterPlans:
+    """Compiles the reference data once into a plan per (industry, country)"""
+
+    def __init__(self, industry_benchmarks: Dict[str, Any], tax_rates: Dict[str, Any]):
+        self.industries = {
+            code: IndustryParameters.compile(code, data)
+            for code, data in industry_benchmarks['industries'].items()
+        }
+        self.countries = {
+            code: CountryParameters.compile(code, data)
+            for code, data in tax_rates['countries'].items()
+        }
+        # Unknown codes fall back to the calculator defaults
+        self.default_industry = IndustryParameters.compile(None, {})
+        self.default_country = CountryParameters.compile(None, {})
+        self.plans = {
+            (industry_code, country_code): ParameterPlan(industry, country)
+            for industry_code, industry in self.industries.items()
+            for country_code, country in self.countries.items()
+        }
+
+    def industry(self, code: Any) -> IndustryParameters:
+        """Get compiled parameters for an industry code"""
+        return self.industries.get(code, self.default_industry)
+
+    def country(self, code: Any) -> CountryParameters:
+        """Get compiled parameters for a country code"""
+        return self.countries.get(code, self.default_country)
+
+    def plan(self, industry_code: Any, country_code: Any) -> ParameterPlan:
+        """Get the compiled plan for an (industry, country) pair"""
+        plan = self.plans.get((industry_code, country_code))
+        if plan is None:
+            plan = ParameterPlan(self.industry(industry_code), self.country(country_code))
+        return plan
+
+
+class EvaluationContext:
+    """Per-request inputs and shared intermediates, each computed exactly once"""
+
+    __slots__ = (
+        'business_data', 'plan', 'industry', 'country', 'monthly_revenue',
+        'employee_count', 'current_savings', 'total_operating', 'monthly_payroll',
+        'monthly_expenses', 'annual_revenue', 'annual_expenses', 'annual_profit',
+        'forecast_months', 'region'
+    )
+
+    def __init__(self, business_data: Dict[str, Any], plans: ParameterPlans):
+        self.business_data = business_data
+        self.industry = business_data.get('industry', DEFAULT_INDUSTRY)
+        self.country = business_data.get('location', {}).get('country', DEFAULT_COUNTRY)
+        self.region = business_data.get('location', {}).get('region')
+        self.plan = plans.plan(self.industry, self.country)
+
+        self.monthly_revenue = business_data.get('monthlyRevenue', 0)
+        self.employee_count = business_data.get('employeeCount', 0)
+        self.current_savings = business_data.get('currentSavings', 0)
+
+        # Operating expenses plus estimated payroll
+        self.total_operating = sum(business_data.get('operatingExpenses', {}).values())
+        self.monthly_payroll = (self.plan.industry.average_employee_cost * self.employee_count) / 12
+        self.monthly_expenses = self.total_operating + self.monthly_payroll
+
+        self.annual_revenue = self.monthly_revenue * 12
+        self.annual_expenses = self.monthly_expenses * 12
+        self.annual_profit = self.annual_revenue - self.annual_expenses
+
+        forecast_months = int(business_data.get('forecastMonths', DEFAULT_FORECAST_MONTHS))
+        self.forecast_months = max(1, min(forecast_months, MAX_FORECAST_MONTHS))
@@ -0,0 +1,107 @@
+import logging
+import os
+import threading
+import time
+from typing import Dict, Any, Callable, Tuple
+from src.services.financial_calculator import FinancialCalculator, REFERENCE_DATA_FILES
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECK_INTERVAL = 5.0
+
+
+class ReferenceDataStore:
+    """Serves the current reference-data snapshot and hot-swaps it when the files change.
+
+    A snapshot is a fully built ``FinancialCalculator``; it is never modified
+    after construction, so a request that grabbed one keeps a consistent view
+    even if a newer snapshot is swapped in mid-request. Change detection only
+    stats the files (mtime and size), at most once per ``check_interval``
+    seconds, and the new snapshot is parsed and compiled on a background
+    thread before a single reference assignment makes it current.
+    """
+
+    def __init__(self, data_dir: str = None, check_interval: float = DEFAULT_CHECK_INTERVAL,
+                 factory: Callable[[str], Any] = FinancialCalculator):
+        self.data_dir = data_dir or os.path.join(os.path.dirname(__file__), '..', 'data')
+        self.check_interval = check_interval
+        self.factory = factory
+        self._lock = threading.Lock()
+        self._reloading = False
+        self._next_check = time.monotonic() + check_interval
+        self._signature = self._stat()
+        self._snapshot = factory(self.data_dir)
+        self._loaded_at = time.time()
+        self._reloads = 0
+        self._last_error = None
+
+    def _stat(self) -> Tuple[Tuple[int, int], ...]:
+        """Cheap change signature: (mtime_ns, size) of every reference file"""
+        signature = []
+        for filename in REFERENCE_DATA_FILES:
+            try:
+                stat = os.stat(os.path.join(self.data_dir, filename))
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append((0, -1))
+        return tuple(signature)
+
+    def current(self):
+        """The snapshot to use for a whole request; may trigger a background reload check"""
+        if self.check_interval and time.monotonic() >= self._next_check:
+            self._maybe_reload()
+        return self._snapshot
+
+    @property
+    def version(self) -> str:
+        return self._snapshot.data_version
+
+    def _maybe_reload(self):
+        with self._lock:
+            if self._reloading or time.monotonic() < self._next_check:
+                return
+            self._next_check = time.monotonic() + self.check_interval
+            signature = self._stat()
+            if signature == self._signature:
+                return
+            self._reloading = True
+        threading.Thread(target=self._reload, args=(signature,), name='reference-data-reload', daemon=True).start()
+
+    def _reload(self, signature: Tuple[Tuple[int, int], ...]):
+        """Build a new snapshot off the request path and swap it in"""
+        try:
+            snapshot = self.factory(self.data_dir)
+        except Exception as e:
+            # Keep serving the previous snapshot (e.g. a half-written file); retry on the next change
+            logger.error('Reference data reload failed: %s', e)
+            with self._lock:
+                self._signature = signature
+                self._last_error = str(e)
+                self._reloading = False
+            return
+        with self._lock:
+            previous = self._snapshot.data_version
+            self._snapshot = snapshot
+            self._signature = signature
+            self._loaded_at = time.time()
+            self._reloads += 1
+            self._last_error = None
+            self._reloading = False
+        logger.info('Reference data reloaded: %s -> %s', previous, snapshot.data_version)
+
+    def reload(self) -> str:
+        """Reload synchronously (ignoring the check interval) and return the new version"""
+        with self._lock:
+            self._reloading = True
+        self._reload(self._stat())
+        return self.version
+
+    def status(self) -> Dict[str, Any]:
+        """Version and reload counters for diagnostics"""
+        return {
+            'dataVersion': self.version,
+            'loadedAt': self._loaded_at,
+            'checkInterval': self.check_interval,
+            'reloads': self._reloads,
+            'lastError': self._last_error
+        }
@@ -0,0 +1,70 @@
+import hashlib
+import json
+from typing import Dict, Any, Optional
+
+
+class SerializedResponse:
+    """JSON response body serialized once, with a strong ETag over its bytes"""
+
+    __slots__ = ('body', 'etag')
+
+    def __init__(self, payload: Dict[str, Any]):
+        # Same shape as jsonify: sorted keys, compact separators, trailing newline
+        self.body = (json.dumps(payload, sort_keys=True, separators=(',', ':')) + '\n').encode('utf-8')
+        self.etag = hashlib.sha256(self.body).hexdigest()[:32]
+
+
+def _success(data: Any) -> SerializedResponse:
+    return SerializedResponse({'success': True, 'data': data})
+
+
+class ReferenceResponses:
+    """Every reference-data endpoint body, built once per reference-data snapshot"""
+
+    def __init__(self, calculator):
+        countries = calculator.tax_rates['countries']
+        industries = calculator.industry_benchmarks['industries']
+        currencies = calculator.currencies['currencies']
+
+        country_list = [
+            {'code': code, 'name': data['name'], 'currency': data['currency']}
+            for code, data in countries.items()
+        ]
+        industry_list = [
+            {'code': code, 'name': data['name'], 'riskLevel': data['riskLevel']}
+            for code, data in industries.items()
+        ]
+        currency_list = [
+            {'code': code, 'name': data['name'], 'symbol': data['symbol']}
+            for code, data in currencies.items()
+        ]
+
+        self.countries = _success(country_list)
+        self.industries = _success(industry_list)
+        self.currencies = _success(currency_list)
+        # Everything the business form needs, in one cacheable response
+        self.bootstrap = _success({
+            'countries': country_list,
+            'industries': industry_list,
+            'currencies': currency_list,
+            'dataVersion': calculator.data_version
+        })
+
+        self.tax_rates = {code: _success(data) for code, data in countries.items()}
+        self.industry_benchmarks = {code: _success(data) for code, data in industries.items()}
+        self.exchange_rates = {}
+        for code, data in currencies.items():
+            # Include every pair from the dense matrix, not only the quoted ones
+            resolved = calculator.currency_engine.rates_for(code)
+            self.exchange_rates[code] = _success(
+                dict(data, resolvedRates=resolved['rates'], triangulated=resolved['triangulated'])
+            )
+
+    def tax_rate(self, country: str) -> Optional[SerializedResponse]:
+        return self.tax_rates.get(country.upper())
+
+    def industry_benchmark(self, industry: str) -> Optional[SerializedResponse]:
+        return self.industry_benchmarks.get(industry.lower())
+
+    def exchange_rate(self, base_currency: str) -> Optional[SerializedResponse]:
+        return self.exchange_rates.get(base_currency.upper())
@@ -0,0 +1,155 @@
+import io
+import json
+import os
+import re
+import zipfile
+from typing import Dict, Any, Iterator, List
+from src.services.metrics import metrics
+from src.services.report_jobs import REPORT_FORMATS, prepare_report
+
+REQUIRED_PROFILE_FIELDS = ('industry', 'employeeCount', 'monthlyRevenue')
+BULK_FORMATS = {'pdf': ('pdf',), 'excel': ('excel',), 'both': ('pdf', 'excel')}
+DEFAULT_CHUNK_SIZE = 64
+COPY_CHUNK_SIZE = 1 << 20
+# Workbooks are already zip archives; deflating them again only costs CPU
+COMPRESSION = {'pdf': zipfile.ZIP_DEFLATED, 'excel': zipfile.ZIP_STORED}
+
+
+class ZipStream(io.RawIOBase):
+    """Write-only, unseekable sink that hands out archive bytes as they are produced"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._offset = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._offset
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _slug(name: Any) -> str:
+    slug = re.sub(r'[^A-Za-z0-9]+', '-', str(name or '')).strip('-').lower()[:60]
+    return slug or 'report'
+
+
+class BulkReportArchive:
+    """Renders reports for a portfolio of business profiles and streams them as one ZIP.
+
+    Profiles without recommendations get them from the vectorized batch
+    calculator, a chunk at a time and only as fast as the render workers
+    consume them. Each entry is written to the archive as soon as its
+    worker finishes and its spool file is deleted straight after, so memory
+    and disk use stay bounded by the render window rather than the
+    portfolio size. Per-profile failures are listed in ``manifest.json``,
+    the last entry, since the response status is long gone by then.
+    """
+
+    def __init__(self, calculator, report_jobs, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.calculator = calculator
+        self.report_jobs = report_jobs
+        self.chunk_size = chunk_size
+        self.entries = []
+        self.errors = []
+
+    def _recommend(self, chunk: List[Dict[str, Any]]) -> List[Any]:
+        """Recommendations for a chunk of business profiles, isolating any that fail"""
+        try:
+            return self.calculator.generate_recommendations_batch(chunk)
+        except Exception:
+            results = []
+            for business_data in chunk:
+                try:
+                    results.append(self.calculator.generate__recommendations(business_data))
+                except Exception as e:
+                    results.append(e)
+            return results
+
+    def _reports(self, profiles: List[Dict[str, Any]], formats: tuple, currency: str = None) -> Iterator[tuple]:
+        """Render items for the job queue, computing missing recommendations chunk by chunk"""
+        for start in range(0, len(profiles), self.chunk_size):
+            chunk = list(enumerate(profiles[start:start + self.chunk_size], start))
+            missing = []
+            for index, profile in chunk:
+                if profile.get('recommendations'):
+                    continue
+                business_data = profile.get('businessData') or {}
+                absent = [field for field in REQUIRED_PROFILE_FIELDS if field not in business_data]
+                if absent:
+                    profile['recommendations'] = ValueError(f'Missing required field: {absent[0]}')
+                else:
+                    missing.append((index, profile))
+            if missing:
+                results = self._recommend([profile['businessData'] for _, profile in missing])
+                for (_, profile), result in zip(missing, results):
+                    profile['recommendations'] = result
+
+            for index, profile in chunk:
+                name = profile.get('name') or profile.get('businessData', {}).get('businessName')
+                if isinstance(profile['recommendations'], Exception):
+                    self.errors.append({'index': index, 'name': name, 'error': str(profile['recommendations'])})
+                    continue
+                for report_format in formats:
+                    try:
+                        report = prepare_report(self.calculator, {
+                            'businessData': profile['businessData'],
+                            'recommendations': profile['recommendations'],
+                            'format': report_format,
+                            'currency': profile.get('currency') or currency
+                        })
+                    except ValueError as e:
+                        self.errors.append({'index': index, 'name': name, 'format': report_format, 'error': str(e)})
+                        continue
+                    entry = f'{index + 1:04d}-{_slug(name)}{REPORT_FORMATS[report_format][0]}'
+                    yield (index, name, entry, report_format), *report
+                # Drop the reference so finished profiles can be freed
+                profile['recommendations'] = None
+
+    def stream(self, profiles: List[Dict[str, Any]], formats: tuple, currency: str = None) -> Iterator[bytes]:
+        """Yield the ZIP archive in chunks while reports are still being rendered"""
+        sink = ZipStream()
+        with zipfile.ZipFile(sink, 'w') as archive:
+            rendered = self.report_jobs.render_many(self._reports(profiles, formats, currency))
+            for (index, name, entry, report_format), job, error in rendered:
+                if error:
+                    self.errors.append({'index': index, 'name': name, 'format': report_format, 'error': error})
+                    self.report_jobs.discard(job.job_id)
+                    continue
+                path = self.report_jobs.path(job.job_id, report_format)
+                info = zipfile.ZipInfo.from_file(path, entry)
+                info.compress_type = COMPRESSION[report_format]
+                with open(path, 'rb') as source, archive.open(info, 'w') as target:
+                    while True:
+                        chunk = source.read(COPY_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        target.write(chunk)
+                        yield sink.drain()
+                self.entries.append({'index': index, 'name': name, 'format': report_format,
+                                     'file': entry, 'size': os.path.getsize(path)})
+                self.report_jobs.discard(job.job_id)
+                yield sink.drain()
+
+            manifest = {
+                'profiles': len(profiles),
+                'reports': len(self.entries),
+                'failed': len(self.errors),
+                'dataVersion': self.calculator.data_version,
+                'entries': sorted(self.entries, key=lambda item: (item['index'], item['format'])),
+                'errors': sorted(self.errors, key=lambda item: item['index'])
+            }
+            archive.writestr('manifest.json', json.dumps(manifest, indent=2))
+        metrics.observe('report_output_bytes', sink.tell(), (('format', 'zip'),))
+        yield sink.drain()
@@ -0,0 +1,153 @@
+import datetime
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from typing import Dict, Any, Optional
+from src.services.result_cache import canonical_key
+from src.services.report_template import REPORT_TEMPLATE_VERSION
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# Eviction trims down to this fraction of the bound so it doesn't run on every store
+EVICTION_TARGET = 0.9
+EXTENSIONS = {'pdf': '.pdf', 'excel': '.xlsx'}
+
+
+class ReportArtifactCache:
+    """Content-addressed, size-bounded on-disk cache of rendered reports.
+
+    Entries are named by a hash of everything that determines a report's
+    content, so any worker process on the host can serve another's result.
+    Files are published with an atomic rename (concurrent writers of one key
+    simply replace each other with equivalent content) and a hit refreshes
+    the file's mtime, which makes eviction a least-recently-used sweep of
+    the directory that every process agrees on without shared state.
+    """
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), 'financial-report-cache')
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Approximate total; other processes' stores are only seen by the next eviction scan
+        self._size = sum(size for _, size, _ in self._scan())
+
+    @staticmethod
+    def key(report_format: str, business_data: Dict[str, Any], recommendations: Dict[str, Any],
+            symbol: str, report_date: datetime.date) -> str:
+        """Canonical hash of a report's inputs, template version and report date"""
+        return canonical_key({
+            'format': report_format,
+            'businessData': business_data,
+            'recommendations': recommendations,
+            'symbol': symbol,
+            'reportDate': report_date.isoformat()
+        }, REPORT_TEMPLATE_VERSION)
+
+    def path(self, key: str, report_format: str) -> str:
+        # Two-character shards keep directories small
+        return os.path.join(self.cache_dir, key[:2], key + EXTENSIONS[report_format])
+
+    def get(self, key: str, report_format: str) -> Optional[str]:
+        """Path of a cached report, marking it recently used, or None on a miss"""
+        path = self.path(key, report_format)
+        try:
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def link(self, key: str, report_format: str, target: str) -> bool:
+        """Make ``target`` a hard link (or copy) of a cached report; False on a miss"""
+        path = self.get(key, report_format)
+        if path is None:
+            return False
+        try:
+            self._link_or_copy(path, target)
+        except FileNotFoundError:
+            # Evicted by another process between lookup and link
+            self.hits -= 1
+            self.misses += 1
+            return False
+        return True
+
+    def put(self, key: str, report_format: str, source: str):
+        """Publish a rendered report file under its key"""
+        path = self.path(key, report_format)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        self._link_or_copy(source, temp_path)
+        os.replace(temp_path, path)
+        size = os.path.getsize(path)
+        with self._lock:
+            self.stores += 1
+            self._size += size
+            over = self._size > self.max_bytes
+        if over:
+            self.evict()
+
+    @staticmethod
+    def _link_or_copy(source: str, target: str):
+        try:
+            os.link(source, target)
+        except FileNotFoundError:
+            raise
+        except OSError:
+            # Different filesystem or no hard-link support
+            shutil.copyfile(source, target)
+
+    def _scan(self):
+        """(mtime, size, path) of every published entry"""
+        entries = []
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith('.tmp'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def evict(self):
+        """Delete least recently used entries until the cache is under its target size"""
+        with self._lock:
+            entries = sorted(self._scan())
+            total = sum(size for _, size, _ in entries)
+            target = self.max_bytes * EVICTION_TARGET
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                self.evictions += 1
+            self._size = total
+
+    def stats(self) -> Dict[str, Any]:
+        """Get report cache counters"""
+        lookups = self.hits + self.misses
+        return {
+            'directory': self.cache_dir,
+            'sizeBytes': self._size,
+            'maxBytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'stores': self.stores,
+            'evictions': self.evictions,
+            'hitRate': round(self.hits / lookups, 4) if lookups else 0
+        }
@@ -9,8 +9,33 @@ from reportlab.lib import colors
 from io import BytesIO
 import openpyxl
 from openpyxl.styles import Font, Alignment, PatternFill
+from openpyxl.cell import Cell, WriteOnlyCell
 from openpyxl.chart import BarChart, Reference
+from openpyxl.utils import get_column_letter
+from src.services.metrics import metrics
 import datetime
+import time
+
+class ColumnWidths:
+    """Running maximum of value lengths per column, collected while rows are produced"""
+
+    def __init__(self, max_width: int):
+        self.max_width = max_width
+        self.lengths = {}
+
+    def observe(self, row: List[Any]):
+        for column, value in enumerate(row, 1):
+            if isinstance(value, Cell):
+                value = value.value
+            if value is None:
+                continue
+            length = len(str(value))
+            if length > self.lengths.get(column, 0):
+                self.lengths[column] = length
+
+    def apply(self, sheet):
+        for column, length in self.lengths.items():
+            sheet.column_dimensions[get_column_letter(column)].width = min(length + 2, self.max_width)
 
 class ReportGenerator:
     def __init__(self):
@@ -29,9 +54,32 @@ class ReportGenerator:
             spaceAfter=12,
             textColor=colors.darkblue
         )
+        self.record_metrics = True
     
-    def generate_pdf_report(self, business_data: Dict[str, Any], recommendations: Dict[str, Any]) -> BytesIO:
-        """Generate  PDF report"""
+    def warm_up(self):
+        """Render a throwaway PDF and workbook so fonts, styles and lazy imports are loaded"""
+        business_data = {'location': {'country': 'US'}, 'industry': 'technology', 'monthlyRevenue': 0}
+        recommendations = {'cashFlowForecast': {'monthlyForecast': [{'month': 1}]}}
+        # Warm-up renders stay out of the phase timings
+        self.record_metrics = False
+        try:
+            self.generate_pdf_report(business_data, recommendations)
+            self.generate_excel_report(business_data, recommendations)
+        finally:
+            self.record_metrics = True
+    
+    def _phase_done(self, report_format: str, phase: str, started: float) -> float:
+        """Record how long a render phase took; returns the end time, which starts the next phase"""
+        now = time.perf_counter()
+        if self.record_metrics:
+            metrics.observe('report_phase_duration_seconds', now - started, (('format', report_format), ('phase', phase)))
+        return now
+    
+    def generate_pdf_report(self, business_data: Dict[str, Any], recommendations: Dict[str, Any],
+                            symbol: str = '$', report_date: datetime.date = None) -> BytesIO:
+        """Generate PDF report (the footer shows report_date, default today)"""
+        started = time.perf_counter()
+        report_date = report_date or datetime.date.today()
         buffer = BytesIO()
         doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
         
@@ -48,7 +96,7 @@ class ReportGenerator:
             ['Company Location', f"{business_data.get('location', {}).get('country', 'N/A')}"],
             ['Industry', business_data.get('industry', 'N/A').title()],
             ['Number of Employees', str(business_data.get('employeeCount', 0))],
-            ['Monthly Revenue', f"${business_data.get('monthlyRevenue', 0):,.2f}"],
+            ['Monthly Revenue', f"{symbol}{business_data.get('monthlyRevenue', 0):,.2f}"],
             ['Currency', business_data.get('currency', 'USD')]
         ]
         
@@ -70,9 +118,9 @@ class ReportGenerator:
         story.append(Paragraph("Emergency Fund Recommendations", self.heading_style))
         emergency_fund = recommendations.get('emergencyFund', {})
         emergency_data = [
-            ['Recommended Amount', f"${emergency_fund.get('recommendedAmount', 0):,.2f}"],
-            ['Current Gap', f"${emergency_fund.get('currentGap', 0):,.2f}"],
-            ['Monthly Contribution Needed', f"${emergency_fund.get('monthlyContribution', 0):,.2f}"],
+            ['Recommended Amount', f"{symbol}{emergency_fund.get('recommendedAmount', 0):,.2f}"],
+            ['Current Gap', f"{symbol}{emergency_fund.get('currentGap', 0):,.2f}"],
+            ['Monthly Contribution Needed', f"{symbol}{emergency_fund.get('monthlyContribution', 0):,.2f}"],
             ['Time to Goal (months)', f"{emergency_fund.get('timeToGoal', 0):.1f}"]
         ]
         
@@ -85,11 +133,11 @@ class ReportGenerator:
         story.append(Paragraph("Growth Investment Recommendations", self.heading_style))
         growth_fund = recommendations.get('growthFund', {})
         growth_data = [
-            ['Total Growth Budget', f"${growth_fund.get('totalBudget', 0):,.2f}"],
-            ['Marketing Budget', f"${growth_fund.get('marketingBudget', 0):,.2f}"],
-            ['Hiring Budget', f"${growth_fund.get('hiringBudget', 0):,.2f}"],
-            ['Equipment Upgrade', f"${growth_fund.get('equipmentUpgrade', 0):,.2f}"],
-            ['Research & Development', f"${growth_fund.get('researchDevelopment', 0):,.2f}"]
+            ['Total Growth Budget', f"{symbol}{growth_fund.get('totalBudget', 0):,.2f}"],
+            ['Marketing Budget', f"{symbol}{growth_fund.get('marketingBudget', 0):,.2f}"],
+            ['Hiring Budget', f"{symbol}{growth_fund.get('hiringBudget', 0):,.2f}"],
+            ['Equipment Upgrade', f"{symbol}{growth_fund.get('equipmentUpgrade', 0):,.2f}"],
+            ['Research & Development', f"{symbol}{growth_fund.get('researchDevelopment', 0):,.2f}"]
         ]
         
         growth_table = Table(growth_data, colWidths=[2.5*inch, 2.5*inch])
@@ -101,10 +149,10 @@ class ReportGenerator:
         story.append(Paragraph("Tax Planning Analysis", self.heading_style))
         tax_planning = recommendations.get('taxPlanning', {})
         tax_data = [
-            ['Estimated Tax Liability', f"${tax_planning.get('estimatedTaxLiability', 0):,.2f}"],
-            ['Corporate Tax', f"${tax_planning.get('corporateTax', 0):,.2f}"],
-            ['Payroll Tax', f"${tax_planning.get('payrollTax', 0):,.2f}"],
-            ['Annual Profit', f"${tax_planning.get('annualProfit', 0):,.2f}"]
+            ['Estimated Tax Liability', f"{symbol}{tax_planning.get('estimatedTaxLiability', 0):,.2f}"],
+            ['Corporate Tax', f"{symbol}{tax_planning.get('corporateTax', 0):,.2f}"],
+            ['Payroll Tax', f"{symbol}{tax_planning.get('payrollTax', 0):,.2f}"],
+            ['Annual Profit', f"{symbol}{tax_planning.get('annualProfit', 0):,.2f}"]
         ]
         
         tax_table = Table(tax_data, colWidths=[2.5*inch, 2.5*inch])
@@ -117,8 +165,8 @@ class ReportGenerator:
         retirement = recommendations.get('retirementPlanning', {})
         retirement_data = [
             ['Recommended Plan', retirement.get('recommendedPlan', 'N/A')],
-            ['Maximum Contribution', f"${retirement.get('maxContribution', 0):,.2f}"],
-            ['Recommended Contribution', f"${retirement.get('recommendedContribution', 0):,.2f}"],
+            ['Maximum Contribution', f"{symbol}{retirement.get('maxContribution', 0):,.2f}"],
+            ['Recommended Contribution', f"{symbol}{retirement.get('recommendedContribution', 0):,.2f}"],
             ['Tax Benefits', retirement.get('taxBenefits', 'N/A')]
         ]
         
@@ -131,10 +179,10 @@ class ReportGenerator:
         story.append(Paragraph("Annual Cash Flow Summary", self.heading_style))
         cash_flow = recommendations.get('cashFlowForecast', {}).get('annualSummary', {})
         cash_flow_data = [
-            ['Total Annual Revenue', f"${cash_flow.get('totalRevenue', 0):,.2f}"],
-            ['Total Annual Expenses', f"${cash_flow.get('totalExpenses', 0):,.2f}"],
-            ['Net Cash Flow', f"${cash_flow.get('totalNetCashFlow', 0):,.2f}"],
-            ['Average Monthly Revenue', f"${cash_flow.get('averageMonthlyRevenue', 0):,.2f}"]
+            ['Total Annual Revenue', f"{symbol}{cash_flow.get('totalRevenue', 0):,.2f}"],
+            ['Total Annual Expenses', f"{symbol}{cash_flow.get('totalExpenses', 0):,.2f}"],
+            ['Net Cash Flow', f"{symbol}{cash_flow.get('totalNetCashFlow', 0):,.2f}"],
+            ['Average Monthly Revenue', f"{symbol}{cash_flow.get('averageMonthlyRevenue', 0):,.2f}"]
         ]
         
         cash_flow_table = Table(cash_flow_data, colWidths=[2.5*inch, 2.5*inch])
@@ -143,36 +191,50 @@ class ReportGenerator:
         
         # Footer
         story.append(Spacer(1, 30))
-        story.append(Paragraph(f"Report generated on {datetime.datetime.now().strftime('%B %d, %Y')}", self.styles['Normal']))
+        story.append(Paragraph(f"Report generated on {report_date.strftime('%B %d, %Y')}", self.styles['Normal']))
         story.append(Paragraph("This report is for informational purposes only and should not be considered as professional financial advice.", self.styles['Italic']))
         
         # Build PDF
+        started = self._phase_done('pdf', 'story', started)
         doc.build(story)
+        self._phase_done('pdf', 'build', started)
         buffer.seek(0)
         return buffer
     
-    def generate_excel_report(self, business_data: Dict[str, Any], recommendations: Dict[str, Any]) -> BytesIO:
-        """Generate  Excel report"""
-        buffer = BytesIO()
-        workbook = openpyxl.Workbook()
-        
-        # Remove default sheet
-        workbook.remove(workbook.active)
+    def generate_excel_report(self, business_data: Dict[str, Any], recommendations: Dict[str, Any],
+                              symbol: str = '$', output=None):
+        """Generate Excel report.
+
+        The workbook is written in write-only mode: rows are appended once and
+        streamed to temporary files, so memory stays flat however long the
+        forecast is. Pass ``output`` (a path or binary file) to save straight
+        to it; otherwise a BytesIO buffer is returned.
+        """
+        started = time.perf_counter()
+        workbook = openpyxl.Workbook(write_only=True)
         
         # Create Summary sheet
         summary_sheet = workbook.create_sheet("Summary")
-        self._create_summary_sheet(summary_sheet, business_data, recommendations)
+        self._create_summary_sheet(summary_sheet, business_data, recommendations, symbol)
         
         # Create Cash Flow Forecast sheet
         forecast_sheet = workbook.create_sheet("Cash Flow Forecast")
-        self._create_forecast_sheet(forecast_sheet, recommendations.get('cashFlowForecast', {}))
+        self._create_forecast_sheet(forecast_sheet, recommendations.get('cashFlowForecast', {}), symbol)
         
         # Create Recommendations sheet
         recommendations_sheet = workbook.create_sheet("Detailed Recommendations")
-        self._create_recommendations_sheet(recommendations_sheet, recommendations)
+        self._create_recommendations_sheet(recommendations_sheet, recommendations, symbol)
+        started = self._phase_done('excel', 'sheets', started)
+        
+        if output is not None:
+            workbook.save(output)
+            self._phase_done('excel', 'save', started)
+            return output
         
         # Save to buffer
+        buffer = BytesIO()
         workbook.save(buffer)
+        self._phase_done('excel', 'save', started)
         buffer.seek(0)
         return buffer
     
@@ -189,182 +251,146 @@ class ReportGenerator:
             ('GRID', (0, 0), (-1, -1), 1, colors.black)
         ])
     
-    def _create_summary_sheet(self, sheet, business_data: Dict[str, Any], recommendations: Dict[str, Any]):
+    @staticmethod
+    def _cell(sheet, value, bold: bool = False, size: int = None, number_format: str = None, fill: str = None):
+        """Styled cell for a write-only sheet"""
+        cell = WriteOnlyCell(sheet, value=value)
+        if bold or size:
+            cell.font = Font(size=size, bold=bold)
+        if number_format:
+            cell.number_format = number_format
+        if fill:
+            cell.fill = PatternFill(start_color=fill, end_color=fill, fill_type="solid")
+        return cell
+    
+    def _write_rows(self, sheet, rows: List[List[Any]], max_width: int):
+        """Size the columns from the row values, then append the rows"""
+        # Column widths precede the rows in the sheet XML, so they are set first
+        widths = ColumnWidths(max_width)
+        for row in rows:
+            widths.observe(row)
+        widths.apply(sheet)
+        for row in rows:
+            sheet.append(row)
+    
+    def _create_summary_sheet(self, sheet, business_data: Dict[str, Any], recommendations: Dict[str, Any], symbol: str = '$'):
         """Create summary sheet in Excel"""
         # Title
-        sheet['A1'] = "Financial Planning Report Summary"
-        sheet['A1'].font = Font(size=16, bold=True)
-        sheet.merge_cells('A1:B1')
+        rows = [[self._cell(sheet, "Financial Planning Report Summary", bold=True, size=16)], []]
+        sheet.merged_cells.add('A1:B1')
         
         # Business Information
-        sheet['A3'] = "Business Information"
-        sheet['A3'].font = Font(size=14, bold=True)
-        
-        row = 4
+        rows.append([self._cell(sheet, "Business Information", bold=True, size=14)])
         business_info = [
             ('Location', business_data.get('location', {}).get('country', 'N/A')),
             ('Industry', business_data.get('industry', 'N/A').title()),
             ('Employees', business_data.get('employeeCount', 0)),
-            ('Monthly Revenue', f"${business_data.get('monthlyRevenue', 0):,.2f}"),
+            ('Monthly Revenue', f"{symbol}{business_data.get('monthlyRevenue', 0):,.2f}"),
             ('Currency', business_data.get('currency', 'USD'))
         ]
-        
-        for label, value in business_info:
-            sheet[f'A{row}'] = label
-            sheet[f'B{row}'] = value
-            sheet[f'A{row}'].font = Font(bold=True)
-            row += 1
+        rows.extend([self._cell(sheet, label, bold=True), value] for label, value in business_info)
         
         # Key Recommendations
-        row += 2
-        sheet[f'A{row}'] = "Key Recommendations"
-        sheet[f'A{row}'].font = Font(size=14, bold=True)
-        row += 1
+        rows.extend([[], []])
+        rows.append([self._cell(sheet, "Key Recommendations", bold=True, size=14)])
         
         emergency_fund = recommendations.get('emergencyFund', {})
         growth_fund = recommendations.get('growthFund', {})
         
         key_recs = [
-            ('Emergency Fund Needed', f"${emergency_fund.get('recommendedAmount', 0):,.2f}"),
-            ('Monthly Emergency Contribution', f"${emergency_fund.get('monthlyContribution', 0):,.2f}"),
-            ('Growth Investment Budget', f"${growth_fund.get('totalBudget', 0):,.2f}"),
-            ('Estimated Annual Tax', f"${recommendations.get('taxPlanning', {}).get('estimatedTaxLiability', 0):,.2f}")
+            ('Emergency Fund Needed', f"{symbol}{emergency_fund.get('recommendedAmount', 0):,.2f}"),
+            ('Monthly Emergency Contribution', f"{symbol}{emergency_fund.get('monthlyContribution', 0):,.2f}"),
+            ('Growth Investment Budget', f"{symbol}{growth_fund.get('totalBudget', 0):,.2f}"),
+            ('Estimated Annual Tax', f"{symbol}{recommendations.get('taxPlanning', {}).get('estimatedTaxLiability', 0):,.2f}")
         ]
+        rows.extend([self._cell(sheet, label, bold=True), value] for label, value in key_recs)
         
-        for label, value in key_recs:
-            sheet[f'A{row}'] = label
-            sheet[f'B{row}'] = value
-            sheet[f'A{row}'].font = Font(bold=True)
-            row += 1
-        
-        # Auto-adjust column widths
-        for column in sheet.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except Exception:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            sheet.column_dimensions[column_letter].width = adjusted_width
+        self._write_rows(sheet, rows, 50)
     
-    def _create_forecast_sheet(self, sheet, cash_flow_data: Dict[str, Any]):
+    def _create_forecast_sheet(self, sheet, cash_flow_data: Dict[str, Any], symbol: str = '$'):
         """Create cash flow forecast sheet"""
+        monthly_forecast = cash_flow_data.get('monthlyForecast', [])
+        title = f"{len(monthly_forecast)}-Month Cash Flow Forecast"
+        headers = ['Month', 'Revenue', 'Expenses', 'Net Cash Flow']
+        number_format = f'"{symbol}"#,##0.00'
+        
+        def month_values():
+            for month_data in monthly_forecast:
+                yield [
+                    f"Month {month_data.get('month', 0)}",
+                    month_data.get('revenue', 0),
+                    month_data.get('expenses', 0),
+                    month_data.get('netCashFlow', 0)
+                ]
+        
+        # Size columns in one pass over the data before any row is written
+        widths = ColumnWidths(20)
+        widths.observe([title])
+        widths.observe(headers)
+        for values in month_values():
+            widths.observe(values)
+        widths.apply(sheet)
+        
         # Title
-        sheet['A1'] = "12-Month Cash Flow Forecast"
-        sheet['A1'].font = Font(size=16, bold=True)
-        sheet.merge_cells('A1:D1')
+        sheet.append([self._cell(sheet, title, bold=True, size=16)])
+        sheet.merged_cells.add('A1:D1')
+        sheet.append([])
         
         # Headers
-        headers = ['Month', 'Revenue', 'Expenses', 'Net Cash Flow']
-        for col, header in enumerate(headers, 1):
-            cell = sheet.cell(row=3, column=col)
-            cell.value = header
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
+        sheet.append([self._cell(sheet, header, bold=True, fill="CCCCCC") for header in headers])
         
-        # Data
-        monthly_forecast = cash_flow_data.get('monthlyForecast', [])
-        for row, month_data in enumerate(monthly_forecast, 4):
-            sheet.cell(row=row, column=1).value = f"Month {month_data.get('month', 0)}"
-            sheet.cell(row=row, column=2).value = month_data.get('revenue', 0)
-            sheet.cell(row=row, column=3).value = month_data.get('expenses', 0)
-            sheet.cell(row=row, column=4).value = month_data.get('netCashFlow', 0)
-        
-        # Format currency columns
-        for row in range(4, 16):
-            for col in range(2, 5):
-                cell = sheet.cell(row=row, column=col)
-                cell.number_format = '"$"#,##0.00'
+        # Data, one row per forecast month starting at row 4, currency columns formatted
+        for label, *amounts in month_values():
+            sheet.append([label] + [self._cell(sheet, amount, number_format=number_format) for amount in amounts])
+        last_row = 3 + len(monthly_forecast)
         
         # Create chart
         chart = BarChart()
         chart.type = "col"
         chart.style = 10
         chart.title = "Monthly Cash Flow"
-        chart.y_axis.title = 'Amount ($)'
+        chart.y_axis.title = f'Amount ({symbol})'
         chart.x_axis.title = 'Month'
+        # Widen the chart for multi-year horizons so the bars stay readable
+        chart.width = max(15, min(len(monthly_forecast) * 1.25, 120))
         
-        data = Reference(sheet, min_col=2, min_row=3, max_row=15, max_col=4)
-        cats = Reference(sheet, min_col=1, min_row=4, max_row=15)
+        data = Reference(sheet, min_col=2, min_row=3, max_row=last_row, max_col=4)
+        cats = Reference(sheet, min_col=1, min_row=4, max_row=last_row)
         chart.add_data(data, titles_from_data=True)
         chart.set_categories(cats)
         
         sheet.add_chart(chart, "F3")
-        
-        # Auto-adjust column widths
-        for column in sheet.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 20)
-            sheet.column_dimensions[column_letter].width = adjusted_width
     
-    def _create_recommendations_sheet(self, sheet, recommendations: Dict[str, Any]):
+    def _create_recommendations_sheet(self, sheet, recommendations: Dict[str, Any], symbol: str = '$'):
         """Create detailed recommendations sheet"""
         # Title
-        sheet['A1'] = "Detailed Financial Recommendations"
-        sheet['A1'].font = Font(size=16, bold=True)
-        sheet.merge_cells('A1:B1')
-        
-        row = 3
+        rows = [[self._cell(sheet, "Detailed Financial Recommendations", bold=True, size=16)], []]
+        sheet.merged_cells.add('A1:B1')
         
         # Emergency Fund
-        sheet[f'A{row}'] = "Emergency Fund"
-        sheet[f'A{row}'].font = Font(size=14, bold=True)
-        row += 1
+        rows.append([self._cell(sheet, "Emergency Fund", bold=True, size=14)])
         
         emergency_fund = recommendations.get('emergencyFund', {})
         emergency_items = [
-            ('Recommended Amount', f"${emergency_fund.get('recommendedAmount', 0):,.2f}"),
-            ('Current Gap', f"${emergency_fund.get('currentGap', 0):,.2f}"),
-            ('Monthly Contribution', f"${emergency_fund.get('monthlyContribution', 0):,.2f}"),
+            ('Recommended Amount', f"{symbol}{emergency_fund.get('recommendedAmount', 0):,.2f}"),
+            ('Current Gap', f"{symbol}{emergency_fund.get('currentGap', 0):,.2f}"),
+            ('Monthly Contribution', f"{symbol}{emergency_fund.get('monthlyContribution', 0):,.2f}"),
             ('Time to Goal (months)', f"{emergency_fund.get('timeToGoal', 0):.1f}")
         ]
-        
-        for label, value in emergency_items:
-            sheet[f'A{row}'] = label
-            sheet[f'B{row}'] = value
-            row += 1
-        
-        row += 1
+        rows.extend([label, value] for label, value in emergency_items)
+        rows.append([])
         
         # Growth Fund
-        sheet[f'A{row}'] = "Growth Investment Fund"
-        sheet[f'A{row}'].font = Font(size=14, bold=True)
-        row += 1
+        rows.append([self._cell(sheet, "Growth Investment Fund", bold=True, size=14)])
         
         growth_fund = recommendations.get('growthFund', {})
         growth_items = [
-            ('Total Budget', f"${growth_fund.get('totalBudget', 0):,.2f}"),
-            ('Marketing Budget', f"${growth_fund.get('marketingBudget', 0):,.2f}"),
-            ('Hiring Budget', f"${growth_fund.get('hiringBudget', 0):,.2f}"),
-            ('Equipment Upgrade', f"${growth_fund.get('equipmentUpgrade', 0):,.2f}"),
-            ('R&D Budget', f"${growth_fund.get('researchDevelopment', 0):,.2f}")
+            ('Total Budget', f"{symbol}{growth_fund.get('totalBudget', 0):,.2f}"),
+            ('Marketing Budget', f"{symbol}{growth_fund.get('marketingBudget', 0):,.2f}"),
+            ('Hiring Budget', f"{symbol}{growth_fund.get('hiringBudget', 0):,.2f}"),
+            ('Equipment Upgrade', f"{symbol}{growth_fund.get('equipmentUpgrade', 0):,.2f}"),
+            ('R&D Budget', f"{symbol}{growth_fund.get('researchDevelopment', 0):,.2f}")
         ]
+        rows.extend([label, value] for label, value in growth_items)
         
-        for label, value in growth_items:
-            sheet[f'A{row}'] = label
-            sheet[f'B{row}'] = value
-            row += 1
-        
-        # Auto-adjust column widths
-        for column in sheet.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            sheet.column_dimensions[column_letter].width = adjusted_width
-
+        self._write_rows(sheet, rows, 50)
@@ -0,0 +1,520 @@
+import datetime
+import json
+import logging
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, Iterable, Iterator, Optional, Tuple
+from src.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+REPORT_FORMATS = {
+    'pdf': ('.pdf', 'application/pdf'),
+    'excel': ('.xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+}
+DEFAULT_RETENTION_SECONDS = 3600
+DEFAULT_MAX_PENDING = 64
+# Forking a threaded server worker can hand the children locks held by its other threads
+DEFAULT_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+JOB_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+def prepare_report(calculator, data: Dict[str, Any]) -> Tuple[str, Dict[str, Any], Dict[str, Any], str]:
+    """Validate a report request and convert it to the report currency.
+
+    Returns (format, business data, recommendations, currency symbol);
+    raises ValueError for invalid input.
+    """
+    business_data = data.get('businessData', {})
+    recommendations = data.get('recommendations', {})
+    report_format = data.get('format', 'pdf').lower()
+
+    if not business_data or not recommendations:
+        raise ValueError('Missing business data or recommendations')
+    if report_format not in REPORT_FORMATS:
+        raise ValueError('Unsupported format. Use "pdf" or "excel"')
+
+    # Reports are shown in the requested currency, else the business currency
+    source_currency = business_data.get('currency', 'USD')
+    target_currency = (data.get('currency') or source_currency).upper()
+    business_data = calculator.convert_currency(business_data, source_currency, target_currency)
+    recommendations = calculator.convert_currency(recommendations, source_currency, target_currency)
+    business_data = dict(business_data, currency=target_currency)
+    symbol = calculator.currency_engine.symbol(target_currency)
+    return report_format, business_data, recommendations, symbol
+
+
+def _state_path(spool_dir: str, job_id: str) -> str:
+    return os.path.join(spool_dir, job_id + '.json')
+
+
+def _read_state(spool_dir: str, job_id: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(_state_path(spool_dir, job_id)) as state_file:
+            return json.load(state_file)
+    except (OSError, ValueError):
+        return None
+
+
+def _update_state(spool_dir: str, job_id: str, **fields):
+    """Merge fields into a job's state file, which every server process can read.
+
+    Each job's state is written by one process at a time (the submitter, then
+    the worker rendering it, then the submitter again), so read-modify-write
+    is safe; the rename keeps readers from seeing a partial file.
+    """
+    path = _state_path(spool_dir, job_id)
+    state = _read_state(spool_dir, job_id) or {}
+    state.update(fields)
+    temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        with open(temp_path, 'w') as state_file:
+            json.dump(state, state_file)
+        os.replace(temp_path, path)
+    except OSError as e:
+        logger.error('Could not write state of report job %s: %s', job_id, e)
+
+
+# One warmed-up generator per worker process, built by the pool initializer.
+# ReportLab, openpyxl and Pillow are imported by the first render (or warm-up),
+# never by importing this module, so processes that serve no reports skip them.
+_worker_generator = None
+
+
+def _init_worker(metrics_dir: str = None):
+    """Pool initializer: build and warm a ReportGenerator once per worker"""
+    global _worker_generator
+    if metrics_dir:
+        # Spawned workers don't inherit the parent's configuration
+        metrics.configure(metrics_dir)
+    from src.services.report_generator import ReportGenerator
+    _worker_generator = ReportGenerator()
+    _worker_generator.warm_up()
+
+
+def _render(job_id: str, spool_dir: str, report_format: str, business_data: Dict[str, Any],
+            recommendations: Dict[str, Any], symbol: str, report_date: datetime.date) -> int:
+    """Render one report straight into the spool and return its size.
+
+    Runs in a worker; only the file size travels back to the parent, and the
+    rename makes a report visible only once it is completely written.
+    """
+    _update_state(spool_dir, job_id, status='running', startedAt=time.time())
+    generator = _worker_generator
+    if generator is None:
+        from src.services.report_generator import ReportGenerator
+        generator = ReportGenerator()
+    path = os.path.join(spool_dir, job_id + REPORT_FORMATS[report_format][0])
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    if report_format == 'pdf':
+        buffer = generator.generate_pdf_report(business_data, recommendations, symbol, report_date)
+        with open(temp_path, 'wb') as spool_file:
+            spool_file.write(buffer.getbuffer())
+    else:
+        # Streamed from the write-only workbook straight to disk
+        generator.generate_excel_report(business_data, recommendations, symbol, output=temp_path)
+    os.replace(temp_path, path)
+    size = os.path.getsize(path)
+    metrics.observe('report_output_bytes', size, (('format', report_format),))
+    # Pool workers are stopped without running exit handlers, so publish right away
+    metrics.flush()
+    return size
+
+
+class ReportQueueFull(Exception):
+    """Raised when the number of unfinished report jobs reaches the queue bound"""
+
+
+class ReportJob:
+    """Book-keeping for one submitted report"""
+
+    __slots__ = ('job_id', 'report_format', 'future', 'cache_key', 'cached',
+                 'created_at', 'started_at', 'finished_at', 'size', 'error')
+
+    def __init__(self, job_id: str, report_format: str, future, cache_key: str = None, cached: bool = False):
+        self.job_id = job_id
+        self.report_format = report_format
+        self.future = future
+        self.cache_key = cache_key
+        self.cached = cached
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.size = None
+        self.error = None
+
+
+class ReportJobQueue:
+    """Renders reports in a bounded process pool and spools the results to disk.
+
+    PDF and Excel rendering is CPU-bound pure Python, so running it on the
+    request thread stalls every other request behind the GIL. Jobs are handed
+    to worker processes that each keep a warmed ``ReportGenerator``; finished
+    files stay in ``spool_dir`` for ``retention_seconds`` and are swept after.
+    With ``max_workers=0`` jobs run on a single in-process thread instead
+    (useful where worker processes are unavailable, e.g. during development).
+    Given a ``ReportArtifactCache``, reports already rendered with the same
+    inputs are linked into the spool without touching the pool, and new
+    renders are published to the cache as they finish.
+    """
+
+    def __init__(self, spool_dir: str = None, max_workers: int = None,
+                 retention_seconds: float = DEFAULT_RETENTION_SECONDS,
+                 max_pending: int = DEFAULT_MAX_PENDING, start_method: str = None, cache=None):
+        self.spool_dir = spool_dir or os.path.join(tempfile.gettempdir(), 'financial-reports')
+        self.max_workers = min(4, os.cpu_count() or 1) if max_workers is None else max_workers
+        self.retention_seconds = retention_seconds
+        self.max_pending = max_pending
+        self.start_method = start_method or DEFAULT_START_METHOD
+        self.cache = cache
+        self._jobs = {}
+        self._lock = threading.Lock()
+        # Signalled whenever a job stops counting as pending
+        self._room = threading.Condition(self._lock)
+        self._executor = None
+        self._completed = 0
+        self._failed = 0
+        self._expired = 0
+        os.makedirs(self.spool_dir, exist_ok=True)
+        self._sweep_spool()
+
+    def _get_executor(self):
+        """Create the pool on first use so importing the module never forks"""
+        if self._executor is None:
+            if self.max_workers <= 0:
+                self._executor = ThreadPoolExecutor(max_workers=1, initializer=_init_worker)
+            else:
+                context = multiprocessing.get_context(self.start_method)
+                if self.start_method == 'forkserver':
+                    # Workers fork from a server that already has the report libraries loaded
+                    context.set_forkserver_preload(['src.services.report_generator'])
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=context,
+                    initializer=_init_worker, initargs=(metrics.directory,)
+                )
+        return self._executor
+
+    def submit(self, report_format: str, business_data: Dict[str, Any], recommendations: Dict[str, Any],
+               symbol: str = '$', use_cache: bool = True, inline: bool = False) -> ReportJob:
+        """Queue a report for rendering (or reuse a cached one) and return its job.
+
+        With ``inline`` the report is rendered on the calling thread instead,
+        bypassing the pool (used when profiling a request).
+        """
+        if report_format not in REPORT_FORMATS:
+            raise ValueError('Unsupported format. Use "pdf" or "excel"')
+        self.sweep()
+        job_id = uuid.uuid4().hex
+        # Fixed here so the rendered footer and the cache key agree across midnight
+        report_date = datetime.date.today()
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.key(report_format, business_data, recommendations, symbol, report_date)
+            path = self.path(job_id, report_format)
+            if use_cache and self.cache.link(cache_key, report_format, path):
+                future = Future()
+                future.set_result(os.path.getsize(path))
+                job = ReportJob(job_id, report_format, future, cache_key, cached=True)
+                with self._lock:
+                    self._jobs[job_id] = job
+                self._finish(job, future)
+                return job
+
+        args = (_render, job_id, self.spool_dir, report_format, business_data, recommendations, symbol, report_date)
+        if inline:
+            future = Future()
+            job = ReportJob(job_id, report_format, future, cache_key)
+            with self._lock:
+                self._jobs[job_id] = job
+            self._write_state(job)
+            try:
+                future.set_result(_render(*args[1:]))
+            except Exception as e:
+                future.set_exception(e)
+            self._finish(job, future)
+            return job
+
+        with self._lock:
+            pending = self._pending()
+            if pending >= self.max_pending:
+                raise ReportQueueFull(f'Report queue is full ({pending} jobs pending)')
+            # Written before the worker can pick the job up and mark it running
+            _update_state(self.spool_dir, job_id, jobId=job_id, format=report_format, status='queued',
+                          createdAt=time.time())
+            try:
+                future = self._get_executor().submit(*args)
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM-killed); start a fresh pool
+                logger.error('Report worker pool broken, restarting it')
+                self._executor = None
+                future = self._get_executor().submit(*args)
+            job = ReportJob(job_id, report_format, future, cache_key)
+            self._jobs[job_id] = job
+        future.add_done_callback(lambda done: self._finish(job, done))
+        return job
+
+    def _pending(self) -> int:
+        return sum(1 for job in self._jobs.values() if not job.future.done())
+
+    def _finish(self, job: ReportJob, future):
+        with self._room:
+            self._room.notify_all()
+        job.finished_at = time.time()
+        if job.started_at is None:
+            job.started_at = job.finished_at
+        try:
+            job.size = future.result()
+            self._completed += 1
+        except Exception as e:
+            job.error = str(e) or e.__class__.__name__
+            self._failed += 1
+            logger.error('Report job %s failed: %s', job.job_id, job.error)
+            self._write_state(job)
+            return
+        self._write_state(job)
+        if job.cache_key and not job.cached:
+            try:
+                self.cache.put(job.cache_key, job.report_format, self.path(job.job_id, job.report_format))
+            except OSError as e:
+                logger.error('Could not cache report %s: %s', job.job_id, e)
+
+    def _write_state(self, job: ReportJob):
+        """Publish a job's state for polls that land on other server processes"""
+        if job.finished_at is not None:
+            state = 'failed' if job.error else 'completed'
+        else:
+            state = 'running' if job.started_at is not None else 'queued'
+        fields = {'jobId': job.job_id, 'format': job.report_format, 'status': state,
+                  'createdAt': job.created_at, 'finishedAt': job.finished_at, 'cached': job.cached}
+        if job.finished_at is not None:
+            fields.update(size=job.size, error=job.error)
+            # The worker records when rendering really started; keep it if it did
+            if job.cached or job.error:
+                fields['startedAt'] = job.started_at
+        # Under the lock, so a job discarded meanwhile (its waiter can wake before this callback) stays gone
+        with self._lock:
+            if self._jobs.get(job.job_id) is job:
+                _update_state(self.spool_dir, job.job_id, **fields)
+
+    def run(self, report_format: str, business_data: Dict[str, Any], recommendations: Dict[str, Any],
+            symbol: str = '$', timeout: float = None, use_cache: bool = True, inline: bool = False) -> ReportJob:
+        """Render synchronously through the pool (or inline) and return the finished job.
+
+        The caller should ``discard`` the job once its file has been sent; a
+        job that fails or times out is discarded here once it is done.
+        """
+        job = self.submit(report_format, business_data, recommendations, symbol, use_cache, inline)
+        try:
+            job.future.result(timeout=timeout)
+        except BaseException:
+            job.future.add_done_callback(lambda _: self.discard(job.job_id))
+            raise
+        return job
+
+    def render_many(self, reports: Iterable[tuple], window: int = None) -> Iterator[Tuple[Any, ReportJob, Optional[str]]]:
+        """Render many reports with a bounded number in flight.
+
+        ``reports`` yields (key, format, business data, recommendations,
+        symbol) and is consumed lazily, at most ``window`` ahead of the
+        results. Yields (key, job, error) in completion order; the caller
+        should ``discard`` each job once its file has been used. Jobs still in
+        flight when the consumer stops are cancelled or discarded.
+        """
+        window = window or max(1, self.max_workers) * 2
+        reports = iter(reports)
+        in_flight = {}
+        exhausted = False
+        try:
+            while in_flight or not exhausted:
+                while not exhausted and len(in_flight) < window:
+                    item = next(reports, None)
+                    if item is None:
+                        exhausted = True
+                        break
+                    key, *report = item
+                    job = self._submit_when_free(report)
+                    in_flight[job.future] = (key, job)
+                if not in_flight:
+                    continue
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key, job = in_flight.pop(future)
+                    error = future.exception()
+                    yield key, job, (str(error) or error.__class__.__name__) if error else None
+        finally:
+            for _, job in in_flight.values():
+                job.future.cancel()
+                job.future.add_done_callback(lambda _, job_id=job.job_id: self.discard(job_id))
+
+    def _submit_when_free(self, report: list) -> ReportJob:
+        """Submit, waiting for room when other requests have filled the queue"""
+        while True:
+            try:
+                return self.submit(*report)
+            except ReportQueueFull:
+                # Checked again under the lock, so a job finishing in between is not missed
+                with self._room:
+                    while self._pending() >= self.max_pending:
+                        self._room.wait()
+
+    def discard(self, job_id: str):
+        """Forget a job and delete its spooled file"""
+        with self._room:
+            job = self._jobs.pop(job_id, None)
+            self._room.notify_all()
+        if job is not None:
+            self._remove(self.path(job_id, job.report_format))
+        self._remove(_state_path(self.spool_dir, job_id))
+
+    def get(self, job_id: str) -> Optional[ReportJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def path(self, job_id: str, report_format: str) -> str:
+        return os.path.join(self.spool_dir, job_id + REPORT_FORMATS[report_format][0])
+
+    def find_artifact(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Locate a finished report by id, including ones spooled by another process"""
+        if not JOB_ID_PATTERN.match(job_id or ''):
+            return None
+        job = self.get(job_id)
+        if job is not None:
+            formats = [job.report_format]
+        else:
+            state = _read_state(self.spool_dir, job_id)
+            formats = [state['format']] if state and state.get('format') in REPORT_FORMATS else list(REPORT_FORMATS)
+        for report_format in formats:
+            path = self.path(job_id, report_format)
+            if os.path.exists(path):
+                return {'path': path, 'format': report_format, 'mimetype': REPORT_FORMATS[report_format][1]}
+        return None
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Progress of a job, or None if it is unknown or has expired"""
+        if not JOB_ID_PATTERN.match(job_id or ''):
+            return None
+        job = self.get(job_id)
+        if job is None:
+            return self._shared_status(job_id)
+
+        future = job.future
+        if future.done():
+            state = 'failed' if job.error else 'completed'
+        elif future.running():
+            state = 'running'
+            if job.started_at is None:
+                job.started_at = time.time()
+        else:
+            state = 'queued'
+        result = {
+            'jobId': job.job_id,
+            'format': job.report_format,
+            'status': state,
+            'progress': {'queued': 0.0, 'running': 0.5}.get(state, 1.0),
+            'createdAt': job.created_at,
+            'startedAt': job.started_at,
+            'finishedAt': job.finished_at
+        }
+        if state == 'queued':
+            with self._lock:
+                result['queuePosition'] = sum(
+                    1 for other in self._jobs.values()
+                    if not other.future.done() and other.created_at < job.created_at
+                )
+        elif state == 'completed':
+            result['size'] = job.size
+            result['cached'] = job.cached
+            result['expiresAt'] = job.finished_at + self.retention_seconds
+        elif state == 'failed':
+            result['error'] = job.error
+        return result
+
+    def _shared_status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Status of a job submitted by another server process, from its state file in the spool"""
+        state = _read_state(self.spool_dir, job_id)
+        artifact = self.find_artifact(job_id)
+        if state is None:
+            if artifact is None:
+                return None
+            # Spooled without a state file: only the file is known
+            modified = os.path.getmtime(artifact['path'])
+            state = {'jobId': job_id, 'format': artifact['format'], 'status': 'completed', 'finishedAt': modified}
+        status = state.get('status')
+        if status == 'completed' and artifact is None:
+            # Past retention and swept
+            return None
+        result = {
+            'jobId': job_id,
+            'format': state.get('format'),
+            'status': status,
+            'progress': {'queued': 0.0, 'running': 0.5}.get(status, 1.0),
+            'createdAt': state.get('createdAt'),
+            'startedAt': state.get('startedAt'),
+            'finishedAt': state.get('finishedAt')
+        }
+        if status == 'completed':
+            result['size'] = os.path.getsize(artifact['path'])
+            result['cached'] = state.get('cached', False)
+            result['expiresAt'] = result['finishedAt'] + self.retention_seconds
+        elif status == 'failed':
+            result['error'] = state.get('error')
+        return result
+
+    def sweep(self):
+        """Forget jobs and delete spooled files older than the retention window"""
+        cutoff = time.time() - self.retention_seconds
+        with self._lock:
+            expired = [
+                job for job in self._jobs.values()
+                if job.finished_at is not None and job.finished_at < cutoff
+            ]
+            for job in expired:
+                del self._jobs[job.job_id]
+        for job in expired:
+            self._remove(self.path(job.job_id, job.report_format))
+            self._remove(_state_path(self.spool_dir, job.job_id))
+        self._expired += len(expired)
+
+    def _sweep_spool(self):
+        """Delete files left in the spool by earlier runs once they are past retention"""
+        cutoff = time.time() - self.retention_seconds
+        for entry in os.scandir(self.spool_dir):
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    self._remove(entry.path)
+            except OSError:
+                pass
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and job counters"""
+        with self._lock:
+            pending = self._pending()
+            tracked = len(self._jobs)
+        return {
+            'workers': self.max_workers,
+            'pending': pending,
+            'maxPending': self.max_pending,
+            'tracked': tracked,
+            'completed': self._completed,
+            'failed': self._failed,
+            'expired': self._expired,
+            'retentionSeconds': self.retention_seconds
+        }
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
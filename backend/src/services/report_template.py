@@ -0,0 +1,5 @@
+# Kept apart from report_generator so the web processes can compute cache keys
+# without importing ReportLab and openpyxl; rendering happens in the pool workers.
+
+# Bump whenever the PDF or workbook layout changes; it is part of every cached report's key
+REPORT_TEMPLATE_VERSION = '3'
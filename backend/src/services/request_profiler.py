@@ -0,0 +1,302 @@
+import cProfile
+import hmac
+import io
+import json
+import logging
+import os
+import pstats
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Dict, Any, List, Optional
+from flask import g, request
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-Profile-Token'
+# Only these endpoints can be profiled
+PROFILED_ENDPOINTS = ('financial.calculate_recommendations', 'financial.generate_report')
+CAPTURE_FORMATS = {'pstats': '.pstats', 'collapsed': '.collapsed'}
+CAPTURE_ID_PATTERN = re.compile(r'^\d{13}-[0-9a-f]{8}$')
+DEFAULT_MAX_CAPTURES = 50
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+DEFAULT_SAMPLE_INTERVAL = 0.001
+TOP_FUNCTIONS = 15
+# Files of a capture that never got its summary (the process died mid-write) are removed after this
+ORPHAN_AGE_SECONDS = 60
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _frame_label(code) -> str:
+    """function (file:line), with paths relative to the backend or site-packages"""
+    filename = code.co_filename
+    if filename.startswith(BACKEND_DIR + os.sep):
+        filename = filename[len(BACKEND_DIR) + 1:]
+    else:
+        _, marker, rest = filename.rpartition('site-packages' + os.sep)
+        filename = rest if marker else filename
+    # ';' separates frames in the collapsed format
+    return f'{code.co_name} ({filename}:{code.co_firstlineno})'.replace(';', ':')
+
+
+class ProfileCapture:
+    """cProfile plus a stack sampler, both attached to the thread serving one request.
+
+    cProfile yields exact call counts and times (pstats); the sampler records
+    whole stacks every ``interval`` seconds, which is what flame graphs need
+    (collapsed stacks, one ``frame;frame;frame count`` line per stack).
+    """
+
+    def __init__(self, trigger: str, interval: float):
+        self.trigger = trigger
+        self.interval = interval
+        self.profile = cProfile.Profile()
+        self.samples = Counter()
+        self._thread_id = None
+        self._stop = threading.Event()
+        self._sampler = None
+        self.started_at = None
+        self.duration = None
+
+    def start(self):
+        self._thread_id = threading.get_ident()
+        self._sampler = threading.Thread(target=self._sample, name='profile-sampler', daemon=True)
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self._sampler.start()
+        self.profile.enable()
+
+    def stop(self):
+        if self.duration is not None:
+            return
+        self.profile.disable()
+        self.duration = time.perf_counter() - self._started
+        self._stop.set()
+        self._sampler.join()
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(_frame_label(code) for code in reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        return ''.join(f'{stack} {count}\n' for stack, count in self.samples.most_common())
+
+    def top_functions(self) -> List[Dict[str, Any]]:
+        """The functions with the most own time"""
+        stats = pstats.Stats(self.profile, stream=io.StringIO())
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:TOP_FUNCTIONS]
+        return [{
+            'function': f'{name} ({filename}:{line})',
+            'calls': calls,
+            'ownSeconds': round(own_time, 6),
+            'cumulativeSeconds': round(cumulative_time, 6)
+        } for (filename, line, name), (_, calls, own_time, cumulative_time, _) in rows]
+
+
+class RequestProfiler:
+    """Opt-in profiling of single requests, written to a bounded local directory.
+
+    Off unless ``admin_token`` is set (requests carrying it in the
+    ``X-Profile-Token`` header are profiled) or ``sample_rate`` > 0 (that
+    fraction of eligible requests is profiled). Each capture is a
+    ``.pstats`` file, a ``.collapsed`` stack file and a ``.json`` summary;
+    the oldest captures are deleted once there are more than
+    ``max_captures`` or they take more than ``max_bytes``.
+    """
+
+    def __init__(self, directory: str = None, admin_token: str = None, sample_rate: float = 0.0,
+                 max_captures: int = DEFAULT_MAX_CAPTURES, max_bytes: int = DEFAULT_MAX_BYTES,
+                 sample_interval: float = DEFAULT_SAMPLE_INTERVAL):
+        self.directory = directory or os.path.join(tempfile.gettempdir(), 'financial-profiles')
+        self.admin_token = admin_token
+        self.sample_rate = sample_rate
+        self.max_captures = max_captures
+        self.max_bytes = max_bytes
+        self.sample_interval = sample_interval
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.admin_token) or self.sample_rate > 0
+
+    def is_admin(self, headers) -> bool:
+        token = headers.get(PROFILE_HEADER)
+        return bool(self.admin_token and token) and hmac.compare_digest(token, self.admin_token)
+
+    def trigger(self, endpoint: str, headers) -> Optional[str]:
+        """Why this request should be profiled ('header' or 'sampled'), or None"""
+        if endpoint not in PROFILED_ENDPOINTS:
+            return None
+        if self.is_admin(headers):
+            return 'header'
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return 'sampled'
+        return None
+
+    def start(self, trigger: str) -> ProfileCapture:
+        capture = ProfileCapture(trigger, self.sample_interval)
+        capture.start()
+        return capture
+
+    def save(self, capture: ProfileCapture, details: Dict[str, Any]) -> str:
+        """Write a finished capture and trim the directory; returns the capture id"""
+        capture_id = f'{int(capture.started_at * 1000):013d}-{uuid.uuid4().hex[:8]}'
+        base = os.path.join(self.directory, capture_id)
+        capture.profile.dump_stats(base + '.pstats')
+        with open(base + '.collapsed', 'w') as collapsed_file:
+            collapsed_file.write(capture.collapsed())
+        summary = dict(details, **{
+            'id': capture_id,
+            'trigger': capture.trigger,
+            'startedAt': capture.started_at,
+            'durationSeconds': round(capture.duration, 6),
+            'samples': sum(capture.samples.values()),
+            'sampleIntervalSeconds': capture.interval,
+            'topFunctions': capture.top_functions()
+        })
+        # The summary is written last: a capture is listed only once all its files exist
+        with open(base + '.json.tmp', 'w') as summary_file:
+            json.dump(summary, summary_file)
+        os.replace(base + '.json.tmp', base + '.json')
+        self._enforce_limits()
+        return capture_id
+
+    def _files(self, capture_id: str) -> List[str]:
+        base = os.path.join(self.directory, capture_id)
+        return [base + '.json'] + [base + extension for extension in CAPTURE_FORMATS.values()]
+
+    def _captures(self, orphans: list = None) -> List[tuple]:
+        """(capture id, total bytes) of every complete capture, oldest first.
+
+        Ids of stale incomplete captures are appended to ``orphans`` if given.
+        """
+        sizes = {}
+        complete = set()
+        for entry in os.scandir(self.directory):
+            capture_id, _, extension = entry.name.partition('.')
+            if not CAPTURE_ID_PATTERN.match(capture_id):
+                continue
+            try:
+                sizes[capture_id] = sizes.get(capture_id, 0) + entry.stat().st_size
+            except OSError:
+                continue
+            if extension == 'json':
+                complete.add(capture_id)
+        if orphans is not None:
+            cutoff = (time.time() - ORPHAN_AGE_SECONDS) * 1000
+            orphans.extend(capture_id for capture_id in sizes
+                           if capture_id not in complete and int(capture_id[:13]) < cutoff)
+        return [(capture_id, sizes[capture_id]) for capture_id in sorted(complete)]
+
+    def _remove(self, capture_id: str):
+        for path in self._files(capture_id) + [os.path.join(self.directory, capture_id + '.json.tmp')]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _enforce_limits(self):
+        with self._lock:
+            orphans = []
+            captures = self._captures(orphans)
+            for capture_id in orphans:
+                self._remove(capture_id)
+            total = sum(size for _, size in captures)
+            while captures and (len(captures) > self.max_captures or total > self.max_bytes):
+                capture_id, size = captures.pop(0)
+                self._remove(capture_id)
+                total -= size
+
+    def list(self, limit: int = None) -> List[Dict[str, Any]]:
+        """Summaries of retained captures, newest first (without the function tables)"""
+        result = []
+        for capture_id, size in reversed(self._captures()):
+            summary = self.get(capture_id)
+            if summary is None:
+                continue
+            summary.pop('topFunctions', None)
+            summary['sizeBytes'] = size
+            result.append(summary)
+            if limit and len(result) >= limit:
+                break
+        return result
+
+    def get(self, capture_id: str) -> Optional[Dict[str, Any]]:
+        if not CAPTURE_ID_PATTERN.match(capture_id or ''):
+            return None
+        try:
+            with open(os.path.join(self.directory, capture_id + '.json')) as summary_file:
+                return json.load(summary_file)
+        except (OSError, ValueError):
+            return None
+
+    def path(self, capture_id: str, capture_format: str) -> Optional[str]:
+        if not CAPTURE_ID_PATTERN.match(capture_id or '') or capture_format not in CAPTURE_FORMATS:
+            return None
+        path = os.path.join(self.directory, capture_id + CAPTURE_FORMATS[capture_format])
+        return path if os.path.exists(path) else None
+
+    def stats(self) -> Dict[str, Any]:
+        captures = self._captures()
+        return {
+            'enabled': self.enabled,
+            'sampleRate': self.sample_rate,
+            'captures': len(captures),
+            'maxCaptures': self.max_captures,
+            'sizeBytes': sum(size for _, size in captures),
+            'maxBytes': self.max_bytes
+        }
+
+
+def profiling_active() -> bool:
+    """Whether the current request is being profiled (caches are skipped and reports render inline)"""
+    return 'profile_capture' in g
+
+
+def init_app(app, profiler: RequestProfiler):
+    """Start and save captures around eligible requests"""
+    if not profiler.enabled:
+        return
+
+    @app.before_request
+    def start_profile():
+        trigger = profiler.trigger(request.endpoint, request.headers)
+        if trigger:
+            g.profile_capture = profiler.start(trigger)
+
+    @app.after_request
+    def save_profile(response):
+        capture = g.pop('profile_capture', None)
+        if capture is None:
+            return response
+        capture.stop()
+        try:
+            capture_id = profiler.save(capture, {
+                'method': request.method,
+                'path': request.path,
+                'endpoint': request.endpoint,
+                'status': response.status_code
+            })
+            response.headers['X-Profile-Id'] = capture_id
+        except OSError as e:
+            logger.error('Could not save profile capture: %s', e)
+        return response
+
+    @app.teardown_request
+    def stop_profile(error=None):
+        # after_request is skipped when the response itself fails; never leave the profiler attached
+        capture = g.pop('profile_capture', None)
+        if capture is not None:
+            capture.stop()
@@ -0,0 +1,168 @@
+import numpy as np
+from typing import Dict, Any, List
+
+MAX_SWEEP_POINTS = 1000000
+SWEEP_MODES = ('grid', 'lhs')
+# Sweepable top-level inputs -> batch calculator column
+SCALAR_AXES = {'monthlyRevenue': 'revenue', 'employeeCount': 'employeeCount', 'currentSavings': 'savings'}
+OPERATING_AXIS_PREFIX = 'operatingExpenses.'
+INTEGER_AXES = ('employeeCount',)
+
+# Output columns of a sweep: metric name -> (section, field)
+SWEEP_METRICS = {
+    'emergencyFund.recommendedAmount': ('emergencyFund', 'recommendedAmount'),
+    'emergencyFund.currentGap': ('emergencyFund', 'currentGap'),
+    'emergencyFund.monthlyContribution': ('emergencyFund', 'monthlyContribution'),
+    'emergencyFund.monthlyExpenses': ('emergencyFund', 'monthlyExpenses'),
+    'growthFund.totalBudget': ('growthFund', 'totalBudget'),
+    'employeeBenefitsFund.totalBudget': ('employeeBenefitsFund', 'totalBudget'),
+    'employeeBenefitsFund.perEmployeeMonthly': ('employeeBenefitsFund', 'perEmployeeMonthly'),
+    'taxPlanning.estimatedTaxLiability': ('taxPlanning', 'estimatedTaxLiability'),
+    'taxPlanning.annualProfit': ('taxPlanning', 'annualProfit'),
+    'retirementPlanning.recommendedContribution': ('retirementPlanning', 'recommendedContribution'),
+    'cashFlowForecast.totalNetCashFlow': ('cashFlowForecast', 'totalNetCashFlow'),
+    'cashFlowForecast.totalRevenue': ('cashFlowForecast', 'totalRevenue'),
+    'debtManagement.debtToRevenueRatio': ('debtManagement', 'debtToRevenueRatio')
+}
+
+
+class ScenarioSweep:
+    """Evaluate a base profile over a grid or Latin-hypercube sample of input variations.
+
+    Axes are broadcast straight into the batch calculator's columns, so the
+    whole sweep is one vectorized pass and the output stays columnar: the
+    axis values plus one flat array per metric.
+    """
+
+    def __init__(self, batch_calculator):
+        self.batch_calculator = batch_calculator
+
+    def _axis_values(self, name: str, spec: Any, base_value: float) -> np.ndarray:
+        """Expand one axis spec ({values} or {start, stop, steps}, optionally relative) into values"""
+        if isinstance(spec, list):
+            spec = {'values': spec}
+        if not isinstance(spec, dict):
+            raise ValueError(f'Axis "{name}" must be a list or an object')
+        # Sizes are checked before anything is allocated
+        if 'values' in spec:
+            if not isinstance(spec['values'], list) or len(spec['values']) > MAX_SWEEP_POINTS:
+                raise ValueError(f'Axis "{name}" values must be a list of at most {MAX_SWEEP_POINTS} numbers')
+            values = np.asarray(spec['values'], dtype=float)
+        elif 'start' in spec and 'stop' in spec:
+            steps = spec.get('steps', 5)
+            if not isinstance(steps, int) or isinstance(steps, bool) or not 1 <= steps <= MAX_SWEEP_POINTS:
+                raise ValueError(f'Axis "{name}" steps must be an integer between 1 and {MAX_SWEEP_POINTS}')
+            values = np.linspace(float(spec['start']), float(spec['stop']), steps)
+        else:
+            raise ValueError(f'Axis "{name}" needs "values" or "start"/"stop"')
+        if values.ndim != 1 or values.size == 0:
+            raise ValueError(f'Axis "{name}" has no values')
+        if spec.get('relative'):
+            values = values * base_value
+        if name in INTEGER_AXES:
+            values = np.rint(values)
+        return values
+
+    def _grid(self, axes: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        points = int(np.prod([values.size for values in axes.values()]))
+        if points > MAX_SWEEP_POINTS:
+            raise ValueError(f'Grid has {points} points, the limit is {MAX_SWEEP_POINTS}')
+        mesh = np.meshgrid(*axes.values(), indexing='ij')
+        return {name: grid.ravel() for name, grid in zip(axes, mesh)}
+
+    def _latin_hypercube(self, axes: Dict[str, np.ndarray], samples: int, seed: Any) -> Dict[str, np.ndarray]:
+        if not 0 < samples <= MAX_SWEEP_POINTS:
+            raise ValueError(f'Sample count must be between 1 and {MAX_SWEEP_POINTS}')
+        rng = np.random.default_rng(seed)
+        points = {}
+        for name, values in axes.items():
+            # One draw per stratum of [min, max], strata shuffled independently per axis
+            strata = (rng.permutation(samples) + rng.random(samples)) / samples
+            low, high = values.min(), values.max()
+            sample = low + strata * (high - low)
+            points[name] = np.rint(sample) if name in INTEGER_AXES else sample
+        return points
+
+    def sweep(self, business_data: Dict[str, Any], axes: Dict[str, Any], mode: str = 'grid',
+              samples: int = 1000, seed: Any = None, metrics: List[str] = None) -> Dict[str, Any]:
+        """Evaluate every sweep point and return axes plus one array per metric"""
+        if mode not in SWEEP_MODES:
+            raise ValueError(f'Unsupported sweep mode "{mode}". Use "grid" or "lhs"')
+        if not isinstance(axes, dict) or not axes:
+            raise ValueError('At least one axis is required')
+        metrics = list(metrics or SWEEP_METRICS)
+        unknown = [metric for metric in metrics if metric not in SWEEP_METRICS]
+        if unknown:
+            raise ValueError(f'Unknown metrics: {", ".join(unknown)}')
+
+        operating_expenses = business_data.get('operatingExpenses', {})
+        axis_values = {}
+        for name, spec in axes.items():
+            if name in SCALAR_AXES:
+                base_value = business_data.get(name, 0)
+            elif name.startswith(OPERATING_AXIS_PREFIX):
+                base_value = operating_expenses.get(name[len(OPERATING_AXIS_PREFIX):], 0)
+            else:
+                raise ValueError(f'Unsupported axis "{name}"')
+            axis_values[name] = self._axis_values(name, spec, base_value)
+
+        if mode == 'grid':
+            points = self._grid(axis_values)
+        else:
+            if seed is None:
+                # Drawn like the Monte Carlo simulator's, so an unseeded sample can be reproduced
+                seed = np.random.SeedSequence().entropy % 2 ** 53
+            points = self._latin_hypercube(axis_values, int(samples), seed)
+        n = len(next(iter(points.values())))
+
+        # Broadcast the base profile's columns to every point, then apply the axes
+        base = self.batch_calculator.columnarize([business_data])
+        cols = {key: np.repeat(value, n) if isinstance(value, np.ndarray) and value.shape == (1,) else value
+                for key, value in base.items()}
+        for name, column in SCALAR_AXES.items():
+            if name in points:
+                cols[column] = points[name]
+        if 'monthlyRevenue' in points:
+            cols['ratioRevenue'] = points['monthlyRevenue']
+
+        # Re-add operating expense lines in their original order, as the scalar sum does
+        lines = list(operating_expenses) + [
+            name[len(OPERATING_AXIS_PREFIX):] for name in points
+            if name.startswith(OPERATING_AXIS_PREFIX) and name[len(OPERATING_AXIS_PREFIX):] not in operating_expenses
+        ]
+        if any(name.startswith(OPERATING_AXIS_PREFIX) for name in points):
+            operating = np.zeros(n)
+            for line in lines:
+                operating = operating + points.get(OPERATING_AXIS_PREFIX + line, float(operating_expenses.get(line, 0)))
+            cols['operating'] = operating
+
+        sections = self.batch_calculator.evaluate(cols)
+        total_debt = float(sum(debt.get('amount', 0) for debt in business_data.get('debtObligations', [])))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            debt_ratio = total_debt / (cols['ratioRevenue'] * 12)
+        sections['debtManagement'] = {
+            'debtToRevenueRatio': [
+                value if np.isfinite(value) else None
+                for value in self.batch_calculator.round_values(debt_ratio)
+            ]
+        }
+
+        columns = {}
+        for metric in metrics:
+            section, field = SWEEP_METRICS[metric]
+            columns[metric] = sections[section][field]
+
+        result = {
+            'mode': mode,
+            'points': n,
+            'metrics': columns
+        }
+        if mode == 'grid':
+            # A list keeps the axis order that defines the row-major layout of every metric
+            result['axes'] = [{'name': name, 'values': values.tolist()} for name, values in axis_values.items()]
+            result['shape'] = [values.size for values in axis_values.values()]
+        else:
+            # The exact inputs of every point, not rounded: the metrics were computed from these
+            result['samples'] = {name: values.tolist() for name, values in points.items()}
+            result['seed'] = seed
+        return result
@@ -0,0 +1,190 @@
+import bisect
+import numpy as np
+from typing import Dict, Any, List
+from src.services.batch_calculator import BatchCalculator
+
+DEFAULT_CORPORATE_TAX_RATE = 0.21
+DEFAULT_PAYROLL_TAX_RATE = 0.15
+# Keys of tax_rates.json holding flat sub-national corporate rates by region code
+REGION_RATE_KEYS = ('stateTaxRates', 'provincialTaxRates', 'regionalTaxRates')
+
+
+class TaxEngine:
+    """Corporate, regional, trade, payroll and VAT liability over compiled rate arrays.
+
+    Each country's corporate brackets (``corporateTaxBrackets`` as
+    ``{threshold, rate}`` items, or the flat ``corporateTaxRate``) are sorted
+    into one row of a padded threshold/rate matrix with the tax due at every
+    threshold precomputed. Finding each profit's bracket is then a row-wise
+    searchsorted (count of thresholds at or below the profit), so one profile
+    or a whole batch is evaluated with the same array expressions.
+    """
+
+    def __init__(self, tax_rates: Dict[str, Any]):
+        countries = tax_rates['countries']
+        # Unknown countries use one extra trailing row holding the defaults
+        self.index = {code: i for i, code in enumerate(countries)}
+        rows = list(countries.values()) + [{}]
+
+        brackets = [self._brackets(row) for row in rows]
+        width = max(len(row) for row in brackets)
+        self.thresholds = np.full((len(rows), width), np.inf)
+        self.rates = np.zeros((len(rows), width))
+        self.base_tax = np.zeros((len(rows), width))
+        for c, row in enumerate(brackets):
+            thresholds = np.array([threshold for threshold, _ in row])
+            rates = np.array([rate for _, rate in row])
+            self.thresholds[c, :len(row)] = thresholds
+            self.rates[c, :len(row)] = rates
+            # Tax due at each threshold: the sum of every full bracket below it
+            self.base_tax[c, 1:len(row)] = np.cumsum(np.diff(thresholds) * rates[:-1])
+        # Plain-Python copies of each row for single-profile evaluation
+        self.bracket_rows = [
+            (self.thresholds[c, :len(row)].tolist(), self.rates[c, :len(row)].tolist(), self.base_tax[c, :len(row)].tolist())
+            for c, row in enumerate(brackets)
+        ]
+
+        self.trade_rate = np.array([row.get('tradeTaxRate', 0.0) for row in rows])
+        self.vat_rate = np.array([row.get('vatRate', 0.0) for row in rows])
+        self.payroll_rate = np.array([row.get('payrollTaxRate', DEFAULT_PAYROLL_TAX_RATE) for row in rows])
+
+        # Regions flattened across countries; position 0 is "no surcharge"
+        self.region_rate = [0.0]
+        self.region_codes = [None]
+        self.region_index = {}
+        for code, row in countries.items():
+            names = {region.upper(): name for region, name in row.get('regionNames', {}).items()}
+            for key in REGION_RATE_KEYS:
+                for region, rate in row.get(key, {}).items():
+                    position = len(self.region_rate)
+                    self.region_rate.append(rate)
+                    self.region_codes.append(region)
+                    self.region_index[(code, region.upper())] = position
+                    if region.upper() in names:
+                        self.region_index[(code, names[region.upper()].upper())] = position
+        self.region_rate_list = self.region_rate
+        self.region_rate = np.array(self.region_rate)
+
+    @staticmethod
+    def _brackets(row: Dict[str, Any]) -> List[tuple]:
+        """Sorted (threshold, rate) pairs starting at zero profit"""
+        brackets = sorted(
+            (float(bracket.get('threshold', 0)), float(bracket['rate']))
+            for bracket in row.get('corporateTaxBrackets', [])
+        )
+        if not brackets or brackets[0][0] > 0:
+            brackets.insert(0, (0.0, float(row.get('corporateTaxRate', DEFAULT_CORPORATE_TAX_RATE))))
+        return brackets
+
+    def country_position(self, country: Any) -> int:
+        """Row of a country code (unknown codes use the defaults row)"""
+        return self.index.get(country, len(self.index))
+
+    def region_position(self, country: Any, region: Any) -> int:
+        """Position of a region code or name within a country (0 when unknown)"""
+        if not isinstance(region, str) or not region.strip():
+            return 0
+        return self.region_index.get((country, region.strip().upper()), 0)
+
+    @staticmethod
+    def profile_inputs(monthly_revenue, monthly_operating, employee_count, average_employee_cost):
+        """Annual profit, payroll and value added, shared by the scalar and batch paths"""
+        monthly_payroll = (average_employee_cost * employee_count) / 12
+        annual_profit = monthly_revenue * 12 - (monthly_operating + monthly_payroll) * 12
+        return annual_profit, monthly_payroll * 12, monthly_revenue * 12 - monthly_operating * 12
+
+    def profile_breakdown(self, country: Any, region: Any, monthly_revenue, monthly_operating,
+                          employee_count, average_employee_cost) -> Dict[str, Any]:
+        """Liability breakdown for a single business profile.
+
+        Mirrors ``evaluate`` operation for operation on Python floats, which
+        avoids array overhead on the per-request path and returns exactly what
+        the batch path returns for the same profile.
+        """
+        row = self.country_position(country)
+        position = self.region_position(country, region)
+        annual_profit, annual_payroll, value_added = self.profile_inputs(
+            float(monthly_revenue), float(monthly_operating), float(employee_count), float(average_employee_cost)
+        )
+        thresholds, rates, base_tax = self.bracket_rows[row]
+        taxable = max(annual_profit, 0.0)
+        bracket = max(bisect.bisect_right(thresholds, taxable) - 1, 0)
+        region_rate = self.region_rate_list[position]
+        trade_rate = float(self.trade_rate[row])
+
+        corporate_tax = base_tax[bracket] + (taxable - thresholds[bracket]) * rates[bracket]
+        regional_tax = taxable * region_rate
+        trade_tax = taxable * trade_rate
+        payroll_tax = annual_payroll * float(self.payroll_rate[row])
+        vat_payable = max(value_added, 0.0) * float(self.vat_rate[row])
+        income_tax = corporate_tax + regional_tax + trade_tax
+        return {
+            'region': self.region_codes[position],
+            'corporateTax': round(corporate_tax, 2),
+            'regionalTax': round(regional_tax, 2),
+            'tradeTax': round(trade_tax, 2),
+            'payrollTax': round(payroll_tax, 2),
+            'vatPayable': round(vat_payable, 2),
+            'totalLiability': round(income_tax + payroll_tax + vat_payable, 2),
+            'corporateEffectiveRate': round(corporate_tax / taxable if taxable > 0 else 0.0, 4),
+            'effectiveRate': round(income_tax / taxable if taxable > 0 else 0.0, 4),
+            'marginalRate': round(rates[bracket] + region_rate + trade_rate, 4)
+        }
+
+    def evaluate(self, country: np.ndarray, region: np.ndarray, annual_profit: np.ndarray,
+                 annual_payroll: np.ndarray, value_added: np.ndarray) -> Dict[str, np.ndarray]:
+        """Liability components for arrays of (country row, region position, amounts)"""
+        thresholds = self.thresholds[country]
+        taxable = np.maximum(annual_profit, 0.0)
+        # Row-wise searchsorted(side='right'): last threshold at or below the profit
+        bracket = np.maximum((thresholds <= taxable[:, None]).sum(axis=1) - 1, 0)
+        bracket_rate = self.rates[country, bracket]
+
+        bracket_start = thresholds[np.arange(len(country)), bracket]
+        corporate_tax = self.base_tax[country, bracket] + (taxable - bracket_start) * bracket_rate
+        regional_tax = taxable * self.region_rate[region]
+        trade_tax = taxable * self.trade_rate[country]
+        payroll_tax = annual_payroll * self.payroll_rate[country]
+        # VAT on the value added (sales less VAT-able operating costs), never negative
+        vat_payable = np.maximum(value_added, 0.0) * self.vat_rate[country]
+
+        income_tax = corporate_tax + regional_tax + trade_tax
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corporate_effective_rate = np.where(taxable > 0, corporate_tax / taxable, 0.0)
+            effective_rate = np.where(taxable > 0, income_tax / taxable, 0.0)
+        return {
+            'corporateTax': corporate_tax,
+            'regionalTax': regional_tax,
+            'tradeTax': trade_tax,
+            'payrollTax': payroll_tax,
+            'vatPayable': vat_payable,
+            'totalLiability': income_tax + payroll_tax + vat_payable,
+            'corporateEffectiveRate': corporate_effective_rate,
+            'effectiveRate': effective_rate,
+            'marginalRate': bracket_rate + self.region_rate[region] + self.trade_rate[country]
+        }
+
+    def breakdown(self, country: np.ndarray, region: np.ndarray, annual_profit: np.ndarray,
+                  annual_payroll: np.ndarray, value_added: np.ndarray) -> List[Dict[str, Any]]:
+        """Rounded per-profile liability breakdowns"""
+        components = self.evaluate(country, region, annual_profit, annual_payroll, value_added)
+        columns = {
+            key: BatchCalculator.round_values(values, 4 if key.endswith('Rate') else 2)
+            for key, values in components.items()
+        }
+        regions = [self.region_codes[position] for position in region.tolist()]
+        return [
+            dict({'region': code}, **{key: values[i] for key, values in columns.items()})
+            for i, code in enumerate(regions)
+        ]
+
+    def evaluate_batch(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Evaluate raw tax inputs ({country, region, annualProfit, annualPayroll, valueAdded}) for many entities"""
+        country = np.array([self.country_position(item.get('country')) for item in items], dtype=np.intp)
+        region = np.array([
+            self.region_position(item.get('country'), item.get('region')) for item in items
+        ], dtype=np.intp)
+        annual_profit = np.array([item.get('annualProfit', 0) for item in items], dtype=float)
+        annual_payroll = np.array([item.get('annualPayroll', 0) for item in items], dtype=float)
+        value_added = np.array([item.get('valueAdded', 0) for item in items], dtype=float)
+        return self.breakdown(country, region, annual_profit, annual_payroll, value_added)
@@ -36,19 +36,15 @@ const BusinessInfoForm = ({ onSubmit }) => {
     // Fetch reference data
     const fetchReferenceData = async () => {
       try {
-        const [countriesRes, industriesRes, currenciesRes] = await Promise.all([
-          fetch(`https://financialplanning-production.up.railway.app/api/countries`),
-          fetch(`https://financialplanning-production.up.railway.app/api/industries`),
-          fetch(`https://financialplanning-production.up.railway.app/api/currencies`)
-        ])
+        // One cacheable request for countries, industries and currencies
+        const response = await fetch(`https://financialplanning-production.up.railway.app/api/bootstrap`)
+        const bootstrapData = await response.json()
 
-        const countriesData = await countriesRes.json()
-        const industriesData = await industriesRes.json()
-        const currenciesData = await currenciesRes.json()
-
-        if (countriesData.success) setCountries(countriesData.data)
-        if (industriesData.success) setIndustries(industriesData.data)
-        if (currenciesData.success) setCurrencies(currenciesData.data)
+        if (bootstrapData.success) {
+          setCountries(bootstrapData.data.countries)
+          setIndustries(bootstrapData.data.industries)
+          setCurrencies(bootstrapData.data.currencies)
+        }
       } catch (error) {
         console.error('Error fetching reference data:', error)
       }